@@ -2,10 +2,80 @@ import streamlit as st
 from classes.parser import Parser
 from classes.algebra_relacional import AlgebraRelacional
 from classes.grafo_execucao import GrafoExecucao
-from classes.heuristica_reducao_tuplas import HeuristicaReducaoTuplas
-from classes.heuristica_atributos import HeuristicaReducaoAtributos
-from classes.heuristica_reordenar_folhas import HeuristicaReordenarFolhas
-from classes.heuristica_evitar_joins import HeuristicaEvitarProdutoCartesiano
+from classes.otimizador import Otimizador
+from classes.plano import impressao_plano
+
+# Entradas mantidas em cada cache (compartilhado entre todas as sessões)
+MAX_ENTRADAS_CACHE = 256
+
+# Etapas exibidas: (chave, aba, título da álgebra/grafo, legenda do grafo)
+ETAPAS = [
+    ('original', "Query Original", "Query Original", "Grafo de Execução da Query Original"),
+    ('tuplas', "Com Heurística de Tuplas", "Com Heurística de Tuplas",
+     "Grafo de Execução com Heurística de Tuplas"),
+    ('ambas', "Com Ambas Heurísticas", "Com Heurística de Redução de Atributos",
+     "Grafo de Execução com Heurística de Redução de Atributos"),
+    ('semprod', "Sem Produto Cartesiano", "Sem Produto Cartesiano",
+     "Grafo de Execução sem Produto Cartesiano"),
+    ('reord', "Com Reordenação de Folhas", "Com Reordenação de Folhas",
+     "Grafo de Execução com Reordenação de Folhas"),
+    ('acesso', "Com Caminhos de Acesso", "Com Caminhos de Acesso (índices)",
+     "Grafo de Execução com Caminhos de Acesso"),
+    ('algoritmo', "Com Algoritmos de Junção", "Com Algoritmos de Junção (hash, merge, índice)",
+     "Grafo de Execução com Algoritmos de Junção"),
+    ('semijuncao', "Com Filtros de Junção", "Com Filtros de Junção (semijunções ⋉)",
+     "Grafo de Execução com Filtros de Junção"),
+]
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE, show_spinner=False)
+def parsear(query: str) -> tuple:
+    """Parse memoizado pelo texto da query: (parsed ou None, mensagem de erro)"""
+    parser = Parser(verboso=False)
+    try:
+        return parser.parse(query), parser.ultimo_erro
+    except ValueError as e:
+        return None, str(e)
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE, show_spinner=False)
+def otimizar(impressao: str, _parsed_query: dict) -> dict:
+    """
+    Heurísticas + álgebra relacional de cada etapa, memoizadas pela impressão
+    digital do plano (`_parsed_query` não entra na chave do cache)
+    """
+    otimizacao = Otimizador().otimizar(_parsed_query)
+    planos = {
+        'original': _parsed_query,
+        'tuplas': otimizacao.apos('HeuristicaReducaoTuplas'),
+        'ambas': otimizacao.apos('HeuristicaReducaoAtributos'),
+        'semprod': otimizacao.apos('HeuristicaEvitarProdutoCartesiano'),
+        'reord': otimizacao.apos('HeuristicaReordenarFolhas'),
+        'acesso': otimizacao.apos('HeuristicaCaminhoAcesso'),
+        'algoritmo': otimizacao.apos('HeuristicaAlgoritmoJuncao'),
+        'semijuncao': otimizacao.final,
+    }
+    return {
+        'etapas': {
+            chave: {
+                'parsed': plano,
+                'impressao': impressao_plano(plano),
+                'algebra': AlgebraRelacional(plano).converter(),
+            }
+            for chave, plano in planos.items()
+        },
+        'iteracoes': otimizacao.iteracoes,
+        'tempo_total': otimizacao.tempo_total,
+        'relatorio': otimizacao.relatorio(),
+    }
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE, show_spinner=False)
+def renderizar_grafo(impressao: str, _parsed_query: dict) -> str:
+    """SVG do grafo de execução em memória, memoizado pela impressão digital do plano"""
+    return GrafoExecucao(_parsed_query).gerar_svg()
+
+
 
 # Configuração da página
 st.set_page_config(
@@ -46,154 +116,54 @@ processar = st.button("Converter", type="primary", use_container_width=True)
 
 # Processar a query
 if processar and query_input:
-    parsed_query = Parser().parse(query_input.upper())
+    parsed_query, erro = parsear(query_input.upper())
 
     if parsed_query:
-        # Query Original
-        parsed_query_original = parsed_query
-
-        # Aplicar heurística de redução de tuplas
-        heuristica_tuplas = HeuristicaReducaoTuplas(parsed_query)
-        parsed_query_com_tuplas = heuristica_tuplas.otimizar()
-
-        # Aplicar heurística de redução de atributos (em cima da query já otimizada com tuplas)
-        heuristica_atributos = HeuristicaReducaoAtributos(parsed_query_com_tuplas)
-        parsed_query_com_ambas = heuristica_atributos.otimizar()
-
-        # Aplica heurística para evitar produto cartesiano (move equijoins do WHERE para JOINs)
-        heuristica_evitar = HeuristicaEvitarProdutoCartesiano(parsed_query_com_ambas)
-        parsed_query_sem_prod = heuristica_evitar.otimizar()
-
-        # Aplica heurística de reordenação às estruturas já otimizadas (usar versão sem produto cartesiano)
-        heuristica_reord = HeuristicaReordenarFolhas(parsed_query_sem_prod)
-        parsed_query_reordenado = heuristica_reord.otimizar()
+        resultado = otimizar(impressao_plano(parsed_query), parsed_query)
+        etapas = resultado['etapas']
 
         # Seção 1: Query Detalhada
         st.header("1. Query Detalhada")
-        tab1, tab2, tab3, tab4, tab5 = st.tabs([
-            "Query Original",
-            "Com Heurística de Tuplas",
-            "Com Ambas Heurísticas",
-            "Sem Produto Cartesiano",
-            "Com Reordenação de Folhas"
-        ])
-
-        with tab1:
-            st.json(parsed_query_original)
-
-        with tab2:
-            st.json(parsed_query_com_tuplas)
-
-        with tab3:
-            st.json(parsed_query_com_ambas)
-
-        with tab4:
-            st.json(parsed_query_sem_prod)
-
-        with tab5:
-            st.json(parsed_query_reordenado)
+        abas = st.tabs([aba for _, aba, _, _ in ETAPAS])
+        for aba, (chave, _, _, _) in zip(abas, ETAPAS):
+            with aba:
+                st.json(etapas[chave]['parsed'])
+
+        with st.expander(f"Passos do otimizador ({resultado['iteracoes']} iteração(ões), "
+                         f"{resultado['tempo_total'] * 1000:.2f} ms)"):
+            st.table([
+                {
+                    'Passo': r['passo'],
+                    'Iteração': r['iteracao'],
+                    'Tempo (ms)': f"{r['tempo_ms']:.3f}",
+                    'Mudanças': ', '.join(r['mudancas']) or '-',
+                }
+                for r in resultado['relatorio']
+            ])
 
         st.markdown("---")
 
         # Seção 2: Álgebra Relacional Final
         st.header("2. Álgebra Relacional Final")
 
-        st.subheader("Query Original")
-        algebra_relacional = AlgebraRelacional(parsed_query_original)
-        algebra_final = algebra_relacional.converter()
-        st.code(algebra_final, language="text")
-
-        st.subheader("Com Heurística de Tuplas")
-        algebra_relacional_tuplas = AlgebraRelacional(parsed_query_com_tuplas)
-        algebra_final_tuplas = algebra_relacional_tuplas.converter()
-        st.code(algebra_final_tuplas, language="text")
-
-        st.subheader("Com Heurística de Redução de Atributos")
-        algebra_relacional_ambas = AlgebraRelacional(parsed_query_com_ambas)
-        algebra_final_ambas = algebra_relacional_ambas.converter()
-        st.code(algebra_final_ambas, language="text")
-
-        st.subheader("Sem Produto Cartesiano")
-        algebra_relacional_semprod = AlgebraRelacional(parsed_query_sem_prod)
-        algebra_final_semprod = algebra_relacional_semprod.converter()
-        st.code(algebra_final_semprod, language="text")
-
-        st.subheader("Com Reordenação de Folhas")
-        algebra_relacional_reord = AlgebraRelacional(parsed_query_reordenado)
-        algebra_final_reord = algebra_relacional_reord.converter()
-        st.code(algebra_final_reord, language="text")
+        for chave, _, titulo, _ in ETAPAS:
+            st.subheader(titulo)
+            st.code(etapas[chave]['algebra'], language="text")
 
         st.markdown("---")
 
-        # Seção 3: Grafo de Execução
+        # Seção 3: Grafo de Execução (SVG em memória, sem arquivos em disco)
         st.header("3. Grafo de Execução")
 
-        col1, col2, col3, col4, col5 = st.columns(5)
-
-        with col1:
-            st.subheader("Query Original")
-            gerador_grafo = GrafoExecucao(parsed_query_original)
-            try:
-                nome_arquivo = "networkx_query_original.png"
-                caminho_grafo = gerador_grafo.gerar_grafo_networkx(nome_arquivo=nome_arquivo)
-                st.image(caminho_grafo, caption="Grafo de Execução da Query Original", use_container_width=True)
-            except ImportError as e:
-                st.error(f"Erro: {str(e)}")
-                st.info("Execute: `pip install networkx matplotlib`")
-            except Exception as e:
-                st.error(f"Erro ao gerar grafo: {str(e)}")
-
-        with col2:
-            st.subheader("Com Heurística de Tuplas")
-            gerador_grafo_tuplas = GrafoExecucao(parsed_query_com_tuplas)
-            try:
-                nome_arquivo_tuplas = "networkx_query_tuplas.png"
-                caminho_grafo_tuplas = gerador_grafo_tuplas.gerar_grafo_networkx(nome_arquivo=nome_arquivo_tuplas)
-                st.image(caminho_grafo_tuplas, caption="Grafo de Execução com Heurística de Tuplas", use_container_width=True)
-            except ImportError as e:
-                st.error(f"Erro: {str(e)}")
-                st.info("Execute: `pip install networkx matplotlib`")
-            except Exception as e:
-                st.error(f"Erro ao gerar grafo: {str(e)}")
-
-        with col3:
-            st.subheader("Com Heurística de Redução de Atributos")
-            gerador_grafo_ambas = GrafoExecucao(parsed_query_com_ambas)
-            try:
-                nome_arquivo_ambas = "networkx_query_ambas.png"
-                caminho_grafo_ambas = gerador_grafo_ambas.gerar_grafo_networkx(nome_arquivo=nome_arquivo_ambas)
-                st.image(caminho_grafo_ambas, caption="Grafo de Execução com Heurística de Redução de Atributos", use_container_width=True)
-            except ImportError as e:
-                st.error(f"Erro: {str(e)}")
-                st.info("Execute: `pip install networkx matplotlib`")
-            except Exception as e:
-                st.error(f"Erro ao gerar grafo: {str(e)}")
-
-        with col4:
-            st.subheader("Sem Produto Cartesiano")
-            gerador_grafo_semprod = GrafoExecucao(parsed_query_sem_prod)
-            try:
-                nome_arquivo_semprod = "networkx_query_semprod.png"
-                caminho_grafo_semprod = gerador_grafo_semprod.gerar_grafo_networkx(nome_arquivo=nome_arquivo_semprod)
-                st.image(caminho_grafo_semprod, caption="Grafo de Execução sem Produto Cartesiano", use_container_width=True)
-            except ImportError as e:
-                st.error(f"Erro: {str(e)}")
-                st.info("Execute: `pip install networkx matplotlib`")
-            except Exception as e:
-                st.error(f"Erro ao gerar grafo: {str(e)}")
-
-        with col5:
-            st.subheader("Com Reordenação de Folhas")
-            gerador_grafo_reord = GrafoExecucao(parsed_query_reordenado)
-            try:
-                nome_arquivo_reord = "networkx_query_reordenado.png"
-                caminho_grafo_reord = gerador_grafo_reord.gerar_grafo_networkx(nome_arquivo=nome_arquivo_reord)
-                st.image(caminho_grafo_reord, caption="Grafo de Execução com Reordenação de Folhas", use_container_width=True)
-            except ImportError as e:
-                st.error(f"Erro: {str(e)}")
-                st.info("Execute: `pip install networkx matplotlib`")
-            except Exception as e:
-                st.error(f"Erro ao gerar grafo: {str(e)}")
+        colunas = st.columns(len(ETAPAS))
+        for coluna, (chave, _, titulo, legenda) in zip(colunas, ETAPAS):
+            with coluna:
+                st.subheader(titulo)
+                try:
+                    imagem = renderizar_grafo(etapas[chave]['impressao'], etapas[chave]['parsed'])
+                    st.image(imagem, caption=legenda, use_container_width=True)
+                except Exception as e:
+                    st.error(f"Erro ao gerar grafo: {str(e)}")
 
     else:
-        st.error("Falha ao parsear a query.")
\ No newline at end of file
+        st.error(f"Falha ao parsear a query: {erro}" if erro else "Falha ao parsear a query.")
@@ -0,0 +1,54 @@
+"""
+Microbenchmark do cache de planos parametrizado
+
+Otimiza a mesma query com literais diferentes a cada repetição, com o
+`Otimizador` (todas as heurísticas a cada chamada) e com o `CachePlanos`
+(uma otimização por formato; nas demais, só os literais são religados).
+Reporta o tempo por query de cada um e a taxa de acerto do cache.
+
+Uso:
+    python benchmarks/bench_cache_planos.py [--repeticoes N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_parser import gerar_query  # noqa: E402
+from classes.cache_planos import CachePlanos  # noqa: E402
+from classes.otimizador import Otimizador  # noqa: E402
+from classes.parser import Parser  # noqa: E402
+
+
+def medir(otimizador, parseds: list) -> float:
+    inicio = time.perf_counter()
+    for parsed in parseds:
+        otimizador.otimizar(parsed)
+    return time.perf_counter() - inicio
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argp.add_argument("--repeticoes", type=int, default=500)
+    args = argp.parse_args()
+
+    parser = Parser(verboso=False)
+    print(f"{'joins':>6} {'sem cache us':>13} {'com cache us':>13} {'speedup':>8} {'acertos':>8}")
+    for num_juncoes in (1, 3, 5):
+        query = gerar_query(num_juncoes)
+        # Literais diferentes a cada repetição: mesmo formato de query
+        parseds = [parser.parse(query.replace("> 0", f"> {i}", 1)) for i in range(1, args.repeticoes + 1)]
+        sem_cache = medir(Otimizador(), parseds) / len(parseds)
+        cache = CachePlanos()
+        com_cache = medir(cache, parseds) / len(parseds)
+        print(
+            f"{num_juncoes:>6} {sem_cache * 1e6:>13.1f} {com_cache * 1e6:>13.1f} "
+            f"{sem_cache / com_cache:>8.1f} {cache.estatisticas()['taxa_acerto']:>8.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark do cache de resultados (painel com atualizações de dados)
+
+Simula um painel que, a cada atualização, executa as mesmas queries sobre
+tabelas que mudam pouco (CATEGORIA, STATUS, TIPOCLIENTE) juntadas com
+tabelas maiores. Entre as atualizações, a cada `--insercao-a-cada` rodadas,
+um pedido novo é inserido em PEDIDO: as queries que leem PEDIDO têm de ser
+executadas de novo, as demais continuam vindo do cache.
+
+Reporta o tempo médio por atualização sem cache e com o `CacheResultados`,
+a taxa de acerto e as invalidações, e confere se cada resultado do cache é
+igual ao executado sem cache.
+
+Uso:
+    python benchmarks/bench_cache_resultados.py [--rodadas 50] [--pedidos 50000]
+        [--insercao-a-cada 10]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classes.banco_dados import BancoDados  # noqa: E402
+from classes.cache_resultados import CacheResultados  # noqa: E402
+from classes.executor import Executor  # noqa: E402
+from classes.otimizador import Otimizador  # noqa: E402
+from classes.parser import Parser  # noqa: E402
+
+PAINEL = [
+    "SELECT CATEGORIA.DESCRICAO, PRODUTO.NOME, PRODUTO.PRECO FROM PRODUTO "
+    "INNER JOIN CATEGORIA ON PRODUTO.CATEGORIA_IDCATEGORIA = CATEGORIA.IDCATEGORIA "
+    "WHERE PRODUTO.PRECO > 250;",
+    "SELECT STATUS.DESCRICAO, PEDIDO.IDPEDIDO, PEDIDO.VALORTOTALPEDIDO FROM PEDIDO "
+    "INNER JOIN STATUS ON PEDIDO.STATUS_IDSTATUS = STATUS.IDSTATUS "
+    "WHERE PEDIDO.VALORTOTALPEDIDO > 990;",
+    "SELECT TIPOCLIENTE.DESCRICAO, CLIENTE.NOME, CLIENTE.EMAIL FROM CLIENTE "
+    "INNER JOIN TIPOCLIENTE ON CLIENTE.TIPOCLIENTE_IDTIPOCLIENTE = TIPOCLIENTE.IDTIPOCLIENTE "
+    "WHERE TIPOCLIENTE.DESCRICAO = 'PJ';",
+    "SELECT TIPOCLIENTE.DESCRICAO, STATUS.DESCRICAO, PEDIDO.IDPEDIDO FROM PEDIDO "
+    "INNER JOIN STATUS ON PEDIDO.STATUS_IDSTATUS = STATUS.IDSTATUS "
+    "INNER JOIN CLIENTE ON PEDIDO.CLIENTE_IDCLIENTE = CLIENTE.IDCLIENTE "
+    "INNER JOIN TIPOCLIENTE ON CLIENTE.TIPOCLIENTE_IDTIPOCLIENTE = TIPOCLIENTE.IDTIPOCLIENTE "
+    "WHERE STATUS.DESCRICAO = 'ABERTO' AND PEDIDO.VALORTOTALPEDIDO > 950;",
+]
+
+
+def gerar_banco(pedidos: int, seed: int) -> BancoDados:
+    """Tabelas sintéticas: poucas categorias/status/tipos, 1 cliente : 10 pedidos"""
+    r = random.Random(seed)
+    clientes = max(pedidos // 10, 1)
+    produtos = max(pedidos // 100, 1)
+    banco = BancoDados()
+    banco.criar_tabela('CATEGORIA', [(i, f'CATEGORIA {i}') for i in range(1, 11)])
+    banco.criar_tabela('STATUS', [(1, 'ABERTO'), (2, 'FECHADO'), (3, 'CANCELADO')])
+    banco.criar_tabela('TIPOCLIENTE', [(1, 'PF'), (2, 'PJ')])
+    banco.criar_tabela('PRODUTO', [
+        (i, f'PRODUTO {i}', 'descrição', float(r.randint(1, 300)), r.randint(0, 50), r.randint(1, 10))
+        for i in range(1, produtos + 1)
+    ])
+    banco.criar_tabela('CLIENTE', [
+        (i, f'CLIENTE {i}', f'c{i}@exemplo.com', '1990-01-01', 'senha', r.randint(1, 2), '2024-01-01')
+        for i in range(1, clientes + 1)
+    ])
+    banco.criar_tabela('PEDIDO', [
+        (i, r.randint(1, 3), f'2025-{r.randint(1, 12):02d}-01', float(r.randint(10, 1000)), r.randint(1, clientes))
+        for i in range(1, pedidos + 1)
+    ])
+    return banco
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argp.add_argument("--rodadas", type=int, default=50, help="atualizações do painel")
+    argp.add_argument("--pedidos", type=int, default=50_000)
+    argp.add_argument("--insercao-a-cada", type=int, default=10, help="rodadas entre inserções em PEDIDO")
+    argp.add_argument("--seed", type=int, default=42)
+    args = argp.parse_args()
+
+    banco = gerar_banco(args.pedidos, args.seed)
+    parser = Parser(verboso=False)
+    otimizador = Otimizador()
+    planos = [otimizador.otimizar(parser.parse(q)).final for q in PAINEL]
+    executor = Executor(banco)
+    cache = CacheResultados(banco)
+
+    tempo_sem, tempo_com = 0.0, 0.0
+    diferentes = 0
+    proximo_pedido = args.pedidos + 1
+    for rodada in range(1, args.rodadas + 1):
+        if rodada % args.insercao_a_cada == 0:
+            banco.tabela('PEDIDO').inserir([(proximo_pedido, 1, '2025-12-01', 999.0, 1)])
+            proximo_pedido += 1
+        for plano in planos:
+            inicio = time.perf_counter()
+            esperado = executor.executar(plano).linhas()
+            tempo_sem += time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            obtido = cache.executar(plano).linhas()
+            tempo_com += time.perf_counter() - inicio
+            diferentes += obtido != esperado
+
+    estatisticas = cache.estatisticas()
+    print(f"Pedidos: {args.pedidos} | queries no painel: {len(PAINEL)} | rodadas: {args.rodadas}\n")
+    print(f"{'':>10} {'ms/atualização':>15}")
+    print(f"{'sem cache':>10} {tempo_sem / args.rodadas * 1000:>15.2f}")
+    print(f"{'com cache':>10} {tempo_com / args.rodadas * 1000:>15.2f}")
+    print(f"\nTaxa de acerto: {estatisticas['taxa_acerto']:.1%} | invalidações: {estatisticas['invalidacoes']}"
+          f" | bytes em cache: {estatisticas['bytes']}")
+    print(f"Resultados: {'ok' if not diferentes else f'{diferentes} DIFERENTES'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark da execução paralela por partições
+
+Gera tabelas sintéticas (CLIENTE, PEDIDO, PEDIDO_HAS_PRODUTO, PRODUTO) e
+executa uma junção de pedidos com itens, já otimizada, com o `Executor`
+sequencial e com o `ExecutorParalelo` para cada número de processos. Para
+cada um reporta o tempo (mediana), o speedup sobre o sequencial e a
+eficiência (speedup / processos), e confere se o resultado é o mesmo.
+
+O speedup é limitado pelos núcleos da máquina (`os.cpu_count()`): acima
+disso os processos disputam os mesmos núcleos e só resta o custo extra de
+particionar e transferir as linhas entre processos.
+
+Uso:
+    python benchmarks/bench_paralelo.py [--processos 1,2,4,8,16]
+        [--pedidos 200000] [--itens-por-pedido 4] [--morsel 10000] [--repeticoes 3]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classes.banco_dados import BancoDados  # noqa: E402
+from classes.executor import Executor  # noqa: E402
+from classes.executor_paralelo import ExecutorParalelo  # noqa: E402
+from classes.otimizador import Otimizador  # noqa: E402
+from classes.parser import Parser  # noqa: E402
+
+QUERY = (
+    "SELECT CLIENTE.NOME, PEDIDO.IDPEDIDO, PRODUTO.NOME, PEDIDO_HAS_PRODUTO.QUANTIDADE "
+    "FROM PEDIDO "
+    "INNER JOIN PEDIDO_HAS_PRODUTO ON PEDIDO.IDPEDIDO = PEDIDO_HAS_PRODUTO.PEDIDO_IDPEDIDO "
+    "INNER JOIN CLIENTE ON CLIENTE.IDCLIENTE = PEDIDO.CLIENTE_IDCLIENTE "
+    "INNER JOIN PRODUTO ON PEDIDO_HAS_PRODUTO.PRODUTO_IDPRODUTO = PRODUTO.IDPRODUTO "
+    "WHERE PEDIDO.VALORTOTALPEDIDO > 500 AND PEDIDO_HAS_PRODUTO.QUANTIDADE >= 2;"
+)
+
+
+def gerar_banco(pedidos: int, itens_por_pedido: int, seed: int) -> BancoDados:
+    """Tabelas sintéticas na proporção 1 cliente : 10 pedidos, 1 produto : 100 pedidos"""
+    r = random.Random(seed)
+    clientes = max(pedidos // 10, 1)
+    produtos = max(pedidos // 100, 1)
+    banco = BancoDados()
+    banco.criar_tabela('CLIENTE', [
+        (i, f'CLIENTE {i}', f'c{i}@exemplo.com', '1990-01-01', 'senha', r.randint(1, 2), '2024-01-01')
+        for i in range(1, clientes + 1)
+    ])
+    banco.criar_tabela('PRODUTO', [
+        (i, f'PRODUTO {i}', 'descrição', float(r.randint(1, 300)), r.randint(0, 50), r.randint(1, 5))
+        for i in range(1, produtos + 1)
+    ])
+    banco.criar_tabela('PEDIDO', [
+        (i, r.randint(1, 2), f'2025-{r.randint(1, 12):02d}-01', float(r.randint(10, 1000)), r.randint(1, clientes))
+        for i in range(1, pedidos + 1)
+    ])
+    banco.criar_tabela('PEDIDO_HAS_PRODUTO', [
+        (i, r.randint(1, pedidos), r.randint(1, produtos), r.randint(1, 5), 1.0)
+        for i in range(1, pedidos * itens_por_pedido + 1)
+    ])
+    return banco
+
+
+def medir(funcao, repeticoes: int) -> tuple:
+    """(mediana dos tempos em segundos, resultado da última execução)"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), resultado
+
+
+def _lista_inteiros(texto: str) -> list:
+    return [int(parte) for parte in texto.split(',') if parte.strip()]
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argp.add_argument("--processos", type=_lista_inteiros, default=[1, 2, 4, 8, 16])
+    argp.add_argument("--pedidos", type=int, default=200_000)
+    argp.add_argument("--itens-por-pedido", type=int, default=4)
+    argp.add_argument("--morsel", type=int, default=10_000, help="linhas da tabela base por tarefa")
+    argp.add_argument("--repeticoes", type=int, default=3)
+    argp.add_argument("--seed", type=int, default=42)
+    args = argp.parse_args()
+
+    banco = gerar_banco(args.pedidos, args.itens_por_pedido, args.seed)
+    parsed = Otimizador().otimizar(Parser(verboso=False).parse(QUERY)).final
+    print(f"Núcleos: {os.cpu_count()} | fork: {'sim' if ExecutorParalelo.fork_disponivel() else 'não'}")
+    print(f"Itens: {args.pedidos * args.itens_por_pedido} | morsel: {args.morsel}\n")
+
+    base, linhas = medir(lambda: Executor(banco).executar(parsed).linhas(), args.repeticoes)
+    referencia = sorted(linhas)
+    print(f"{'processos':>9} {'tempo s':>9} {'speedup':>8} {'eficiência':>10}  resultado")
+    print(f"{'seq':>9} {base:>9.3f} {1.0:>8.2f} {'':>10}  {len(referencia)} linhas")
+
+    for processos in args.processos:
+        executor = ExecutorParalelo(banco, processos=processos, tamanho_morsel=args.morsel)
+        tempo, resultado = medir(lambda: executor.executar(parsed), args.repeticoes)
+        speedup = base / tempo
+        igual = 'ok' if sorted(resultado.linhas()) == referencia else 'DIFERENTE'
+        print(f"{processos:>9} {tempo:>9.3f} {speedup:>8.2f} {speedup / processos:>10.2f}  {igual}")
+
+
+if __name__ == "__main__":
+    main()
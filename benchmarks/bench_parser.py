@@ -0,0 +1,75 @@
+"""
+Microbenchmark do Parser (tokenizador + descendente recursivo)
+
+Mede a vazão de `Parser.parse` para queries com 1, 10 e 100 INNER JOINs.
+Como a análise é linear, o tempo por caractere deve ficar estável
+conforme a query cresce. A coluna "cache us" repete a medição com o
+cache LRU de parse ligado (literais variando a cada chamada).
+
+Uso:
+    python benchmarks/bench_parser.py [--repeticoes N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classes.cache_lru import CacheLRU  # noqa: E402
+from classes.parser import Parser  # noqa: E402
+
+JUNCOES = [
+    ("PEDIDO", "CLIENTE.IDCLIENTE = PEDIDO.CLIENTE_IDCLIENTE"),
+    ("PEDIDO_HAS_PRODUTO", "PEDIDO.IDPEDIDO = PEDIDO_HAS_PRODUTO.PEDIDO_IDPEDIDO"),
+    ("PRODUTO", "PEDIDO_HAS_PRODUTO.PRODUTO_IDPRODUTO = PRODUTO.IDPRODUTO"),
+    ("CATEGORIA", "PRODUTO.CATEGORIA_IDCATEGORIA = CATEGORIA.IDCATEGORIA"),
+    ("ENDERECO", "CLIENTE.IDCLIENTE = ENDERECO.CLIENTE_IDCLIENTE"),
+]
+
+
+def gerar_query(num_juncoes: int) -> str:
+    """Gera uma query com `num_juncoes` INNER JOINs e um WHERE do mesmo tamanho"""
+    partes = ["SELECT CLIENTE.NOME, PEDIDO.DATAPEDIDO FROM CLIENTE"]
+    condicoes = []
+    for i in range(num_juncoes):
+        tabela, condicao = JUNCOES[i % len(JUNCOES)]
+        partes.append(f"INNER JOIN {tabela} ON {condicao}")
+        condicoes.append(f"PEDIDO.VALORTOTALPEDIDO > {i}")
+    if condicoes:
+        partes.append("WHERE " + " AND ".join(condicoes))
+    return " ".join(partes) + ";"
+
+
+def medir(query: str, repeticoes: int, cache: CacheLRU | None = None) -> float:
+    parser = Parser(verboso=False, cache=cache)
+    # Literais diferentes a cada repetição: mesmo formato de query
+    queries = [query.replace("> 0", f"> {i}", 1) for i in range(repeticoes)]
+    inicio = time.perf_counter()
+    for q in queries:
+        parser.parse(q)
+    return time.perf_counter() - inicio
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argp.add_argument("--repeticoes", type=int, default=2000)
+    args = argp.parse_args()
+
+    print(f"{'joins':>6} {'chars':>7} {'queries/s':>12} {'us/query':>10} {'ns/char':>9} {'cache us':>9}")
+    for num_juncoes in (1, 10, 100):
+        query = gerar_query(num_juncoes)
+        repeticoes = max(1, args.repeticoes // num_juncoes)
+        total = medir(query, repeticoes)
+        por_query = total / repeticoes
+        com_cache = medir(query, repeticoes, CacheLRU()) / repeticoes
+        print(
+            f"{num_juncoes:>6} {len(query):>7} {repeticoes / total:>12.0f} "
+            f"{por_query * 1e6:>10.1f} {por_query * 1e9 / len(query):>9.1f} "
+            f"{com_cache * 1e6:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
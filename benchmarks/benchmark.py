@@ -0,0 +1,305 @@
+"""
+Benchmark do pipeline completo (parse → heurísticas → álgebra → grafo)
+
+Gera cargas de queries sobre o esquema de `consts`, variando o número de
+JOINs (seguindo as chaves estrangeiras), o número de predicados no WHERE e
+a largura do SELECT, e mede cada etapa do pipeline na mesma ordem usada
+pelo app:
+
+    Parser.parse
+    HeuristicaReducaoTuplas.otimizar
+    HeuristicaPredicadosTransitivos.otimizar
+    HeuristicaReducaoAtributos.otimizar
+    HeuristicaEvitarProdutoCartesiano.otimizar
+    HeuristicaReordenarFolhas.otimizar
+    HeuristicaCaminhoAcesso.otimizar
+    HeuristicaAlgoritmoJuncao.otimizar
+    HeuristicaSemijuncao.otimizar
+    AlgebraRelacional.converter
+    GrafoExecucao.gerar_svg
+    GrafoExecucao.gerar_grafo_networkx   (PNG, se o matplotlib estiver instalado)
+
+Para cada carga e etapa reporta vazão (chamadas/s) e percentis de latência.
+O resultado pode ser salvo em JSON e comparado com uma execução anterior:
+etapas cuja mediana piorou além da tolerância são listadas e o processo
+termina com código 1.
+
+Uso:
+    python benchmarks/benchmark.py [--juncoes 0,2,4,8] [--predicados 0,2,4]
+        [--largura 1,4,8] [--queries 20] [--repeticoes 5] [--seed 42]
+        [--sem-grafo] [--saida resultado.json]
+        [--comparar anterior.json --tolerancia 0.2]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classes.algebra_relacional import AlgebraRelacional  # noqa: E402
+from classes.catalogo import catalogo_padrao  # noqa: E402
+from classes.grafo_execucao import MATPLOTLIB_DISPONIVEL, GrafoExecucao  # noqa: E402
+from classes.heuristica_atributos import HeuristicaReducaoAtributos  # noqa: E402
+from classes.heuristica_algoritmo_juncao import HeuristicaAlgoritmoJuncao  # noqa: E402
+from classes.heuristica_caminho_acesso import HeuristicaCaminhoAcesso  # noqa: E402
+from classes.heuristica_evitar_joins import HeuristicaEvitarProdutoCartesiano  # noqa: E402
+from classes.heuristica_predicados_transitivos import HeuristicaPredicadosTransitivos  # noqa: E402
+from classes.heuristica_reducao_tuplas import HeuristicaReducaoTuplas  # noqa: E402
+from classes.heuristica_reordenar_folhas import HeuristicaReordenarFolhas  # noqa: E402
+from classes.heuristica_semijuncao import HeuristicaSemijuncao  # noqa: E402
+from classes.parser import Parser  # noqa: E402
+
+HEURISTICAS = [
+    ("HeuristicaReducaoTuplas", HeuristicaReducaoTuplas),
+    ("HeuristicaPredicadosTransitivos", HeuristicaPredicadosTransitivos),
+    ("HeuristicaReducaoAtributos", HeuristicaReducaoAtributos),
+    ("HeuristicaEvitarProdutoCartesiano", HeuristicaEvitarProdutoCartesiano),
+    ("HeuristicaReordenarFolhas", HeuristicaReordenarFolhas),
+    ("HeuristicaCaminhoAcesso", HeuristicaCaminhoAcesso),
+    ("HeuristicaAlgoritmoJuncao", HeuristicaAlgoritmoJuncao),
+    ("HeuristicaSemijuncao", HeuristicaSemijuncao),
+]
+
+OPERADORES_COMPARACAO = ["=", "<>", "<", "<=", ">", ">="]
+PERCENTIS = (50, 90, 99)
+
+
+class GeradorCargas:
+    """Gera queries válidas para o catálogo padrão a partir de uma semente"""
+
+    def __init__(self, seed: int = 42):
+        self.aleatorio = random.Random(seed)
+        self.catalogo = catalogo_padrao()
+        # Arestas de junção: tabela -> [(outra tabela, coluna local, coluna da outra)]
+        self.vizinhos = {}
+        for tabela in self.catalogo.tabelas.values():
+            for coluna, (referenciada, coluna_ref) in tabela.chaves_estrangeiras.items():
+                origem = tabela.nome.upper()
+                self.vizinhos.setdefault(origem, []).append((referenciada, coluna, coluna_ref))
+                self.vizinhos.setdefault(referenciada, []).append((origem, coluna_ref, coluna))
+
+    def _literal(self, tabela: str, coluna: str) -> str:
+        tipo = self.catalogo.tipo_coluna(tabela, coluna)
+        if tipo == 'INT':
+            return str(self.aleatorio.randint(1, 1000))
+        if tipo == 'DECIMAL':
+            return f"{self.aleatorio.uniform(1, 1000):.2f}"
+        if tipo == 'DATE':
+            return f"'2025-{self.aleatorio.randint(1, 12):02d}-{self.aleatorio.randint(1, 28):02d}'"
+        return f"'V{self.aleatorio.randint(1, 1000)}'"
+
+    def _juncoes(self, inicial: str, num_juncoes: int) -> list:
+        """
+        Caminha pelas chaves estrangeiras a partir da tabela inicial
+
+        Prefere tabelas ainda não usadas; quando o esquema se esgota, repete
+        tabelas (o Parser aceita, o que permite medir muitas junções).
+        """
+        presentes = [inicial]
+        juncoes = []
+        for _ in range(num_juncoes):
+            candidatas = [
+                (origem, destino)
+                for origem in presentes
+                for destino in self.vizinhos.get(origem, [])
+            ]
+            novas = [c for c in candidatas if c[1][0] not in presentes]
+            origem, (destino, coluna_origem, coluna_destino) = self.aleatorio.choice(novas or candidatas)
+            juncoes.append((destino, f"{origem}.{coluna_origem} = {destino}.{coluna_destino}"))
+            if destino not in presentes:
+                presentes.append(destino)
+        return juncoes
+
+    def gerar(self, num_juncoes: int, num_predicados: int, largura: int) -> str:
+        inicial = self.aleatorio.choice([t for t in self.vizinhos])
+        juncoes = self._juncoes(inicial, num_juncoes)
+        tabelas = [inicial] + [tabela for tabela, _ in juncoes]
+        colunas = [f"{t}.{c}" for t in dict.fromkeys(tabelas) for c in self.catalogo.tabela(t).colunas]
+
+        selecionadas = self.aleatorio.sample(colunas, min(largura, len(colunas)))
+        partes = [f"SELECT {', '.join(selecionadas)} FROM {inicial}"]
+        partes += [f"INNER JOIN {tabela} ON {condicao}" for tabela, condicao in juncoes]
+
+        predicados = []
+        for _ in range(num_predicados):
+            qualificado = self.aleatorio.choice(colunas)
+            tabela, coluna = qualificado.split('.', 1)
+            operador = self.aleatorio.choice(OPERADORES_COMPARACAO)
+            predicados.append(f"{qualificado} {operador} {self._literal(tabela, coluna)}")
+        if predicados:
+            partes.append("WHERE " + " AND ".join(predicados))
+        return " ".join(partes) + ";"
+
+
+def percentil(valores_ordenados: list, p: float) -> float:
+    """Percentil pelo método do posto mais próximo"""
+    if not valores_ordenados:
+        return 0.0
+    posicao = max(0, min(len(valores_ordenados) - 1, int(round(p / 100 * len(valores_ordenados))) - 1))
+    return valores_ordenados[posicao]
+
+
+def resumir(latencias: list) -> dict:
+    ordenadas = sorted(latencias)
+    total = sum(ordenadas)
+    resumo = {
+        'chamadas': len(ordenadas),
+        'vazao_por_s': len(ordenadas) / total if total else 0.0,
+        'media_us': total / len(ordenadas) * 1e6 if ordenadas else 0.0,
+    }
+    for p in PERCENTIS:
+        resumo[f'p{p}_us'] = percentil(ordenadas, p) * 1e6
+    resumo['max_us'] = ordenadas[-1] * 1e6 if ordenadas else 0.0
+    return resumo
+
+
+def medir_pipeline(query: str, latencias: dict, diretorio: str | None):
+    """Executa o pipeline uma vez, acumulando a latência de cada etapa"""
+    parser = Parser(verboso=False)
+    inicio = time.perf_counter()
+    parsed = parser.parse(query)
+    latencias.setdefault('Parser.parse', []).append(time.perf_counter() - inicio)
+    if parsed is None:
+        raise ValueError(f"Query gerada inválida: {query}")
+
+    for nome, heuristica in HEURISTICAS:
+        inicio = time.perf_counter()
+        parsed = heuristica(parsed).otimizar()
+        latencias.setdefault(f'{nome}.otimizar', []).append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    AlgebraRelacional(parsed).converter()
+    latencias.setdefault('AlgebraRelacional.converter', []).append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    GrafoExecucao(parsed).gerar_svg()
+    latencias.setdefault('GrafoExecucao.gerar_svg', []).append(time.perf_counter() - inicio)
+
+    if diretorio is not None:
+        arquivo = os.path.join(diretorio, 'grafo.png')
+        inicio = time.perf_counter()
+        GrafoExecucao(parsed).gerar_grafo_networkx(arquivo)
+        latencias.setdefault('GrafoExecucao.gerar_grafo_networkx', []).append(time.perf_counter() - inicio)
+
+
+def executar(args) -> dict:
+    gerador = GeradorCargas(args.seed)
+    medir_grafo = MATPLOTLIB_DISPONIVEL and not args.sem_grafo
+    resultados = []
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for num_juncoes in args.juncoes:
+            for num_predicados in args.predicados:
+                for largura in args.largura:
+                    queries = [gerador.gerar(num_juncoes, num_predicados, largura) for _ in range(args.queries)]
+                    latencias = {}
+                    for _ in range(args.repeticoes):
+                        for query in queries:
+                            medir_pipeline(query, latencias, diretorio if medir_grafo else None)
+                    resultados.append({
+                        'carga': {'juncoes': num_juncoes, 'predicados': num_predicados, 'largura': largura},
+                        'exemplo': queries[0],
+                        'etapas': {etapa: resumir(valores) for etapa, valores in latencias.items()},
+                    })
+                    print(f"  juncoes={num_juncoes} predicados={num_predicados} largura={largura}", file=sys.stderr)
+
+    return {
+        'metadados': {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'seed': args.seed,
+            'queries_por_carga': args.queries,
+            'repeticoes': args.repeticoes,
+            'grafo_medido': medir_grafo,
+        },
+        'resultados': resultados,
+    }
+
+
+def imprimir(relatorio: dict):
+    print(f"{'carga':<14} {'etapa':<44} {'chamadas/s':>11} {'p50 us':>9} {'p90 us':>9} {'p99 us':>9}")
+    for resultado in relatorio['resultados']:
+        carga = resultado['carga']
+        rotulo = f"j{carga['juncoes']} p{carga['predicados']} w{carga['largura']}"
+        for etapa, resumo in resultado['etapas'].items():
+            print(
+                f"{rotulo:<14} {etapa:<44} {resumo['vazao_por_s']:>11.0f} "
+                f"{resumo['p50_us']:>9.1f} {resumo['p90_us']:>9.1f} {resumo['p99_us']:>9.1f}"
+            )
+
+
+def _chave_carga(carga: dict) -> tuple:
+    return carga['juncoes'], carga['predicados'], carga['largura']
+
+
+def comparar(relatorio: dict, anterior: dict, tolerancia: float) -> list:
+    """
+    Etapas cuja mediana piorou mais que `tolerancia` (fração) em relação à execução anterior
+
+    Returns:
+        Lista de (carga, etapa, p50 anterior, p50 atual)
+    """
+    referencias = {_chave_carga(r['carga']): r['etapas'] for r in anterior.get('resultados', [])}
+    regressoes = []
+    for resultado in relatorio['resultados']:
+        etapas_anteriores = referencias.get(_chave_carga(resultado['carga']))
+        if etapas_anteriores is None:
+            continue
+        for etapa, resumo in resultado['etapas'].items():
+            base = etapas_anteriores.get(etapa)
+            if base and base['p50_us'] and resumo['p50_us'] > base['p50_us'] * (1 + tolerancia):
+                regressoes.append((resultado['carga'], etapa, base['p50_us'], resumo['p50_us']))
+    return regressoes
+
+
+def _lista_inteiros(texto: str) -> list:
+    return [int(valor) for valor in texto.split(',') if valor.strip()]
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argp.add_argument("--juncoes", type=_lista_inteiros, default=[0, 2, 4, 8])
+    argp.add_argument("--predicados", type=_lista_inteiros, default=[0, 2, 4])
+    argp.add_argument("--largura", type=_lista_inteiros, default=[1, 4, 8])
+    argp.add_argument("--queries", type=int, default=20, help="queries distintas por carga")
+    argp.add_argument("--repeticoes", type=int, default=5, help="passadas sobre as queries de cada carga")
+    argp.add_argument("--seed", type=int, default=42)
+    argp.add_argument("--sem-grafo", action="store_true", help="não mede o PNG de GrafoExecucao (etapa mais lenta)")
+    argp.add_argument("--saida", help="arquivo JSON para salvar o resultado")
+    argp.add_argument("--comparar", help="JSON de uma execução anterior para detectar regressões")
+    argp.add_argument("--tolerancia", type=float, default=0.2, help="piora aceitável da mediana (fração)")
+    args = argp.parse_args()
+
+    if not MATPLOTLIB_DISPONIVEL and not args.sem_grafo:
+        print("matplotlib ausente: o PNG de GrafoExecucao não será medido", file=sys.stderr)
+
+    relatorio = executar(args)
+    imprimir(relatorio)
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+        print(f"\nResultado salvo em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            anterior = json.load(arquivo)
+        regressoes = comparar(relatorio, anterior, args.tolerancia)
+        if regressoes:
+            print(f"\nRegressões (mediana > {args.tolerancia:.0%} acima da anterior):")
+            for carga, etapa, antes, depois in regressoes:
+                print(f"  {_chave_carga(carga)} {etapa}: {antes:.1f} us -> {depois:.1f} us")
+            sys.exit(1)
+        print("\nSem regressões em relação à execução anterior.")
+
+
+if __name__ == "__main__":
+    main()
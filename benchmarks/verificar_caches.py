@@ -0,0 +1,141 @@
+"""
+Verificações do cache de planos parametrizado e do cache de resultados
+
+Confere, sem depender de um executor de testes, que o `CachePlanos`:
+- acerta numa query já vista e devolve o mesmo plano;
+- religa literais diferentes num acerto, com o mesmo plano (e os mesmos
+  planos intermediários) de otimizar a query do zero;
+- é esvaziado quando os índices ou as estatísticas do catálogo mudam, e o
+  plano seguinte é o da nova otimização.
+
+E que o `CacheResultados`:
+- acerta numa query já executada, com as mesmas linhas do `Executor`;
+- não reaproveita o resultado de uma query com outros literais;
+- executa de novo a query quando uma tabela lida recebe linhas ou é
+  carregada de novo, mas não quando muda uma tabela que ela não lê.
+
+Termina com código de saída 1 na primeira verificação que falhar.
+
+Uso:
+    python benchmarks/verificar_caches.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_cache_resultados import gerar_banco  # noqa: E402
+from classes.cache_planos import CachePlanos  # noqa: E402
+from classes.cache_resultados import CacheResultados  # noqa: E402
+from classes.catalogo import catalogo_padrao  # noqa: E402
+from classes.estatisticas import analisar  # noqa: E402
+from classes.executor import Executor  # noqa: E402
+from classes.otimizador import Otimizador  # noqa: E402
+from classes.parser import Parser  # noqa: E402
+
+CONSULTA = (
+    "SELECT CLIENTE.NOME, PEDIDO.IDPEDIDO FROM CLIENTE "
+    "INNER JOIN PEDIDO ON CLIENTE.IDCLIENTE = PEDIDO.CLIENTE_IDCLIENTE "
+    "WHERE CLIENTE.IDCLIENTE = {cliente} AND PEDIDO.VALORTOTALPEDIDO > {valor};"
+)
+
+_parser = Parser(verboso=False)
+
+
+def consulta(cliente: int, valor: int) -> dict:
+    return _parser.parse(CONSULTA.format(cliente=cliente, valor=valor))
+
+
+def verificar(condicao: bool, descricao: str):
+    if not condicao:
+        print(f"FALHOU  {descricao}")
+        sys.exit(1)
+    print(f"ok      {descricao}")
+
+
+def mesmo_resultado(obtido, esperado) -> bool:
+    """Mesmo plano final e mesmos planos intermediários"""
+    return obtido.final == esperado.final and obtido.planos == esperado.planos
+
+
+def verificar_cache_planos():
+    cache = CachePlanos()
+
+    primeira = cache.otimizar(consulta(17, 100))
+    repetida = cache.otimizar(consulta(17, 100))
+    estatisticas = cache.estatisticas()
+    verificar(estatisticas['falhas'] == 1 and estatisticas['acertos'] == 1, "planos: mesma query é um acerto")
+    verificar(repetida.final == primeira.final, "planos: acerto devolve o mesmo plano")
+
+    parsed = consulta(18, 250)
+    religada = cache.otimizar(parsed)
+    verificar(cache.estatisticas()['acertos'] == 2, "planos: literais diferentes são um acerto")
+    verificar(mesmo_resultado(religada, Otimizador().otimizar(parsed)),
+              "planos: literais religados dão o plano da otimização do zero")
+    verificar("CLIENTE.IDCLIENTE = 18" in str(religada.final) and "17" not in str(religada.final),
+              "planos: nenhum literal da primeira query sobra no plano religado")
+
+    catalogo = catalogo_padrao()
+    catalogo.definir_indice('PEDIDO', 'VALORTOTALPEDIDO', 'ordenado')
+    parsed = consulta(19, 990)
+    apos_indice = cache.otimizar(parsed)
+    estatisticas = cache.estatisticas()
+    verificar(estatisticas['invalidacoes'] == 1 and estatisticas['falhas'] == 2,
+              "planos: novo índice invalida o cache")
+    verificar(mesmo_resultado(apos_indice, Otimizador().otimizar(parsed)),
+              "planos: plano após o novo índice é o da nova otimização")
+
+    analisar(gerar_banco(2000, 42))
+    parsed = consulta(20, 500)
+    apos_estatisticas = cache.otimizar(parsed)
+    estatisticas = cache.estatisticas()
+    verificar(estatisticas['invalidacoes'] == 2 and estatisticas['falhas'] == 3,
+              "planos: novas estatísticas invalidam o cache")
+    verificar(mesmo_resultado(apos_estatisticas, Otimizador().otimizar(parsed)),
+              "planos: plano após as novas estatísticas é o da nova otimização")
+
+
+def verificar_cache_resultados():
+    banco = gerar_banco(2000, 42)
+    cache = CacheResultados(banco, otimizador=CachePlanos())
+
+    def executar(parsed) -> tuple:
+        """(resultado do cache, linhas do Executor sem cache)"""
+        return cache.executar(parsed), sorted(Executor(banco).executar(parsed).linhas())
+
+    parsed = consulta(17, 100)
+    primeira, esperado = executar(parsed)
+    repetida, _ = executar(parsed)
+    verificar(not primeira.acerto and repetida.acerto, "resultados: mesma query é um acerto")
+    verificar(sorted(repetida.linhas()) == sorted(primeira.linhas()) == esperado,
+              "resultados: acerto devolve as linhas do Executor")
+
+    outra, esperado = executar(consulta(17, 500))
+    verificar(not outra.acerto and sorted(outra.linhas()) == esperado,
+              "resultados: literais diferentes são executados de novo")
+
+    banco.tabela('STATUS').inserir([(4, 'DEVOLVIDO')])
+    verificar(executar(parsed)[0].acerto, "resultados: mudança em tabela não lida mantém o acerto")
+
+    banco.tabela('PEDIDO').inserir([(999_999, 1, '2025-12-01', 999.0, 17)])
+    apos_insercao, esperado = executar(parsed)
+    verificar(not apos_insercao.acerto and cache.estatisticas()['invalidacoes'] == 1,
+              "resultados: inserção em tabela lida invalida a entrada")
+    verificar(sorted(apos_insercao.linhas()) == esperado and any(999_999 in linha for linha in esperado),
+              "resultados: linhas após a inserção incluem a linha nova")
+
+    banco.criar_tabela('CLIENTE', list(banco.tabela('CLIENTE').linhas())[:10])
+    apos_carga, esperado = executar(parsed)
+    verificar(not apos_carga.acerto and cache.estatisticas()['invalidacoes'] == 2,
+              "resultados: tabela carregada de novo invalida a entrada")
+    verificar(sorted(apos_carga.linhas()) == esperado, "resultados: linhas após a nova carga são as do Executor")
+
+
+def main():
+    verificar_cache_planos()
+    verificar_cache_resultados()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Verificação da ordenação externa da junção merge
+
+Junta uma entrada grande (desordenada) com uma pequena pela junção merge
+com `memoria_maxima` pequena o bastante para gerar centenas de execuções
+(arquivos) na ordenação e confere, para cada número de execuções:
+- o resultado é igual ao da junção sem limite de memória;
+- os bytes despejados (`bytes_despejados`) não passam de uma gravação da
+  entrada por nível de intercalação: 1 + ⌊log_F(execuções)⌋ vezes o tamanho
+  da entrada serializada, com F = FATOR_INTERCALACAO.
+
+Termina com código de saída 1 na primeira verificação que falhar.
+
+Uso:
+    python benchmarks/verificar_ordenacao_externa.py [--linhas 100000]
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classes.arquivo_temporario import ArquivoTemporario  # noqa: E402
+from classes.operadores import (  # noqa: E402
+    FATOR_INTERCALACAO,
+    OperadorJuncaoMerge,
+    OperadorLinhas,
+    tamanho_linha,
+)
+from classes.predicados import Esquema  # noqa: E402
+
+# Folga sobre o limite: lotes parciais serializam um pouco pior
+FOLGA = 1.1
+
+
+def verificar(condicao: bool, descricao: str):
+    if not condicao:
+        print(f"FALHOU  {descricao}")
+        sys.exit(1)
+    print(f"ok      {descricao}")
+
+
+def bytes_serializados(linhas: list) -> int:
+    with ArquivoTemporario() as arquivo:
+        arquivo.escrever_todas(linhas)
+        arquivo.concluir()
+        return arquivo.bytes_escritos
+
+
+def juntar(esquerda: list, direita: list, memoria_maxima: int | None) -> tuple:
+    """(linhas da junção merge, bytes despejados)"""
+    juncao = OperadorJuncaoMerge(
+        OperadorLinhas(Esquema(['PEDIDO.IDPEDIDO', 'PEDIDO.CLIENTE_IDCLIENTE']), esquerda),
+        OperadorLinhas(Esquema(['CLIENTE.IDCLIENTE', 'CLIENTE.NOME']), direita),
+        [1], [0], None, "PEDIDO.CLIENTE_IDCLIENTE = CLIENTE.IDCLIENTE", memoria_maxima,
+    )
+    return list(juncao), juncao.bytes_despejados
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argp.add_argument("--linhas", type=int, default=100_000)
+    argp.add_argument("--seed", type=int, default=42)
+    args = argp.parse_args()
+
+    r = random.Random(args.seed)
+    clientes = max(args.linhas // 100, 1)
+    esquerda = [(i, r.randint(1, clientes)) for i in range(1, args.linhas + 1)]
+    direita = [(i, f'CLIENTE {i}') for i in r.sample(range(1, clientes + 1), clientes)]
+    esperado = sorted(juntar(esquerda, direita, None)[0])
+    entrada = bytes_serializados(esquerda) + bytes_serializados(direita)
+    tamanho_esquerda = sum(map(tamanho_linha, esquerda))
+
+    for execucoes in (128, 512, 1024):
+        linhas, despejados = juntar(esquerda, direita, tamanho_esquerda // execucoes)
+        niveis = 1 + math.floor(math.log(execucoes, FATOR_INTERCALACAO) + 1e-9)
+        verificar(sorted(linhas) == esperado, f"{execucoes} execuções: resultado igual ao sem limite")
+        verificar(despejados <= niveis * entrada * FOLGA,
+                  f"{execucoes} execuções: {despejados / entrada:.1f}× a entrada despejada (limite {niveis}×)")
+
+
+if __name__ == "__main__":
+    main()
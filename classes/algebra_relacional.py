@@ -8,8 +8,14 @@ Operadores usados:
 - π (pi): Projeção (SELECT)
 - ⋈ (bowtie): Junção natural/inner join
 - × (times): Produto cartesiano
+- ⋉ (semijunção): filtro de junção em tempo de execução sobre uma folha
+
+Tabelas lidas por índice aparecem como `TABELA[índice <tipo>: <condição>]`.
 """
 
+from classes.plano import Juncao, Projecao, Scan, Selecao, Semijuncao, construir_arvore_juncoes
+
+
 class AlgebraRelacional:
     """Classe para converter SQL parseado em álgebra relacional"""
     
@@ -25,6 +31,7 @@ class AlgebraRelacional:
         self.from_table = parsed_query.get('FROM', '')
         self.inner_joins = parsed_query.get('INNER_JOIN', [])
         self.where_clause = parsed_query.get('WHERE', None)
+        self.arvore_juncoes = construir_arvore_juncoes(parsed_query)
     
     def _formatar_condicao(self, condicao: str) -> str:
         """
@@ -38,37 +45,46 @@ class AlgebraRelacional:
         """
         return condicao.strip()
     
+    def _renderizar(self, no) -> str:
+        """
+        Converte um nó do plano lógico (e seus filhos) para notação de álgebra
+        
+        Args:
+            no: Nó de `classes.plano` (Scan, Selecao, Projecao, Juncao ou Semijuncao)
+        
+        Returns:
+            String com a expressão do nó
+        """
+        if isinstance(no, Scan):
+            if no.acesso is not None:
+                return f"{no.tabela}[{no.acesso.descricao}]"
+            return no.tabela
+        if isinstance(no, Projecao):
+            colunas = ', '.join(no.colunas)
+            return f"π_{{{colunas}}}({self._renderizar(no.filho)})"
+        if isinstance(no, Selecao):
+            condicao = self._formatar_condicao(no.condicao)
+            return f"σ_{{{condicao}}}({self._renderizar(no.filho)})"
+        if isinstance(no, Juncao):
+            condicao = self._formatar_condicao(no.condicao)
+            algoritmo = f"[{no.algoritmo}]" if no.algoritmo else ''
+            return f"({self._renderizar(no.esquerda)} ⋈{algoritmo}_{{{condicao}}} {self._renderizar(no.direita)})"
+        if isinstance(no, Semijuncao):
+            condicao = self._formatar_condicao(no.condicao)
+            return f"({self._renderizar(no.filho)} ⋉_{{{condicao}}} {self._renderizar(no.fonte)})"
+        raise TypeError(f"Nó de plano desconhecido: {no!r}")
+    
     def _criar_juncao(self) -> str:
         """
         Cria a expressão de junção (⋈) para os INNER JOINs
         
+        As seleções (where_antecipado) e projeções (projecao_antecipada)
+        antecipadas já fazem parte das folhas da árvore de junções.
+        
         Returns:
             String com a expressão de junção
         """
-        # Começa com a tabela FROM
-        resultado = self.from_table
-        
-        # Adiciona cada INNER JOIN
-        for join in self.inner_joins:
-            tabela = join['tabela']
-            condicao = self._formatar_condicao(join['condicao'])
-            
-            # Aplicar projeção antecipada se existir (heurística de redução de atributos)
-            if 'projecao_antecipada' in join:
-                colunas_proj = ', '.join(join['projecao_antecipada'])
-                tabela_base = f"π_{{{colunas_proj}}}({tabela})"
-            else:
-                tabela_base = tabela
-            
-            # Se tem where_antecipado, aplica seleção antes da junção
-            if 'where_antecipado' in join:
-                condicao_antecipada = self._formatar_condicao(join['where_antecipado'])
-                tabela_com_selecao = f"σ_{{{condicao_antecipada}}}({tabela_base})"
-                resultado = f"({resultado} ⋈_{{{condicao}}} {tabela_com_selecao})"
-            else:
-                resultado = f"({resultado} ⋈_{{{condicao}}} {tabela_base})"
-        
-        return resultado
+        return self._renderizar(self.arvore_juncoes)
     
     def _criar_selecao(self, expressao_base: str) -> str:
         """
@@ -0,0 +1,228 @@
+"""
+Armazenamento colunar em disco, mapeado em memória, com zone maps
+
+Cada tabela é um diretório com um arquivo por coluna e um arquivo lateral
+de zonas:
+
+    <TABELA>/<COLUNA>.npy   valores da coluna em largura fixa (formato .npy)
+    <TABELA>/zonas.json     colunas, tipos, número de linhas e, por bloco de
+                            `tamanho_bloco` linhas, o mínimo e o máximo dos
+                            valores não nulos de cada coluna
+
+Tipos e nulos seguem o `ExecutorVetorizado`: INT → int64 (float64 com NaN se
+houver nulos), DECIMAL → float64 (NaN), demais → texto unicode de largura
+fixa ('' é nulo, como no carregamento CSV).
+
+As colunas são abertas com mmap: nada é carregado até ser lido, e o
+`ExecutorVetorizado` usa os arrays diretamente, sem conversão. Os filtros
+`coluna <op> literal` aplicados logo acima da leitura da tabela (where
+antecipado) descartam os blocos cujo intervalo [mínimo, máximo] não pode
+satisfazê-los; esses blocos não são lidos.
+
+Requer a biblioteca opcional `numpy`.
+"""
+
+import json
+import os
+
+try:
+    import numpy as np  # type: ignore
+    NUMPY_DISPONIVEL = True
+except Exception:
+    NUMPY_DISPONIVEL = False
+
+from classes.banco_dados import _indice_da_tabela, proxima_versao
+from classes.executor_vetorizado import _array_da_coluna, _valores_da_coluna
+from classes.predicados import Esquema, converter_literal, filtro_literal
+
+TAMANHO_BLOCO = 8192
+ARQUIVO_ZONAS = 'zonas.json'
+
+
+def _exigir_numpy():
+    if not NUMPY_DISPONIVEL:
+        raise ImportError("Dependência ausente. Instale: pip install numpy")
+
+
+def _zonas(array, tamanho_bloco: int) -> tuple:
+    """(mínimos, máximos) dos valores não nulos de cada bloco (None: bloco só com nulos)"""
+    minimos, maximos = [], []
+    for inicio in range(0, len(array), tamanho_bloco):
+        bloco = array[inicio:inicio + tamanho_bloco]
+        if bloco.dtype.kind == 'U':
+            valores = [v for v in bloco.tolist() if v != '']
+            menor, maior = (min(valores), max(valores)) if valores else (None, None)
+        else:
+            if bloco.dtype.kind == 'f':
+                bloco = bloco[~np.isnan(bloco)]
+            menor, maior = (bloco.min().item(), bloco.max().item()) if len(bloco) else (None, None)
+        minimos.append(menor)
+        maximos.append(maior)
+    return minimos, maximos
+
+
+def _pode_satisfazer(minimo, maximo, operador: str, valor) -> bool:
+    """Indica se algum valor em [minimo, maximo] pode satisfazer `valor_coluna <op> valor`"""
+    if minimo is None:
+        # Bloco só com nulos: nenhuma comparação é verdadeira
+        return False
+    try:
+        if operador == '=':
+            return minimo <= valor <= maximo
+        if operador in ('<>', '!='):
+            return not (minimo == maximo == valor)
+        if operador == '<':
+            return minimo < valor
+        if operador == '<=':
+            return minimo <= valor
+        if operador == '>':
+            return maximo > valor
+        if operador == '>=':
+            return maximo >= valor
+    except TypeError:
+        # Tipos incomparáveis: o bloco é mantido e o filtro decide linha a linha
+        return True
+    return True
+
+
+def salvar_tabela(tabela, diretorio: str, tipos: list, tamanho_bloco: int = TAMANHO_BLOCO) -> str:
+    """
+    Grava uma tabela (qualquer uma com `colunas` e `linhas()`) no formato colunar
+
+    Args:
+        tabela: Tabela de origem
+        diretorio: Diretório base; a tabela vai para `<diretorio>/<TABELA>`
+        tipos: Tipo do catálogo de cada coluna ('INT', 'DECIMAL', ...)
+        tamanho_bloco: Linhas por bloco dos zone maps
+
+    Returns:
+        Diretório da tabela gravada
+    """
+    _exigir_numpy()
+    if tamanho_bloco <= 0:
+        raise ValueError(f"Tamanho de bloco inválido: {tamanho_bloco}")
+    destino = os.path.join(diretorio, tabela.nome)
+    os.makedirs(destino, exist_ok=True)
+
+    valores = list(zip(*tabela.linhas())) or [() for _ in tabela.colunas]
+    colunas = []
+    num_linhas = 0
+    for nome, tipo, vals in zip(tabela.colunas, tipos, valores):
+        array = _array_da_coluna(list(vals), tipo)
+        num_linhas = len(array)
+        np.save(os.path.join(destino, f"{nome}.npy"), array, allow_pickle=False)
+        minimos, maximos = _zonas(array, tamanho_bloco)
+        colunas.append({'nome': nome, 'tipo': tipo, 'minimos': minimos, 'maximos': maximos})
+
+    with open(os.path.join(destino, ARQUIVO_ZONAS), 'w', encoding='utf-8') as arquivo:
+        json.dump({
+            'tabela': tabela.nome,
+            'num_linhas': num_linhas,
+            'tamanho_bloco': tamanho_bloco,
+            'colunas': colunas,
+        }, arquivo, ensure_ascii=False)
+    return destino
+
+
+class TabelaColunar:
+    """Tabela gravada por `salvar_tabela`, com as colunas mapeadas em memória (somente leitura)"""
+
+    def __init__(self, diretorio: str):
+        _exigir_numpy()
+        with open(os.path.join(diretorio, ARQUIVO_ZONAS), encoding='utf-8') as arquivo:
+            meta = json.load(arquivo)
+        self.diretorio = diretorio
+        self.nome = meta['tabela'].upper()
+        self.colunas = [c['nome'].upper() for c in meta['colunas']]
+        self.esquema = [f"{self.nome}.{c}" for c in self.colunas]
+        self.tipos = [c['tipo'] for c in meta['colunas']]
+        self.tamanho_bloco = meta['tamanho_bloco']
+        self._num_linhas = meta['num_linhas']
+        self._zonas = [(c['minimos'], c['maximos']) for c in meta['colunas']]
+        self._arrays = None
+        self._indices = {}
+        self.versao = proxima_versao()
+
+    @property
+    def num_linhas(self) -> int:
+        return self._num_linhas
+
+    @property
+    def num_blocos(self) -> int:
+        return -(-self._num_linhas // self.tamanho_bloco)
+
+    @property
+    def arrays(self) -> list:
+        """Uma coluna por posição, mapeada em memória na primeira leitura"""
+        if self._arrays is None:
+            # Arquivo sem dados não pode ser mapeado: tabela vazia é lida normalmente
+            modo = 'r' if self._num_linhas else None
+            self._arrays = [
+                np.asarray(np.load(os.path.join(self.diretorio, f"{c}.npy"), mmap_mode=modo, allow_pickle=False))
+                for c in self.colunas
+            ]
+        return self._arrays
+
+    def blocos_candidatos(self, predicados: list) -> list:
+        """Blocos cujos mínimos/máximos admitem todos os filtros `coluna <op> literal`"""
+        esquema = Esquema(self.esquema)
+        blocos = list(range(self.num_blocos))
+        for predicado in predicados:
+            filtro = filtro_literal(predicado)
+            if filtro is None:
+                continue
+            coluna, operador, literal = filtro
+            posicao = esquema.indice(coluna)
+            if posicao is None:
+                continue
+            valor = converter_literal(literal, self.tipos[posicao])
+            minimos, maximos = self._zonas[posicao]
+            blocos = [b for b in blocos if _pode_satisfazer(minimos[b], maximos[b], operador, valor)]
+        return blocos
+
+    def faixas(self, blocos: list | None = None) -> list:
+        """Intervalos [inicio, fim) de linhas dos blocos (blocos vizinhos são unidos)"""
+        if blocos is None:
+            return [(0, self._num_linhas)] if self._num_linhas else []
+        faixas = []
+        for bloco in blocos:
+            inicio = bloco * self.tamanho_bloco
+            fim = min(inicio + self.tamanho_bloco, self._num_linhas)
+            if faixas and faixas[-1][1] == inicio:
+                faixas[-1] = (faixas[-1][0], fim)
+            else:
+                faixas.append((inicio, fim))
+        return faixas
+
+    def colunas_blocos(self, blocos: list | None = None) -> list:
+        """Arrays das colunas restritos aos blocos (sem cópia se forem contíguos)"""
+        faixas = self.faixas(blocos)
+        if len(faixas) == 1:
+            inicio, fim = faixas[0]
+            return [array[inicio:fim] for array in self.arrays]
+        return [
+            np.concatenate([array[inicio:fim] for inicio, fim in faixas]) if faixas else array[:0]
+            for array in self.arrays
+        ]
+
+    def trecho(self, inicio: int, fim: int) -> list:
+        """Linhas das posições [inicio, fim) como tuplas Python"""
+        return list(zip(*(
+            _valores_da_coluna(array[inicio:fim], tipo) for array, tipo in zip(self.arrays, self.tipos)
+        )))
+
+    def linhas(self, blocos: list | None = None):
+        """Linhas da tabela (ou só dos blocos indicados), convertidas um bloco por vez"""
+        for inicio, fim in self.faixas(blocos):
+            for bloco in range(inicio, fim, self.tamanho_bloco):
+                yield from self.trecho(bloco, min(bloco + self.tamanho_bloco, fim))
+
+    def indice(self, coluna: str, tipo: str):
+        """Índice sobre a coluna, construído com uma leitura da tabela e mantido em memória"""
+        return _indice_da_tabela(self, coluna, tipo)
+
+    def inserir(self, linhas):
+        raise TypeError(f"A tabela {self.nome} é somente leitura (colunar).")
+
+    def __repr__(self) -> str:
+        return f"TabelaColunar({self.nome}, {self.diretorio})"
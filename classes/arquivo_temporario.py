@@ -0,0 +1,65 @@
+"""
+Arquivo temporário para despejo (spill) de linhas em disco
+
+Usado pelos operadores com limite de memória (junção hash particionada,
+ordenação externa): as linhas são serializadas com `pickle` em lotes, o que
+mantém o custo por linha baixo, e o arquivo é apagado ao ser fechado.
+"""
+
+import pickle
+import tempfile
+
+# Linhas serializadas por vez (também o que cada arquivo retém em memória)
+TAMANHO_LOTE = 256
+
+
+class ArquivoTemporario:
+    """Sequência de linhas gravada em lotes num arquivo temporário"""
+
+    def __init__(self, diretorio: str | None = None):
+        # Sem buffer do Python: os lotes já são gravados de uma vez
+        self._arquivo = tempfile.TemporaryFile(dir=diretorio, buffering=0)
+        self._lote = []
+        self.num_linhas = 0
+        self.bytes_escritos = 0
+
+    def escrever(self, linha):
+        self._lote.append(linha)
+        self.num_linhas += 1
+        if len(self._lote) >= TAMANHO_LOTE:
+            self.concluir()
+
+    def escrever_todas(self, linhas):
+        for linha in linhas:
+            self.escrever(linha)
+
+    def concluir(self):
+        """Grava o lote pendente (bytes_escritos passa a refletir todas as linhas)"""
+        if self._lote:
+            dados = pickle.dumps(self._lote, protocol=pickle.HIGHEST_PROTOCOL)
+            self._arquivo.write(dados)
+            self.bytes_escritos += len(dados)
+            self._lote = []
+
+    def ler(self):
+        """Linhas na ordem em que foram escritas (pode ser chamado mais de uma vez)"""
+        self.concluir()
+        self._arquivo.seek(0)
+        while True:
+            try:
+                lote = pickle.load(self._arquivo)
+            except EOFError:
+                return
+            yield from lote
+
+    def fechar(self):
+        self._arquivo.close()
+
+    def __enter__(self) -> 'ArquivoTemporario':
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+    def __repr__(self) -> str:
+        return f"ArquivoTemporario({self.num_linhas} linhas, {self.bytes_escritos} bytes)"
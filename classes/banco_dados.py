@@ -0,0 +1,251 @@
+"""
+Armazenamento das tabelas usadas pelo executor
+
+As tabelas seguem o esquema do catálogo (`classes.catalogo`). Cada linha é
+uma tupla na ordem das colunas da tabela, com valores já convertidos para o
+tipo da coluna (INT → int, DECIMAL → float, demais → str; vazio → None).
+
+Tipos de tabela:
+- Tabela: linhas em memória
+- TabelaCSV: linhas lidas do arquivo sob demanda a cada scan (não materializa
+  e não tem leitura por posição, `trecho`)
+- TabelaColunar (`classes.armazenamento_colunar`): uma coluna por arquivo,
+  mapeada em memória, com mínimo/máximo por bloco (requer numpy)
+
+Os índices secundários declarados no catálogo são construídos sob demanda na
+primeira busca (`indice`) e descartados quando a versão da tabela muda
+(linhas novas ou, numa TabelaCSV, arquivo alterado).
+
+Cada tabela tem uma `versao`, única entre todas as tabelas do processo, que
+muda a cada inserção; carregar ou criar uma tabela de novo registra outro
+objeto, com versão nova. Caches de resultado (`classes.cache_resultados`)
+comparam as versões para nunca devolver linhas antigas.
+"""
+
+import csv
+import os
+from itertools import count
+
+from classes.catalogo import Catalogo, catalogo_padrao
+from classes.indices import construir_indice
+
+CONVERSORES = {
+    'INT': int,
+    'DECIMAL': float,
+}
+
+_versoes = count(1)
+
+
+def proxima_versao() -> int:
+    """Nova versão de tabela (nunca repetida no processo)"""
+    return next(_versoes)
+
+
+def _conversor(tipo: str):
+    funcao = CONVERSORES.get(tipo, str)
+
+    def converter(valor):
+        if valor is None or valor == '':
+            return None
+        return funcao(valor)
+    return converter
+
+
+class Tabela:
+    """Tabela com as linhas (tuplas) em memória"""
+
+    def __init__(self, nome: str, colunas: list, linhas=None):
+        self.nome = nome.upper()
+        self.colunas = [c.upper() for c in colunas]
+        self.esquema = [f"{self.nome}.{c}" for c in self.colunas]
+        self._linhas = list(linhas) if linhas is not None else []
+        self._indices = {}
+        self.versao = proxima_versao()
+
+    @property
+    def num_linhas(self) -> int:
+        return len(self._linhas)
+
+    def linhas(self):
+        return iter(self._linhas)
+
+    def trecho(self, inicio: int, fim: int) -> list:
+        """Linhas das posições [inicio, fim) (um "morsel" da execução paralela)"""
+        return self._linhas[inicio:fim]
+
+    def indice(self, coluna: str, tipo: str):
+        """Índice ('hash' ou 'ordenado') sobre a coluna; None se a tabela não a possui"""
+        return _indice_da_tabela(self, coluna, tipo)
+
+    def inserir(self, linhas):
+        self._linhas.extend(tuple(linha) for linha in linhas)
+        self._indices.clear()
+        self.versao = proxima_versao()
+
+    def __repr__(self) -> str:
+        return f"Tabela({self.nome}, {self.num_linhas} linhas)"
+
+
+class TabelaCSV:
+    """Tabela cujas linhas são lidas do CSV a cada scan (streaming)"""
+
+    def __init__(self, nome: str, caminho: str, colunas: list, conversores: list):
+        self.nome = nome.upper()
+        self.caminho = caminho
+        self.colunas = [c.upper() for c in colunas]
+        self.esquema = [f"{self.nome}.{c}" for c in self.colunas]
+        self._conversores = conversores
+        # (versão do arquivo, contagem): recontado quando o arquivo muda
+        self._num_linhas = None
+        self._indices = {}
+        self._versao = proxima_versao()
+
+    @property
+    def num_linhas(self) -> int:
+        versao = self.versao
+        if self._num_linhas is None or self._num_linhas[0] != versao:
+            with open(self.caminho, newline='', encoding='utf-8') as arquivo:
+                self._num_linhas = versao, max(0, sum(1 for _ in arquivo) - 1)
+        return self._num_linhas[1]
+
+    @property
+    def versao(self) -> tuple:
+        """Versão do registro + data de modificação e tamanho do arquivo (relido a cada scan)"""
+        estado = os.stat(self.caminho)
+        return self._versao, estado.st_mtime_ns, estado.st_size
+
+    def linhas(self):
+        conversores = self._conversores
+        with open(self.caminho, newline='', encoding='utf-8') as arquivo:
+            leitor = csv.reader(arquivo)
+            next(leitor, None)
+            for registro in leitor:
+                yield tuple(conv(valor) for conv, valor in zip(conversores, registro))
+
+    def indice(self, coluna: str, tipo: str):
+        """Índice sobre a coluna, construído com um scan do arquivo e mantido em memória"""
+        return _indice_da_tabela(self, coluna, tipo)
+
+    def inserir(self, linhas):
+        raise TypeError(f"A tabela {self.nome} é somente leitura (CSV).")
+
+    def __repr__(self) -> str:
+        return f"TabelaCSV({self.nome}, {self.caminho})"
+
+
+def _indice_da_tabela(tabela, coluna: str, tipo: str):
+    coluna = coluna.upper()
+    if coluna not in tabela.colunas:
+        return None
+    # Índices construídos sobre outra versão da tabela (ex: CSV alterado) são descartados
+    chave = (coluna, tipo, tabela.versao)
+    indice = tabela._indices.get(chave)
+    if indice is None:
+        tabela._indices = {c: i for c, i in tabela._indices.items() if c[2] == chave[2]}
+        indice = construir_indice(tipo, tabela.linhas(), tabela.colunas.index(coluna))
+        tabela._indices[chave] = indice
+    return indice
+
+
+class BancoDados:
+    """Conjunto de tabelas disponíveis para execução"""
+
+    def __init__(self, catalogo: Catalogo | None = None):
+        self.catalogo = catalogo if catalogo is not None else catalogo_padrao()
+        self.tabelas = {}
+
+    def _colunas_catalogo(self, nome: str) -> list:
+        tabela = self.catalogo.tabela(nome)
+        if tabela is None:
+            raise ValueError(f"Tabela inválida encontrada: {nome}")
+        return list(tabela.colunas)
+
+    def _conversores(self, nome: str, colunas: list) -> list:
+        return [_conversor(self.catalogo.tipo_coluna(nome, c) or '') for c in colunas]
+
+    def _tipos(self, tabela) -> list:
+        return [self.catalogo.tipo_coluna(tabela.nome, c) for c in tabela.colunas]
+
+    def criar_tabela(self, nome: str, linhas=(), colunas: list | None = None) -> Tabela:
+        """
+        Cria (ou substitui) uma tabela em memória
+
+        Args:
+            nome: Nome da tabela no catálogo
+            linhas: Tuplas já no tipo correto, na ordem de `colunas`
+            colunas: Ordem das colunas (padrão: ordem do catálogo)
+        """
+        colunas = colunas or self._colunas_catalogo(nome)
+        tabela = Tabela(nome, colunas, linhas)
+        self.tabelas[tabela.nome] = tabela
+        return tabela
+
+    def carregar_csv(self, nome: str, caminho: str, em_memoria: bool = True):
+        """
+        Registra uma tabela a partir de um CSV com cabeçalho
+
+        Args:
+            nome: Nome da tabela no catálogo
+            caminho: Arquivo CSV (a primeira linha contém os nomes das colunas)
+            em_memoria: Se False, o arquivo é relido a cada scan em vez de carregado
+        """
+        with open(caminho, newline='', encoding='utf-8') as arquivo:
+            cabecalho = next(csv.reader(arquivo), [])
+        colunas = [c.strip().upper() for c in cabecalho]
+        for coluna in colunas:
+            if not self.catalogo.existe_coluna(nome, coluna):
+                raise ValueError(f"Coluna inválida encontrada: {nome}.{coluna}")
+
+        conversores = self._conversores(nome, colunas)
+        tabela = TabelaCSV(nome, caminho, colunas, conversores)
+        if em_memoria:
+            tabela = Tabela(nome, colunas, tabela.linhas())
+        self.tabelas[tabela.nome] = tabela
+        return tabela
+
+    def carregar_diretorio(self, diretorio: str, em_memoria: bool = True):
+        """Carrega `<TABELA>.csv` (nome sem diferenciar maiúsculas) para cada tabela do catálogo"""
+        arquivos = {
+            os.path.splitext(nome)[0].upper(): os.path.join(diretorio, nome)
+            for nome in os.listdir(diretorio) if nome.lower().endswith('.csv')
+        }
+        for nome in self.catalogo.tabelas:
+            if nome in arquivos:
+                self.carregar_csv(nome, arquivos[nome], em_memoria=em_memoria)
+
+    def salvar_colunar(self, diretorio: str, tamanho_bloco: int | None = None) -> list:
+        """
+        Grava as tabelas carregadas no formato colunar (`<diretorio>/<TABELA>/`)
+
+        Returns:
+            Diretórios das tabelas gravadas
+        """
+        from classes.armazenamento_colunar import TAMANHO_BLOCO, salvar_tabela
+        return [
+            salvar_tabela(tabela, diretorio, self._tipos(tabela), tamanho_bloco or TAMANHO_BLOCO)
+            for tabela in self.tabelas.values()
+        ]
+
+    def carregar_colunar(self, diretorio: str):
+        """Registra as tabelas do catálogo gravadas por `salvar_colunar` (mapeadas, sem carregar)"""
+        from classes.armazenamento_colunar import ARQUIVO_ZONAS, TabelaColunar
+        for nome in self.catalogo.tabelas:
+            caminho = os.path.join(diretorio, nome)
+            if not os.path.isfile(os.path.join(caminho, ARQUIVO_ZONAS)):
+                continue
+            tabela = TabelaColunar(caminho)
+            for coluna in tabela.colunas:
+                if not self.catalogo.existe_coluna(nome, coluna):
+                    raise ValueError(f"Coluna inválida encontrada: {nome}.{coluna}")
+            self.tabelas[tabela.nome] = tabela
+
+    def tabela(self, nome: str):
+        tabela = self.tabelas.get(nome.upper())
+        if tabela is None:
+            raise ValueError(f"Tabela sem dados carregados: {nome}")
+        return tabela
+
+    def versao_tabela(self, nome: str):
+        """Versão atual da tabela (muda a cada carga ou inserção)"""
+        return self.tabela(nome).versao
@@ -0,0 +1,120 @@
+"""
+Cache LRU limitado por número de entradas (ou por bytes)
+
+Usado para memoizar resultados caros (parse, planos, resultados de
+queries) por uma chave normalizada. Mantém contadores de acertos, falhas e
+despejos.
+"""
+
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """Dicionário com capacidade máxima e despejo do item menos usado recentemente"""
+
+    def __init__(self, capacidade: int = 1024):
+        if capacidade <= 0:
+            raise ValueError("A capacidade do cache deve ser positiva.")
+        self.capacidade = capacidade
+        self._itens = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+
+    def obter(self, chave, padrao=None, valido=None):
+        """
+        Retorna o valor associado à chave (marcando-o como recente) ou `padrao`
+
+        `valido`: função valor -> bool opcional; um valor guardado que ela
+        rejeita (ex: desatualizado) é removido e conta como falha.
+        """
+        try:
+            valor = self._itens[chave]
+        except KeyError:
+            self.falhas += 1
+            return padrao
+        if valido is not None and not valido(valor):
+            self.remover(chave)
+            self.falhas += 1
+            return padrao
+        self._itens.move_to_end(chave)
+        self.acertos += 1
+        return valor
+
+    def guardar(self, chave, valor):
+        """Insere/atualiza a chave, despejando a entrada mais antiga se necessário"""
+        if chave in self._itens:
+            self._itens.move_to_end(chave)
+        self._itens[chave] = valor
+        while len(self._itens) > self.capacidade:
+            self._itens.popitem(last=False)
+            self.despejos += 1
+
+    def remover(self, chave):
+        self._itens.pop(chave, None)
+
+    def limpar(self):
+        self._itens.clear()
+
+    def __contains__(self, chave) -> bool:
+        return chave in self._itens
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+    def estatisticas(self) -> dict:
+        """Contadores de uso do cache"""
+        consultas = self.acertos + self.falhas
+        return {
+            'entradas': len(self._itens),
+            'capacidade': self.capacidade,
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'despejos': self.despejos,
+            'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+        }
+
+
+class CacheLRUBytes(CacheLRU):
+    """CacheLRU limitado pela soma dos tamanhos (em bytes) dos valores, não pelo número de entradas"""
+
+    def __init__(self, capacidade_bytes: int, tamanho):
+        """
+        Args:
+            capacidade_bytes: Soma máxima dos tamanhos dos valores guardados
+            tamanho: Função valor -> tamanho em bytes (calculada uma vez, ao guardar)
+        """
+        super().__init__(capacidade_bytes)
+        self.tamanho = tamanho
+        self._tamanhos = {}
+        self.bytes = 0
+
+    def guardar(self, chave, valor):
+        """Insere/atualiza a chave, despejando as entradas mais antigas até caber"""
+        tamanho = self.tamanho(valor)
+        self.remover(chave)
+        if tamanho > self.capacidade:
+            # Maior que o cache inteiro: não é guardado (nem despeja os demais)
+            return
+        self._itens[chave] = valor
+        self._tamanhos[chave] = tamanho
+        self.bytes += tamanho
+        while self.bytes > self.capacidade:
+            antiga, _ = self._itens.popitem(last=False)
+            self.bytes -= self._tamanhos.pop(antiga)
+            self.despejos += 1
+
+    def remover(self, chave):
+        if chave in self._itens:
+            del self._itens[chave]
+            self.bytes -= self._tamanhos.pop(chave)
+
+    def limpar(self):
+        super().limpar()
+        self._tamanhos.clear()
+        self.bytes = 0
+
+    def estatisticas(self) -> dict:
+        estatisticas = super().estatisticas()
+        estatisticas['bytes'] = self.bytes
+        return estatisticas
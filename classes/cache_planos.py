@@ -0,0 +1,204 @@
+"""
+Cache de planos parametrizado
+
+Queries que só diferem nos literais (`WHERE CLIENTE.IDCLIENTE = 17` e
+`= 18`) têm o mesmo formato e recebem o mesmo plano. O cache guarda a
+otimização de cada formato com os literais trocados por marcadores (a
+posição do literal na query) e, num acerto, só religa os literais da nova
+query: as heurísticas não são executadas de novo.
+
+A chave é o parsed sem os literais (`normalizar_consulta` sobre o
+dicionário serializado) mais o padrão de repetição dos literais: se a
+query repete um literal, as heurísticas podem ter deduplicado os
+predicados, e uma query com literais diferentes nessas posições precisa
+de outro plano.
+
+As escolhas de custo (ordem das junções, índices, algoritmos) são as
+estimadas com os literais da primeira query do formato. As estimativas
+dependem das estatísticas e dos índices do catálogo: quando
+`versao_estatisticas` ou `versao_indices` muda, o cache é esvaziado.
+
+Planos com literal que não veio da query (constante criada por uma
+heurística) não são parametrizáveis e não são guardados.
+"""
+
+import json
+import threading
+
+from classes.cache_lru import CacheLRU
+from classes.catalogo import catalogo_padrao
+from classes.normalizacao import RE_LITERAL, normalizar_consulta, religar_literais, separar_literais
+from classes.otimizador import Otimizador, RegistroPasso, ResultadoOtimizacao
+
+CAPACIDADE_PADRAO = 1024
+
+
+class _Texto:
+    """Texto do plano com literais: trechos fixos + posição de cada literal na query"""
+    __slots__ = ('trechos', 'posicoes')
+
+    def __init__(self, trechos: list, posicoes: list):
+        self.trechos = trechos
+        self.posicoes = posicoes
+
+    def ligar(self, literais: list, memo: dict) -> str:
+        return religar_literais(self.trechos, [literais[p] for p in self.posicoes])
+
+
+class _Composto:
+    """Dicionário, lista ou tupla do plano com algum texto parametrizado"""
+    __slots__ = ('tipo', 'itens')
+
+    def __init__(self, tipo, itens: list):
+        self.tipo = tipo
+        # (chave ou None, modelo do valor)
+        self.itens = itens
+
+    def ligar(self, literais: list, memo: dict):
+        # Partes compartilhadas entre os planos dos passos continuam compartilhadas
+        valor = memo.get(id(self))
+        if valor is None:
+            if self.tipo is dict:
+                valor = {chave: _ligar(item, literais, memo) for chave, item in self.itens}
+            else:
+                valor = self.tipo(_ligar(item, literais, memo) for _, item in self.itens)
+            memo[id(self)] = valor
+        return valor
+
+
+def _ligar(modelo, literais: list, memo: dict):
+    if isinstance(modelo, (_Texto, _Composto)):
+        return modelo.ligar(literais, memo)
+    return modelo
+
+
+def _modelo(valor, posicoes: dict, memo: dict):
+    """
+    Modelo de uma parte do plano (a própria parte, se não tiver literais)
+
+    Raises:
+        KeyError: a parte tem um literal que não aparece na query
+    """
+    if isinstance(valor, str):
+        trechos = separar_literais(valor)
+        if len(trechos) == 1:
+            return valor
+        return _Texto(trechos, [posicoes[literal] for literal in RE_LITERAL.findall(valor)])
+    if not isinstance(valor, (dict, list, tuple)):
+        return valor
+    if id(valor) in memo:
+        return memo[id(valor)]
+    if isinstance(valor, dict):
+        itens = [(chave, _modelo(item, posicoes, memo)) for chave, item in valor.items()]
+    else:
+        itens = [(None, _modelo(item, posicoes, memo)) for item in valor]
+    if any(isinstance(item, (_Texto, _Composto)) for _, item in itens):
+        modelo = _Composto(type(valor), itens)
+    else:
+        modelo = valor
+    memo[id(valor)] = modelo
+    return modelo
+
+
+class _Entrada:
+    """Otimização de um formato de query, com os literais trocados por marcadores"""
+    __slots__ = ('final', 'planos', 'registros', 'iteracoes')
+
+    def __init__(self, otimizacao: ResultadoOtimizacao, posicoes: dict):
+        memo = {}
+        self.final = _modelo(otimizacao.final, posicoes, memo)
+        self.planos = [(nome, iteracao, _modelo(plano, posicoes, memo))
+                       for nome, iteracao, plano in otimizacao.planos]
+        # Num acerto nenhum passo é executado: tempo zero
+        self.registros = [RegistroPasso(r.passo, r.iteracao, 0.0, list(r.mudancas)) for r in otimizacao.registros]
+        self.iteracoes = otimizacao.iteracoes
+
+    def ligar(self, original: dict, literais: list) -> ResultadoOtimizacao:
+        memo = {}
+        planos = [(nome, iteracao, _ligar(plano, literais, memo)) for nome, iteracao, plano in self.planos]
+        return ResultadoOtimizacao(original, _ligar(self.final, literais, memo), planos, list(self.registros),
+                                   self.iteracoes)
+
+
+def formato_consulta(parsed_query: dict) -> tuple:
+    """
+    (chave do formato, literais) de um parsed
+
+    A chave é o parsed serializado sem os literais, mais a posição da
+    primeira ocorrência de cada literal (o padrão de repetição).
+    """
+    serializado = json.dumps(parsed_query, sort_keys=True, ensure_ascii=False)
+    impressao, literais = normalizar_consulta(serializado)
+    primeiras = {}
+    padrao = tuple(primeiras.setdefault(literal, i) for i, literal in enumerate(literais))
+    return (impressao, padrao), literais
+
+
+class CachePlanos:
+    """Otimizador com cache LRU de planos parametrizados pelos literais"""
+
+    def __init__(self, otimizador: Otimizador | None = None, capacidade: int = CAPACIDADE_PADRAO,
+                 catalogo=None):
+        """
+        Args:
+            otimizador: Otimizador executado nas falhas (padrão: passos padrão)
+            capacidade: Máximo de formatos de query em cache
+            catalogo: Catálogo cujas estatísticas/índices invalidam o cache
+                (padrão: o catálogo padrão, usado pelas heurísticas)
+        """
+        self.otimizador = otimizador if otimizador is not None else Otimizador()
+        self.catalogo = catalogo if catalogo is not None else catalogo_padrao()
+        self.cache = CacheLRU(capacidade)
+        self.invalidacoes = 0
+        self.nao_parametrizaveis = 0
+        self._versao = self._versao_catalogo()
+        # Compartilhável entre threads (ex: sessões do app)
+        self._trava = threading.Lock()
+
+    def _versao_catalogo(self) -> tuple:
+        return self.catalogo.versao_estatisticas, self.catalogo.versao_indices
+
+    def _validar_versao(self):
+        versao = self._versao_catalogo()
+        if versao != self._versao:
+            self.cache.limpar()
+            self._versao = versao
+            self.invalidacoes += 1
+
+    def otimizar(self, parsed_query: dict) -> ResultadoOtimizacao:
+        """Mesmo resultado de `Otimizador.otimizar`, sem executar os passos para formatos já vistos"""
+        chave, literais = formato_consulta(parsed_query)
+        with self._trava:
+            self._validar_versao()
+            entrada = self.cache.obter(chave)
+        if entrada is not None:
+            return entrada.ligar(parsed_query, literais)
+
+        otimizacao = self.otimizador.otimizar(parsed_query)
+        posicoes = {}
+        for i, literal in enumerate(literais):
+            posicoes.setdefault(literal, i)
+        try:
+            entrada = _Entrada(otimizacao, posicoes)
+        except KeyError:
+            entrada = None
+        # Religado com os próprios literais, o modelo tem de reproduzir o plano
+        if entrada is None or entrada.ligar(parsed_query, literais).final != otimizacao.final:
+            with self._trava:
+                self.nao_parametrizaveis += 1
+            return otimizacao
+        with self._trava:
+            self.cache.guardar(chave, entrada)
+        return otimizacao
+
+    def limpar(self):
+        with self._trava:
+            self.cache.limpar()
+
+    def estatisticas(self) -> dict:
+        """Contadores do cache LRU (acertos, falhas, taxa de acerto...) e invalidações"""
+        with self._trava:
+            estatisticas = self.cache.estatisticas()
+            estatisticas['invalidacoes'] = self.invalidacoes
+            estatisticas['nao_parametrizaveis'] = self.nao_parametrizaveis
+        return estatisticas
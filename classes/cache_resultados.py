@@ -0,0 +1,120 @@
+"""
+Cache de resultados de queries com invalidação pela versão das tabelas
+
+Para painéis que repetem as mesmas queries sobre tabelas que mudam pouco
+(CATEGORIA, STATUS, TIPOCLIENTE...), guarda as linhas do resultado de cada
+query. A chave é a impressão digital do parsed (`impressao_plano`), e cada
+entrada guarda a versão (`BancoDados.versao_tabela`) de cada tabela que a
+query lê. Toda carga ou inserção muda a versão da tabela: num acerto as
+versões são conferidas e, se alguma mudou, a entrada é descartada e a
+query é executada de novo, então um resultado antigo nunca é devolvido.
+
+O cache é limitado pelo tamanho estimado das linhas guardadas (bytes) e
+despeja as entradas usadas há mais tempo.
+"""
+
+import sys
+import threading
+
+from classes.cache_lru import CacheLRUBytes
+from classes.executor import Executor
+from classes.operadores import tamanho_linha
+from classes.plano import impressao_plano
+
+CAPACIDADE_BYTES_PADRAO = 64 * 1024 * 1024
+
+
+class ResultadoCache:
+    """Resultado de uma query servido pelo cache (ou executado e guardado nele)"""
+
+    def __init__(self, colunas: list, linhas: tuple, acerto: bool):
+        self.colunas = colunas
+        self._linhas = linhas
+        # True se veio do cache, sem executar a query
+        self.acerto = acerto
+
+    def __iter__(self):
+        return iter(self._linhas)
+
+    def linhas(self) -> list:
+        return list(self._linhas)
+
+
+class _Entrada:
+    __slots__ = ('versoes', 'colunas', 'linhas', 'tamanho')
+
+    def __init__(self, versoes: tuple, colunas: list, linhas: tuple):
+        self.versoes = versoes
+        self.colunas = colunas
+        self.linhas = linhas
+        self.tamanho = sys.getsizeof(linhas) + sum(map(tamanho_linha, linhas))
+
+
+def tabelas_consulta(parsed_query: dict) -> list:
+    """Tabelas lidas pela query (FROM e JOINs), sem repetição"""
+    tabelas = [parsed_query['FROM']] + [j['tabela'] for j in parsed_query.get('INNER_JOIN', []) or []]
+    return sorted({t.upper() for t in tabelas})
+
+
+class CacheResultados:
+    """Executa queries guardando os resultados por query e versão das tabelas"""
+
+    def __init__(self, banco, executor=None, otimizador=None,
+                 capacidade_bytes: int = CAPACIDADE_BYTES_PADRAO):
+        """
+        Args:
+            banco: Tabelas consultadas (fonte das versões)
+            executor: Executor usado nas falhas, com `executar(parsed)`
+                (padrão: `Executor(banco)`)
+            otimizador: Se informado (`Otimizador` ou `CachePlanos`), as
+                queries são otimizadas antes de executar nas falhas
+            capacidade_bytes: Tamanho máximo estimado das linhas guardadas
+        """
+        self.banco = banco
+        self.executor = executor if executor is not None else Executor(banco)
+        self.otimizador = otimizador
+        self.cache = CacheLRUBytes(capacidade_bytes, lambda entrada: entrada.tamanho)
+        self.invalidacoes = 0
+        # Compartilhável entre threads (ex: sessões do app)
+        self._trava = threading.Lock()
+
+    def _versoes(self, parsed_query: dict) -> tuple:
+        return tuple((nome, self.banco.versao_tabela(nome)) for nome in tabelas_consulta(parsed_query))
+
+    def executar(self, parsed_query: dict) -> ResultadoCache:
+        """Linhas da query: do cache, se nenhuma tabela lida mudou desde a execução guardada"""
+        impressao = impressao_plano(parsed_query)
+        # Versões lidas antes de executar: se a tabela mudar durante a execução,
+        # a entrada já nasce desatualizada e é descartada na próxima consulta
+        versoes = self._versoes(parsed_query)
+
+        def atualizada(entrada) -> bool:
+            if entrada.versoes == versoes:
+                return True
+            self.invalidacoes += 1
+            return False
+
+        with self._trava:
+            entrada = self.cache.obter(impressao, valido=atualizada)
+        if entrada is not None:
+            return ResultadoCache(entrada.colunas, entrada.linhas, acerto=True)
+
+        plano = parsed_query
+        if self.otimizador is not None:
+            plano = self.otimizador.otimizar(parsed_query).final
+        resultado = self.executor.executar(plano)
+        entrada = _Entrada(versoes, list(resultado.colunas), tuple(resultado.linhas()))
+        with self._trava:
+            self.cache.guardar(impressao, entrada)
+        return ResultadoCache(entrada.colunas, entrada.linhas, acerto=False)
+
+    def limpar(self):
+        with self._trava:
+            self.cache.limpar()
+
+    def estatisticas(self) -> dict:
+        """Contadores do cache (acertos, falhas, taxa de acerto, bytes...) e invalidações"""
+        with self._trava:
+            estatisticas = self.cache.estatisticas()
+            estatisticas['invalidacoes'] = self.invalidacoes
+        return estatisticas
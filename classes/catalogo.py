@@ -0,0 +1,259 @@
+"""
+Catálogo de esquema
+
+Guarda as tabelas e colunas do banco em dicionários indexados pelo nome em
+maiúsculas, permitindo resolver nomes em O(1) independentemente do tamanho
+do esquema. Cada coluna tem tipo; cada tabela tem chave primária, chaves
+estrangeiras e índices secundários (hash ou ordenado). Estatísticas coletadas por `classes.estatisticas.analisar`
+também ficam aqui, com um contador de versão que muda a cada atualização.
+
+O catálogo padrão é construído a partir de `consts`; também é possível
+carregá-lo de um arquivo JSON no formato:
+
+    {
+      "tabelas": [
+        {
+          "nome": "Cliente",
+          "colunas": [{"nome": "idCliente", "tipo": "INT"}, ...],
+          "chave_primaria": ["idCliente"],
+          "chaves_estrangeiras": [
+            {"coluna": "TipoCliente_idTipoCliente",
+             "tabela_referencia": "TipoCliente",
+             "coluna_referencia": "idTipoCliente"}
+          ],
+          "indices": [{"coluna": "TipoCliente_idTipoCliente", "tipo": "hash"}]
+        }
+      ]
+    }
+"""
+
+import json
+
+from classes.indices import TIPOS_INDICE
+from consts import CHAVES_ESTRANGEIRAS, CHAVES_PRIMARIAS, COLUNAS, INDICES, TABELAS, TIPOS_COLUNAS
+
+TIPO_PADRAO = 'VARCHAR'
+
+
+class ColunaCatalogo:
+    """Coluna de uma tabela do catálogo"""
+    __slots__ = ('nome', 'tipo')
+
+    def __init__(self, nome: str, tipo: str = TIPO_PADRAO):
+        self.nome = nome
+        self.tipo = tipo.upper()
+
+    def __repr__(self) -> str:
+        return f"ColunaCatalogo({self.nome} {self.tipo})"
+
+
+class IndiceCatalogo:
+    """Declaração de um índice secundário ('hash' ou 'ordenado') sobre uma coluna"""
+    __slots__ = ('tabela', 'coluna', 'tipo')
+
+    def __init__(self, tabela: str, coluna: str, tipo: str):
+        self.tabela = tabela.upper()
+        self.coluna = coluna.upper()
+        self.tipo = tipo
+
+    @property
+    def nome(self) -> str:
+        return f"{self.tabela}.{self.coluna} ({self.tipo})"
+
+    def __repr__(self) -> str:
+        return f"IndiceCatalogo({self.nome})"
+
+
+class TabelaCatalogo:
+    """Tabela do catálogo com colunas indexadas por nome (maiúsculo)"""
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.colunas = {}
+        self.chave_primaria = []
+        # coluna (maiúscula) -> (TABELA, COLUNA) referenciada, em maiúsculas
+        self.chaves_estrangeiras = {}
+        # (COLUNA, tipo) -> IndiceCatalogo
+        self.indices = {}
+
+    def adicionar_coluna(self, nome: str, tipo: str = TIPO_PADRAO):
+        self.colunas[nome.upper()] = ColunaCatalogo(nome, tipo)
+
+    def coluna(self, nome: str) -> ColunaCatalogo | None:
+        return self.colunas.get(nome.upper())
+
+    def __repr__(self) -> str:
+        return f"TabelaCatalogo({self.nome}, {len(self.colunas)} colunas)"
+
+
+class Catalogo:
+    """Conjunto de tabelas do esquema com resolução de nomes por hash"""
+
+    def __init__(self):
+        self.tabelas = {}
+        # TABELA -> EstatisticasTabela (preenchido pelo ANALYZE)
+        self.estatisticas = {}
+        self.versao_estatisticas = 0
+        self.versao_indices = 0
+
+    def adicionar_tabela(self, nome: str) -> TabelaCatalogo:
+        tabela = self.tabelas.get(nome.upper())
+        if tabela is None:
+            tabela = TabelaCatalogo(nome)
+            self.tabelas[nome.upper()] = tabela
+        return tabela
+
+    def tabela(self, nome: str) -> TabelaCatalogo | None:
+        return self.tabelas.get(nome.upper())
+
+    def existe_tabela(self, nome: str) -> bool:
+        return nome.upper() in self.tabelas
+
+    def existe_coluna(self, tabela: str, coluna: str) -> bool:
+        entrada = self.tabelas.get(tabela.upper())
+        return entrada is not None and coluna.upper() in entrada.colunas
+
+    def tipo_coluna(self, tabela: str, coluna: str) -> str | None:
+        entrada = self.tabelas.get(tabela.upper())
+        if entrada is None:
+            return None
+        col = entrada.coluna(coluna)
+        return col.tipo if col else None
+
+    def resolver_coluna(self, coluna: str, tabelas_consulta) -> str | None:
+        """
+        Descobre a tabela de uma coluna não qualificada
+
+        Args:
+            coluna: Nome da coluna sem tabela
+            tabelas_consulta: Tabelas presentes na query (FROM e JOINs)
+
+        Returns:
+            Nome da primeira tabela da query que possui a coluna, ou None
+        """
+        for tabela in tabelas_consulta:
+            if self.existe_coluna(tabela, coluna):
+                return tabela
+        return None
+
+    def chave_estrangeira(self, tabela: str, coluna: str) -> tuple | None:
+        """(TABELA, COLUNA) referenciada pela coluna, se ela for chave estrangeira"""
+        entrada = self.tabelas.get(tabela.upper())
+        if entrada is None:
+            return None
+        return entrada.chaves_estrangeiras.get(coluna.upper())
+
+    def definir_indice(self, tabela: str, coluna: str, tipo: str = 'hash') -> IndiceCatalogo:
+        """
+        Declara um índice secundário
+
+        Args:
+            tabela, coluna: Coluna indexada
+            tipo: 'hash' (igualdade) ou 'ordenado' (igualdade e intervalos)
+        """
+        if tipo not in TIPOS_INDICE:
+            raise ValueError(f"Tipo de índice inválido: {tipo}")
+        entrada = self.tabelas.get(tabela.upper())
+        if entrada is None:
+            raise ValueError(f"Tabela inválida encontrada: {tabela}")
+        if entrada.coluna(coluna) is None:
+            raise ValueError(f"Coluna inválida encontrada: {tabela}.{coluna}")
+        indice = IndiceCatalogo(entrada.nome, coluna, tipo)
+        entrada.indices[(indice.coluna, tipo)] = indice
+        self.versao_indices += 1
+        return indice
+
+    def indices_coluna(self, tabela: str, coluna: str) -> list:
+        """Índices declarados sobre a coluna (vazio se não houver)"""
+        entrada = self.tabelas.get(tabela.upper())
+        if entrada is None or not entrada.indices:
+            return []
+        coluna = coluna.upper()
+        return [indice for (nome, _tipo), indice in entrada.indices.items() if nome == coluna]
+
+    def definir_estatisticas(self, tabela: str, estatisticas):
+        self.estatisticas[tabela.upper()] = estatisticas
+        self.versao_estatisticas += 1
+
+    def estatisticas_tabela(self, tabela: str):
+        return self.estatisticas.get(tabela.upper())
+
+    def estatisticas_coluna(self, tabela: str, coluna: str):
+        estatisticas = self.estatisticas.get(tabela.upper())
+        return estatisticas.coluna(coluna) if estatisticas is not None else None
+
+    @classmethod
+    def de_consts(cls) -> 'Catalogo':
+        """Constrói o catálogo a partir de TABELAS, COLUNAS e metadados de `consts`"""
+        catalogo = cls()
+        for nome in TABELAS:
+            catalogo.adicionar_tabela(nome)
+        for qualificado in COLUNAS:
+            nome_tabela, nome_coluna = qualificado.split('.', 1)
+            tabela = catalogo.adicionar_tabela(nome_tabela)
+            tabela.adicionar_coluna(nome_coluna, TIPOS_COLUNAS.get(qualificado, TIPO_PADRAO))
+        for nome_tabela, chave in CHAVES_PRIMARIAS.items():
+            catalogo.adicionar_tabela(nome_tabela).chave_primaria = [c.upper() for c in chave]
+        for origem, destino in CHAVES_ESTRANGEIRAS:
+            tabela_origem, coluna_origem = origem.upper().split('.', 1)
+            tabela_destino, coluna_destino = destino.upper().split('.', 1)
+            catalogo.tabelas[tabela_origem].chaves_estrangeiras[coluna_origem] = (
+                tabela_destino, coluna_destino
+            )
+        for qualificado, tipo in INDICES:
+            nome_tabela, nome_coluna = qualificado.split('.', 1)
+            catalogo.definir_indice(nome_tabela, nome_coluna, tipo)
+        return catalogo
+
+    @classmethod
+    def de_dict(cls, dados: dict) -> 'Catalogo':
+        catalogo = cls()
+        for definicao in dados.get('tabelas', []):
+            tabela = catalogo.adicionar_tabela(definicao['nome'])
+            for coluna in definicao.get('colunas', []):
+                if isinstance(coluna, str):
+                    tabela.adicionar_coluna(coluna)
+                else:
+                    tabela.adicionar_coluna(coluna['nome'], coluna.get('tipo', TIPO_PADRAO))
+            tabela.chave_primaria = [c.upper() for c in definicao.get('chave_primaria', [])]
+            for fk in definicao.get('chaves_estrangeiras', []):
+                tabela.chaves_estrangeiras[fk['coluna'].upper()] = (
+                    fk['tabela_referencia'].upper(), fk['coluna_referencia'].upper()
+                )
+            for indice in definicao.get('indices', []):
+                catalogo.definir_indice(definicao['nome'], indice['coluna'], indice.get('tipo', 'hash'))
+        return catalogo
+
+    @classmethod
+    def de_json(cls, caminho: str) -> 'Catalogo':
+        """Carrega o catálogo de um arquivo JSON (formato descrito no módulo)"""
+        with open(caminho, encoding='utf-8') as arquivo:
+            return cls.de_dict(json.load(arquivo))
+
+    def para_dict(self) -> dict:
+        tabelas = []
+        for tabela in self.tabelas.values():
+            tabelas.append({
+                'nome': tabela.nome,
+                'colunas': [{'nome': c.nome, 'tipo': c.tipo} for c in tabela.colunas.values()],
+                'chave_primaria': list(tabela.chave_primaria),
+                'chaves_estrangeiras': [
+                    {'coluna': coluna, 'tabela_referencia': ref[0], 'coluna_referencia': ref[1]}
+                    for coluna, ref in tabela.chaves_estrangeiras.items()
+                ],
+                'indices': [
+                    {'coluna': indice.coluna, 'tipo': indice.tipo} for indice in tabela.indices.values()
+                ],
+            })
+        return {'tabelas': tabelas}
+
+
+_catalogo_padrao = None
+
+
+def catalogo_padrao() -> Catalogo:
+    """Catálogo construído de `consts`, criado uma única vez por processo"""
+    global _catalogo_padrao
+    if _catalogo_padrao is None:
+        _catalogo_padrao = Catalogo.de_consts()
+    return _catalogo_padrao
@@ -0,0 +1,124 @@
+"""
+Estatísticas das tabelas (equivalente a um ANALYZE)
+
+Para cada tabela coleta o número de linhas e, por coluna, a quantidade de
+valores distintos, nulos, mínimo, máximo e um histograma equi-depth (cada
+balde contém aproximadamente o mesmo número de valores). As estatísticas
+ficam no catálogo e alimentam o `EstimadorCardinalidade`.
+"""
+
+from bisect import bisect_left, bisect_right
+
+NUM_BALDES_PADRAO = 16
+
+
+class EstatisticasColuna:
+    """Resumo da distribuição de valores de uma coluna"""
+    __slots__ = ('total', 'distintos', 'nulos', 'minimo', 'maximo', 'limites')
+
+    def __init__(self, total: int, distintos: int, nulos: int, minimo, maximo, limites: list):
+        self.total = total
+        self.distintos = distintos
+        self.nulos = nulos
+        self.minimo = minimo
+        self.maximo = maximo
+        # Limites dos baldes do histograma equi-depth (len = baldes + 1)
+        self.limites = limites
+
+    @classmethod
+    def de_valores(cls, valores: list, num_baldes: int = NUM_BALDES_PADRAO) -> 'EstatisticasColuna':
+        presentes = sorted(v for v in valores if v is not None)
+        nulos = len(valores) - len(presentes)
+        if not presentes:
+            return cls(len(valores), 0, nulos, None, None, [])
+
+        baldes = max(1, min(num_baldes, len(presentes)))
+        ultimo = len(presentes) - 1
+        limites = [presentes[(ultimo * i) // baldes] for i in range(baldes + 1)]
+        return cls(len(valores), len(set(presentes)), nulos, presentes[0], presentes[-1], limites)
+
+    @property
+    def fracao_nao_nulos(self) -> float:
+        return 1 - self.nulos / self.total if self.total else 0.0
+
+    def fracao_menor(self, valor, inclusivo: bool = False) -> float:
+        """
+        Fração estimada dos valores não nulos menores (ou iguais) a `valor`
+
+        Localiza o balde do histograma e interpola linearmente dentro dele
+        quando os limites são numéricos.
+        """
+        limites = self.limites
+        if not limites:
+            return 0.0
+        if valor < limites[0] or (valor == limites[0] and not inclusivo):
+            return 0.0
+        if valor > limites[-1] or (valor == limites[-1] and inclusivo):
+            return 1.0
+
+        baldes = len(limites) - 1
+        busca = bisect_right if inclusivo else bisect_left
+        posicao = min(max(busca(limites, valor) - 1, 0), baldes - 1)
+        inferior, superior = limites[posicao], limites[posicao + 1]
+        if isinstance(valor, (int, float)) and superior != inferior:
+            dentro = (valor - inferior) / (superior - inferior)
+        else:
+            dentro = 0.5
+        return min(1.0, (posicao + dentro) / baldes)
+
+    def __repr__(self) -> str:
+        return (
+            f"EstatisticasColuna(distintos={self.distintos}, nulos={self.nulos}, "
+            f"min={self.minimo!r}, max={self.maximo!r})"
+        )
+
+
+class EstatisticasTabela:
+    """Número de linhas e estatísticas por coluna (nomes em maiúsculas)"""
+
+    def __init__(self, num_linhas: int, colunas: dict):
+        self.num_linhas = num_linhas
+        self.colunas = colunas
+
+    def coluna(self, nome: str) -> EstatisticasColuna | None:
+        return self.colunas.get(nome.upper())
+
+    def __repr__(self) -> str:
+        return f"EstatisticasTabela({self.num_linhas} linhas, {len(self.colunas)} colunas)"
+
+
+def analisar_tabela(tabela, num_baldes: int = NUM_BALDES_PADRAO) -> EstatisticasTabela:
+    """Percorre a tabela uma vez e resume cada coluna"""
+    valores_por_coluna = [[] for _ in tabela.colunas]
+    num_linhas = 0
+    for linha in tabela.linhas():
+        num_linhas += 1
+        for valores, valor in zip(valores_por_coluna, linha):
+            valores.append(valor)
+
+    colunas = {
+        nome: EstatisticasColuna.de_valores(valores, num_baldes)
+        for nome, valores in zip(tabela.colunas, valores_por_coluna)
+    }
+    return EstatisticasTabela(num_linhas, colunas)
+
+
+def analisar(banco, tabelas=None, num_baldes: int = NUM_BALDES_PADRAO) -> dict:
+    """
+    Coleta estatísticas das tabelas do banco e as registra no catálogo
+
+    Args:
+        banco: BancoDados com as tabelas carregadas
+        tabelas: Nomes a analisar (padrão: todas as tabelas carregadas)
+        num_baldes: Número de baldes dos histogramas
+
+    Returns:
+        Dicionário nome da tabela -> EstatisticasTabela
+    """
+    nomes = tabelas if tabelas is not None else list(banco.tabelas)
+    resultado = {}
+    for nome in nomes:
+        estatisticas = analisar_tabela(banco.tabela(nome), num_baldes)
+        banco.catalogo.definir_estatisticas(nome, estatisticas)
+        resultado[nome.upper()] = estatisticas
+    return resultado
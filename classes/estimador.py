@@ -0,0 +1,154 @@
+"""
+Estimativa de cardinalidade dos operadores
+
+Usado pelo executor para decisões físicas (ex: qual lado da junção vira a
+tabela hash) e pela reordenação de junções baseada em custo.
+
+Com estatísticas no catálogo (`classes.estatisticas.analisar`), usa número
+de linhas, valores distintos, mínimo/máximo e histogramas equi-depth das
+colunas. Sem elas, aplica seletividades padrão por tipo de predicado, no
+estilo dos otimizadores clássicos (System R).
+"""
+
+from classes.plano import Coluna, Comparacao, Conjuncao, Disjuncao, Literal
+from classes.predicados import OPERADORES_INVERTIDOS, converter_literal
+
+# Seletividades padrão por operador de comparação
+SELETIVIDADE_IGUALDADE = 0.1
+SELETIVIDADE_DESIGUALDADE = 0.9
+SELETIVIDADE_INTERVALO = 1 / 3
+SELETIVIDADE_GENERICA = 0.5
+
+# Linhas assumidas para tabelas sem estatísticas
+LINHAS_PADRAO = 1000
+
+
+class EstimadorCardinalidade:
+    """Estima o número de linhas produzidas por scans, seleções e junções"""
+
+    def __init__(self, catalogo=None):
+        self.catalogo = catalogo
+
+    def _estatisticas_coluna(self, coluna):
+        if self.catalogo is None or not isinstance(coluna, Coluna) or coluna.tabela is None:
+            return None
+        return self.catalogo.estatisticas_coluna(coluna.tabela, coluna.nome)
+
+    def linhas_tabela(self, nome: str) -> float:
+        """Linhas da tabela segundo as estatísticas (ou LINHAS_PADRAO)"""
+        if self.catalogo is not None:
+            estatisticas = self.catalogo.estatisticas_tabela(nome)
+            if estatisticas is not None:
+                return float(estatisticas.num_linhas)
+        return float(LINHAS_PADRAO)
+
+    def _seletividade_literal(self, coluna: Coluna, operador: str, literal: Literal) -> float | None:
+        """Seletividade de `coluna <op> literal` pelo histograma; None sem estatísticas"""
+        estatisticas = self._estatisticas_coluna(coluna)
+        if estatisticas is None:
+            return None
+        valor = converter_literal(literal, self.catalogo.tipo_coluna(coluna.tabela, coluna.nome))
+        try:
+            return self._fracao_literal(estatisticas, operador, valor) * estatisticas.fracao_nao_nulos
+        except TypeError:
+            # Literal de tipo incompatível com os valores da coluna
+            return None
+
+    @staticmethod
+    def _fracao_literal(estatisticas, operador: str, valor) -> float:
+        """Fração dos valores não nulos que satisfazem `<op> valor`"""
+        if operador == '=':
+            if estatisticas.distintos == 0 or not (estatisticas.minimo <= valor <= estatisticas.maximo):
+                return 0.0
+            return 1 / estatisticas.distintos
+        if operador in ('!=', '<>'):
+            return 1 - 1 / estatisticas.distintos if estatisticas.distintos else 0.0
+        if operador == '<':
+            return estatisticas.fracao_menor(valor)
+        if operador == '<=':
+            return estatisticas.fracao_menor(valor, inclusivo=True)
+        if operador == '>':
+            return 1 - estatisticas.fracao_menor(valor, inclusivo=True)
+        if operador == '>=':
+            return 1 - estatisticas.fracao_menor(valor)
+        return SELETIVIDADE_INTERVALO
+
+    def seletividade(self, predicado) -> float:
+        if isinstance(predicado, Conjuncao):
+            seletividade = 1.0
+            for termo in predicado.termos:
+                seletividade *= self.seletividade(termo)
+            return seletividade
+        if isinstance(predicado, Disjuncao):
+            # Termos independentes: P(a ou b) = 1 - (1 - P(a)) * (1 - P(b))
+            nenhum = 1.0
+            for termo in predicado.termos:
+                nenhum *= 1 - self.seletividade(termo)
+            return 1 - nenhum
+        if not isinstance(predicado, Comparacao):
+            return SELETIVIDADE_GENERICA
+
+        esquerda, operador, direita = predicado.esquerda, predicado.operador, predicado.direita
+        if isinstance(esquerda, Literal) and isinstance(direita, Coluna):
+            esquerda, direita = direita, esquerda
+            operador = OPERADORES_INVERTIDOS[operador]
+        if isinstance(esquerda, Coluna) and isinstance(direita, Literal):
+            estimada = self._seletividade_literal(esquerda, operador, direita)
+            if estimada is not None:
+                return estimada
+        elif operador == '=' and isinstance(esquerda, Coluna) and isinstance(direita, Coluna):
+            estimada = self.seletividade_juncao(predicado)
+            if estimada is not None:
+                return estimada
+
+        if operador == '=':
+            return SELETIVIDADE_IGUALDADE
+        if operador in ('!=', '<>'):
+            return SELETIVIDADE_DESIGUALDADE
+        return SELETIVIDADE_INTERVALO
+
+    def seletividade_juncao(self, predicado, linhas_esq: float | None = None,
+                            linhas_dir: float | None = None) -> float | None:
+        """
+        Seletividade de uma igualdade entre colunas: 1 / max(distintos)
+
+        Sem estatísticas das duas colunas, usa o número de linhas das tabelas
+        (como se as colunas fossem chaves), se informado; senão None.
+        """
+        distintos = [
+            estatisticas.distintos
+            for estatisticas in map(self._estatisticas_coluna, (predicado.esquerda, predicado.direita))
+            if estatisticas is not None
+        ]
+        if len(distintos) == 2:
+            return 1 / max(max(distintos), 1)
+        if linhas_esq and linhas_dir:
+            return 1 / max(linhas_esq, linhas_dir)
+        return None
+
+    def scan(self, tabela) -> float:
+        return float(tabela.num_linhas)
+
+    def selecao(self, linhas: float, predicados: list) -> float:
+        for predicado in predicados:
+            linhas *= self.seletividade(predicado)
+        return max(linhas, 1.0) if linhas else 0.0
+
+    def juncao(self, linhas_esq: float, linhas_dir: float, chaves: list, residuais: list) -> float:
+        """
+        Estimativa de uma junção
+
+        Args:
+            linhas_esq, linhas_dir: Estimativas das entradas
+            chaves: Pares de colunas da equi-junção (vazio = produto cartesiano)
+            residuais: Demais predicados avaliados sobre a linha combinada
+        """
+        seletividades = [self.seletividade_juncao(chave) for chave in chaves]
+        if None in seletividades:
+            # Equi-junção típica de chave estrangeira: cada linha do maior lado casa com uma do menor
+            linhas = max(linhas_esq, linhas_dir)
+        else:
+            linhas = linhas_esq * linhas_dir
+            for seletividade in seletividades:
+                linhas *= seletividade
+        return self.selecao(linhas, residuais)
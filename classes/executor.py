@@ -0,0 +1,436 @@
+"""
+Executor de planos de álgebra relacional
+
+Recebe a query parseada (original ou otimizada pelas heurísticas), constrói
+o plano lógico com `classes.plano` e o traduz para operadores físicos do
+modelo iterador (`classes.operadores`), executados sobre as tabelas de um
+`BancoDados`.
+
+Predicados que referenciam colunas ainda indisponíveis num ponto do plano
+(ex: condição de JOIN sobre uma tabela que só entra mais acima depois de uma
+reordenação) são adiados até o primeiro operador em que todas as suas
+colunas existem, preservando a semântica da query.
+
+Tabelas com caminho de acesso por índice (`AcessoIndice` no Scan) são lidas
+pelo índice da tabela: busca no dicionário (hash) ou busca binária sobre as
+chaves ordenadas (intervalos).
+
+Junções com igualdades entre colunas dos dois lados usam o algoritmo
+anotado pelo otimizador (`HeuristicaAlgoritmoJuncao`): merge (pedindo aos
+filhos leitura em ordem da chave quando há índice ordenado), busca em índice
+da tabela da direita (index nested loop) ou laços aninhados. Sem anotação,
+usam junção hash, construindo a tabela hash sobre a entrada de menor
+cardinalidade estimada; as demais usam laços aninhados.
+
+Em tabelas colunares (`classes.armazenamento_colunar`), os filtros aplicados
+logo acima do scan também escolhem quais blocos ler, pelo mínimo/máximo de
+cada bloco.
+
+Folhas com redução por semijunção (⋉, anotada por `HeuristicaSemijuncao`)
+leem antes a folha filtrada da outra tabela da igualdade e só repassam as
+linhas cuja chave está no filtro montado com ela (conjunto ou Bloom).
+
+Com `memoria_maxima`, as junções hash e as ordenações das junções merge
+despejam em disco o que não couber no limite (ver `classes.operadores`).
+"""
+
+from classes.banco_dados import BancoDados
+from classes.estimador import EstimadorCardinalidade
+from classes.explicacao import ExplicacaoPlano
+from classes.operadores import (
+    OperadorBuscaIndice,
+    OperadorJuncaoHash,
+    OperadorJuncaoIndice,
+    OperadorJuncaoLacos,
+    OperadorJuncaoMerge,
+    OperadorProjecao,
+    OperadorScan,
+    OperadorSelecao,
+    OperadorSemijuncao,
+)
+from classes.plano import (
+    Juncao,
+    Projecao,
+    Scan,
+    Selecao,
+    Semijuncao,
+    conjuncoes,
+    construir_plano,
+    juntar_conjuncoes,
+)
+from classes.predicados import (
+    TIPOS_NUMERICOS,
+    compilar_conjuncao,
+    converter_literal,
+    filtro_literal,
+    tipo_da_coluna,
+)
+
+
+class ResultadoExecucao:
+    """Resultado de uma execução: colunas + linhas produzidas sob demanda"""
+
+    def __init__(self, raiz):
+        self.raiz = raiz
+        self.colunas = list(raiz.esquema.colunas)
+
+    def __iter__(self):
+        return iter(self.raiz)
+
+    def linhas(self) -> list:
+        """Consome o resultado inteiro e retorna as linhas"""
+        return list(self.raiz)
+
+    def metricas(self) -> list:
+        """
+        Linhas produzidas por operador (pré-ordem), após consumir o resultado
+
+        Operadores com limite de memória informam também o limite e os bytes
+        despejados em disco.
+        """
+        metricas = []
+        for op in self.raiz.percorrer():
+            metrica = {'operador': op.descricao(), 'linhas': op.linhas_produzidas}
+            if op.memoria_maxima is not None:
+                metrica.update(memoria_maxima=op.memoria_maxima, bytes_despejados=op.bytes_despejados)
+            metricas.append(metrica)
+        return metricas
+
+    def total_linhas_processadas(self) -> int:
+        """Soma das linhas produzidas por todos os operadores (medida de trabalho)"""
+        return sum(op.linhas_produzidas for op in self.raiz.percorrer())
+
+
+class Executor:
+    """Traduz o plano lógico em operadores físicos e o executa"""
+
+    def __init__(self, banco: BancoDados, estimador: EstimadorCardinalidade | None = None,
+                 memoria_maxima: int | None = None):
+        """
+        Args:
+            banco: Tabelas a consultar
+            estimador: Estimador de cardinalidade (padrão: sobre o catálogo do banco)
+            memoria_maxima: Limite, em bytes, da memória de cada junção hash ou
+                ordenação; acima dele as linhas vão para disco (None: sem limite)
+        """
+        if memoria_maxima is not None and memoria_maxima <= 0:
+            raise ValueError(f"Limite de memória inválido: {memoria_maxima}")
+        self.banco = banco
+        self.catalogo = banco.catalogo
+        self.estimador = estimador if estimador is not None else EstimadorCardinalidade(self.catalogo)
+        self.memoria_maxima = memoria_maxima
+
+    def _separar_aplicaveis(self, predicados: list, esquema) -> tuple:
+        aplicaveis = [p for p in predicados if esquema.contem(p)]
+        restantes = [p for p in predicados if not esquema.contem(p)]
+        return aplicaveis, restantes
+
+    def _selecao(self, filho, predicados: list):
+        predicado = compilar_conjuncao(predicados, filho.esquema, self.catalogo)
+        operador = OperadorSelecao(filho, predicado, juntar_conjuncoes(predicados))
+        operador.linhas_estimadas = self.estimador.selecao(filho.linhas_estimadas, predicados)
+        return operador
+
+    def _busca_indice(self, tabela, acesso):
+        """Operador de leitura por índice (ou scan + σ se a tabela não tiver a coluna)"""
+        indice = tabela.indice(acesso.coluna.nome, acesso.indice)
+        if indice is None:
+            scan = OperadorScan(tabela)
+            scan.linhas_estimadas = self.estimador.scan(tabela)
+            return self._selecao(scan, list(acesso.predicados))
+
+        tipo = self.catalogo.tipo_coluna(tabela.nome, acesso.coluna.nome)
+        parametros = {}
+        for predicado in acesso.predicados:
+            _coluna, operador, literal = filtro_literal(predicado)
+            valor = converter_literal(literal, tipo)
+            if operador == '=':
+                parametros.update(igualdade=True, valor=valor)
+            elif operador in ('>', '>='):
+                parametros.update(igualdade=False, minimo=valor, inclui_minimo=operador == '>=')
+            else:
+                parametros.update(igualdade=False, maximo=valor, inclui_maximo=operador == '<=')
+        operador = OperadorBuscaIndice(tabela, indice, acesso.condicao, **parametros)
+        operador.linhas_estimadas = self.estimador.selecao(
+            self.estimador.scan(tabela), list(acesso.predicados)
+        )
+        return operador
+
+    @staticmethod
+    def _descartar_blocos(operador, predicados: list):
+        """Scan de tabela colunar logo abaixo da σ: lê só os blocos que os zone maps admitem"""
+        while isinstance(operador, (OperadorSelecao, OperadorProjecao)):
+            operador = operador.filhos[0]
+        if not isinstance(operador, OperadorScan) or not hasattr(operador.tabela, 'blocos_candidatos'):
+            return
+        blocos = operador.tabela.blocos_candidatos(predicados)
+        if operador.blocos is not None:
+            mantidos = set(operador.blocos)
+            blocos = [bloco for bloco in blocos if bloco in mantidos]
+        operador.blocos = blocos
+
+    def _leitura_ordenada(self, tabela, coluna: str | None):
+        """Leitura da tabela inteira em ordem da coluna (índice ordenado), ou None"""
+        if coluna is None:
+            return None
+        nome_tabela, _, nome_coluna = coluna.partition('.')
+        if nome_tabela != tabela.nome:
+            return None
+        if not any(i.tipo == 'ordenado' for i in self.catalogo.indices_coluna(tabela.nome, nome_coluna)):
+            return None
+        indice = tabela.indice(nome_coluna, 'ordenado')
+        if indice is None:
+            return None
+        operador = OperadorBuscaIndice(tabela, indice, None, igualdade=False)
+        operador.linhas_estimadas = self.estimador.scan(tabela)
+        return operador
+
+    def _semijuncao(self, filho, fonte, no: Semijuncao):
+        """Filtro de junção do filho pelas chaves da fonte (sem a igualdade entre os dois, o filho segue sem filtro)"""
+        for predicado in no.predicados:
+            if not predicado.eh_equijuncao:
+                continue
+            a, b = predicado.esquerda, predicado.direita
+            i, j = filho.esquema.indice(a), fonte.esquema.indice(b)
+            if i is None or j is None:
+                i, j = filho.esquema.indice(b), fonte.esquema.indice(a)
+            if i is None or j is None:
+                continue
+            operador = OperadorSemijuncao(filho, fonte, i, j, no.condicao)
+            # Fração das linhas do filho que passa: a da tabela da fonte que sobrevive aos filtros
+            base = fonte
+            while base.filhos:
+                base = base.filhos[0]
+            fracao = (fonte.linhas_estimadas or 0.0) / max(self.estimador.scan(base.tabela), 1.0)
+            operador.linhas_estimadas = (filho.linhas_estimadas or 0.0) * min(fracao, 1.0)
+            return operador
+        return filho
+
+    def _projecao(self, filho, colunas: list):
+        indices = []
+        for nome in colunas:
+            indice = filho.esquema.indice_nome(nome)
+            if indice is None:
+                raise ValueError(f"Coluna indisponível para projeção: {nome}")
+            indices.append(indice)
+        operador = OperadorProjecao(filho, indices)
+        operador.linhas_estimadas = filho.linhas_estimadas
+        return operador
+
+    def _chaves_equijuncao(self, predicados: list, esquerda, direita) -> tuple:
+        """
+        Separa as igualdades coluna-coluna entre os dois lados (chaves hash)
+
+        Returns:
+            (pares (indice_esq, indice_dir), predicados de chave, predicados residuais)
+        """
+        pares = []
+        chaves = []
+        residuais = []
+        for predicado in predicados:
+            if predicado.eh_equijuncao:
+                a, b = predicado.esquerda, predicado.direita
+                i_esq, i_dir = esquerda.esquema.indice(a), direita.esquema.indice(b)
+                if i_esq is None or i_dir is None:
+                    i_esq, i_dir = esquerda.esquema.indice(b), direita.esquema.indice(a)
+                if i_esq is not None and i_dir is not None:
+                    pares.append((i_esq, i_dir))
+                    chaves.append(predicado)
+                    continue
+            residuais.append(predicado)
+        return pares, chaves, residuais
+
+    @staticmethod
+    def _tabelas(no) -> set:
+        if isinstance(no, Scan):
+            return {no.tabela.upper()}
+        if isinstance(no, Semijuncao):
+            # A fonte só filtra: as linhas (e colunas) são as do filho
+            return Executor._tabelas(no.filho)
+        return set().union(*(Executor._tabelas(filho) for filho in no.filhos()))
+
+    def _ordem_merge(self, no: Juncao) -> tuple:
+        """Colunas (esquerda, direita) da chave de uma junção merge, ou (None, None)"""
+        if no.algoritmo != 'merge':
+            return None, None
+        tabelas_dir = self._tabelas(no.direita)
+        tabelas_esq = self._tabelas(no.esquerda)
+        for predicado in no.predicados:
+            if not predicado.eh_equijuncao:
+                continue
+            a, b = predicado.esquerda, predicado.direita
+            if a.tabela and a.tabela.upper() in tabelas_dir:
+                a, b = b, a
+            if a.tabela and b.tabela and a.tabela.upper() in tabelas_esq and b.tabela.upper() in tabelas_dir:
+                return a.qualificado.upper(), b.qualificado.upper()
+        return None, None
+
+    def _mesmo_dominio(self, chaves: list, esquema) -> bool:
+        """Chaves comparáveis por ordem (ambos os lados numéricos ou ambos não)"""
+        for predicado in chaves:
+            tipos = [tipo_da_coluna(c, esquema, self.catalogo) for c in predicado.colunas]
+            if len({tipo in TIPOS_NUMERICOS for tipo in tipos if tipo is not None}) > 1:
+                return False
+        return True
+
+    def _juncao_indice(self, esquerda, direita, pares: list, residual, condicao: str):
+        """
+        Junção por busca no índice da tabela da direita, ou None se a direita
+        não for uma folha (tabela base sob σ/π) com índice na coluna da chave
+        """
+        etapas = []
+        base = direita
+        while isinstance(base, (OperadorSelecao, OperadorProjecao)):
+            if isinstance(base, OperadorSelecao):
+                etapas.append(('filtro', base.predicado))
+            else:
+                etapas.append(('projecao', base.indices))
+            base = base.filhos[0]
+        if not isinstance(base, (OperadorScan, OperadorBuscaIndice)):
+            return None
+        if isinstance(base, OperadorBuscaIndice) and base.condicao:
+            # As condições resolvidas pelo índice da folha viram um filtro
+            predicados = list(conjuncoes(base.condicao))
+            etapas.append(('filtro', compilar_conjuncao(predicados, base.esquema, self.catalogo)))
+        etapas.reverse()
+
+        tabela = base.tabela
+        i_esq, i_dir = pares[0]
+        nome_coluna = direita.esquema.colunas[i_dir].partition('.')[2]
+        # Prefere o índice hash (busca O(1)) ao ordenado
+        tipos = sorted(i.tipo for i in self.catalogo.indices_coluna(tabela.nome, nome_coluna))
+        indice = tabela.indice(nome_coluna, tipos[0]) if tipos else None
+        if indice is None:
+            return None
+        return OperadorJuncaoIndice(esquerda, direita.esquema, tabela, indice, i_esq,
+                                    etapas, residual, condicao)
+
+    def _juncao(self, no: Juncao, esquerda, direita, predicados: list):
+        esquema = esquerda.esquema + direita.esquema
+        pares, chaves, residuais = self._chaves_equijuncao(predicados, esquerda, direita)
+        linhas_estimadas = self.estimador.juncao(
+            esquerda.linhas_estimadas, direita.linhas_estimadas, chaves, residuais
+        )
+        condicao = juntar_conjuncoes(predicados)
+
+        operador = None
+        if pares and no.algoritmo == 'indice' and self._mesmo_dominio(chaves[:1], esquema):
+            # Demais igualdades de chave ficam no predicado residual
+            restantes = chaves[1:] + residuais
+            residual = compilar_conjuncao(restantes, esquema, self.catalogo) if restantes else None
+            operador = self._juncao_indice(esquerda, direita, pares, residual, condicao)
+        elif pares and no.algoritmo == 'merge' and self._mesmo_dominio(chaves, esquema):
+            residual = compilar_conjuncao(residuais, esquema, self.catalogo) if residuais else None
+            operador = OperadorJuncaoMerge(
+                esquerda, direita, [i for i, _ in pares], [j for _, j in pares], residual, condicao,
+                memoria_maxima=self.memoria_maxima,
+            )
+
+        if operador is None and pares and no.algoritmo != 'loop':
+            residual = compilar_conjuncao(residuais, esquema, self.catalogo) if residuais else None
+            operador = OperadorJuncaoHash(
+                esquerda, direita,
+                [i for i, _ in pares], [j for _, j in pares],
+                residual, condicao,
+                # Constrói a tabela hash sobre a menor entrada estimada
+                constroi_direita=direita.linhas_estimadas <= esquerda.linhas_estimadas,
+                memoria_maxima=self.memoria_maxima,
+            )
+
+        if operador is None:
+            predicado = compilar_conjuncao(predicados, esquema, self.catalogo) if predicados else None
+            operador = OperadorJuncaoLacos(esquerda, direita, predicado, condicao)
+
+        operador.linhas_estimadas = linhas_estimadas
+        return operador
+
+    def _construir(self, no, ordem: str | None = None) -> tuple:
+        """
+        Constrói os operadores físicos de um nó lógico
+
+        Args:
+            no: Nó do plano lógico
+            ordem: Coluna (qualificada) em cuja ordem a saída deveria vir, se
+                der para obtê-la sem ordenar (pedido de uma junção merge)
+
+        Returns:
+            (operador, predicados pendentes que ainda não puderam ser aplicados)
+        """
+        if isinstance(no, Scan):
+            tabela = self.banco.tabela(no.tabela)
+            if no.acesso is not None:
+                return self._busca_indice(tabela, no.acesso), []
+            operador = self._leitura_ordenada(tabela, ordem)
+            if operador is None:
+                operador = OperadorScan(tabela)
+                operador.linhas_estimadas = self.estimador.scan(tabela)
+            return operador, []
+
+        if isinstance(no, Projecao):
+            filho, pendentes = self._construir(no.filho, ordem)
+            return self._projecao(filho, no.colunas), pendentes
+
+        if isinstance(no, Selecao):
+            filho, pendentes = self._construir(no.filho, ordem)
+            aplicaveis, restantes = self._separar_aplicaveis(
+                pendentes + list(no.predicados), filho.esquema
+            )
+            if aplicaveis:
+                self._descartar_blocos(filho, aplicaveis)
+                filho = self._selecao(filho, aplicaveis)
+            return filho, restantes
+
+        if isinstance(no, Semijuncao):
+            filho, pendentes = self._construir(no.filho, ordem)
+            fonte, _pendentes = self._construir(no.fonte)
+            return self._semijuncao(filho, fonte, no), pendentes
+
+        if isinstance(no, Juncao):
+            ordem_esq, ordem_dir = self._ordem_merge(no)
+            if ordem_esq is None and no.algoritmo in ('indice', 'loop'):
+                # Percorrem a esquerda em sequência: a ordem pedida se mantém
+                ordem_esq = ordem
+            esquerda, pendentes_esq = self._construir(no.esquerda, ordem_esq)
+            direita, pendentes_dir = self._construir(no.direita, ordem_dir)
+            aplicaveis, restantes = self._separar_aplicaveis(
+                pendentes_esq + pendentes_dir + list(no.predicados),
+                esquerda.esquema + direita.esquema,
+            )
+            return self._juncao(no, esquerda, direita, aplicaveis), restantes
+
+        raise TypeError(f"Nó de plano desconhecido: {no!r}")
+
+    def preparar(self, parsed_query: dict):
+        """
+        Constrói a árvore de operadores físicos para a query parseada
+
+        Args:
+            parsed_query: Dicionário do Parser (ou de uma heurística)
+
+        Returns:
+            Operador raiz (iterável)
+        """
+        raiz, pendentes = self._construir(construir_plano(parsed_query))
+        if pendentes:
+            raise ValueError(
+                f"Condição referencia coluna indisponível no plano: {juntar_conjuncoes(pendentes)}"
+            )
+        return raiz
+
+    def executar(self, parsed_query: dict) -> ResultadoExecucao:
+        """Prepara e retorna o resultado (as linhas são produzidas ao iterar)"""
+        return ResultadoExecucao(self.preparar(parsed_query))
+
+    def explicar(self, parsed_query: dict, analisar: bool = False, memoria: bool = True) -> ExplicacaoPlano:
+        """
+        EXPLAIN (estimativas por operador) ou EXPLAIN ANALYZE (executa e mede)
+
+        Args:
+            parsed_query: Dicionário do Parser (ou de uma heurística)
+            analisar: Se True, executa o plano e mede linhas, tempo e memória
+            memoria: Com `analisar`, mede também a memória (tracemalloc)
+        """
+        raiz = self.preparar(parsed_query)
+        if analisar:
+            return ExplicacaoPlano.analisar(raiz, memoria=memoria)
+        return ExplicacaoPlano(raiz)
@@ -0,0 +1,373 @@
+"""
+Execução paralela por partições (vários processos)
+
+O plano físico é o mesmo do `Executor` (construído uma vez, no processo
+coordenador); o executor paralelo o divide em etapas e distribui cada etapa
+entre os processos de um pool:
+
+1. folhas: a leitura de cada tabela base é dividida em trechos de
+   TAMANHO_MORSEL linhas ("morsels"); cada tarefa aplica ao trecho a σ/π
+   antecipados da folha e particiona a saída pelo hash da chave da junção
+   que a consome
+2. junções (em ordem, left-deep): a partição p da esquerda é juntada com a
+   partição p da direita (mesma chave ⇒ mesma partição) e a saída é
+   particionada pela chave da junção seguinte; após a última junção são
+   aplicados a σ do WHERE e a π do SELECT
+3. o coordenador concatena as partições do resultado
+
+Junções sem igualdade entre colunas (laços aninhados) não podem ser
+particionadas pela chave: a direita é replicada para todas as partições da
+esquerda. A junção por busca em índice também só divide a esquerda, e cada
+processo consulta o índice da tabela da direita. Junções merge são
+executadas como hash nas partições (a ordem não importa dentro delas).
+Os filtros de junção (⋉) das folhas são montados pelo coordenador, que lê
+as suas fontes antes de distribuir os morsels. Tabelas CSV, que só podem
+ser lidas em sequência, também são lidas uma vez pelo coordenador; os
+morsels são fatias dessas linhas.
+
+Os operadores compilados (predicados) não são serializáveis: os processos
+são criados por `fork` depois que o plano é montado e herdam o plano e as
+tabelas do coordenador; entre as etapas trafegam só as linhas das
+partições. Sem `fork` na plataforma (ou com `processos=1`) as mesmas etapas
+rodam no próprio processo.
+
+O resultado tem as mesmas linhas do `Executor`, mas não necessariamente na
+mesma ordem.
+"""
+
+import multiprocessing
+import os
+import time
+from operator import itemgetter
+
+from classes.executor import Executor
+from classes.operadores import (
+    OperadorBuscaIndice,
+    OperadorJuncaoHash,
+    OperadorJuncaoIndice,
+    OperadorJuncaoLacos,
+    OperadorJuncaoMerge,
+    OperadorLinhas,
+    OperadorProjecao,
+    OperadorScan,
+    OperadorSelecao,
+    OperadorSemijuncao,
+)
+from classes.predicados import Esquema
+
+TAMANHO_MORSEL = 10_000
+
+# Plano da execução em andamento, herdado pelos processos do pool via fork
+_plano_atual = None
+
+
+def _particionador(posicoes: list | None, num_particoes: int):
+    """Função linhas -> lista de partições (hash da chave), ou None se não houver chave"""
+    if posicoes is None:
+        return None
+    extrair = itemgetter(*posicoes)
+    composta = len(posicoes) > 1
+
+    def particionar(linhas) -> list:
+        particoes = [[] for _ in range(num_particoes)]
+        for linha in linhas:
+            chave = extrair(linha)
+            # Chaves nulas nunca casam numa junção interna: a linha é descartada
+            if chave is None or (composta and None in chave):
+                continue
+            particoes[hash(chave) % num_particoes].append(linha)
+        return particoes
+
+    return particionar
+
+
+def _cadeia(operador) -> tuple:
+    """(σ/π/⋉ acima do operador, de cima para baixo; primeiro operador que não é σ/π/⋉)"""
+    cadeia = []
+    while isinstance(operador, (OperadorSelecao, OperadorProjecao, OperadorSemijuncao)):
+        cadeia.append(operador)
+        operador = operador.filhos[0]
+    return cadeia, operador
+
+
+def _aplicar_cadeia(cadeia: list, entrada):
+    """Recria a cadeia de σ/π/⋉ sobre outro operador de entrada"""
+    for operador in reversed(cadeia):
+        if isinstance(operador, OperadorSelecao):
+            entrada = OperadorSelecao(entrada, operador.predicado, operador.condicao)
+        elif isinstance(operador, OperadorSemijuncao):
+            # O filtro já foi construído pelo coordenador: a fonte não é relida
+            entrada = OperadorSemijuncao(
+                entrada, operador.filhos[1], operador.indice, operador.indice_fonte, operador.condicao,
+                filtro=operador.filtro,
+            )
+        else:
+            entrada = OperadorProjecao(entrada, operador.indices)
+    return entrada
+
+
+class _Folha:
+    """Leitura de uma tabela base (Scan ou busca por índice) com a σ/π da folha"""
+
+    def __init__(self, cadeia: list, base):
+        if not isinstance(base, (OperadorScan, OperadorBuscaIndice)):
+            raise ValueError(f"Folha não suportada na execução paralela: {base.descricao()}")
+        self.cadeia = cadeia
+        self.base = base
+        # Filtros de junção (⋉) montados uma vez no coordenador, antes do fork
+        for operador in cadeia:
+            if isinstance(operador, OperadorSemijuncao):
+                operador.construir_filtro()
+        self.descricao = base.descricao()
+        self.particionar = None
+        # Linhas lidas uma vez pelo coordenador: as de uma busca por índice (o
+        # índice já foi construído) e as de tabelas sem leitura por posição
+        # (CSV), que seriam relidas do início a cada morsel
+        self._linhas = None
+        if isinstance(base, OperadorBuscaIndice) or not hasattr(base.tabela, 'trecho'):
+            self._linhas = list(base._gerar())
+
+    def faixas(self) -> list:
+        """Intervalos [inicio, fim) de posições a ler (só os blocos mantidos pelos zone maps)"""
+        if self._linhas is not None:
+            return [(0, len(self._linhas))]
+        if self.base.blocos is not None:
+            return self.base.tabela.faixas(self.base.blocos)
+        return [(0, self.base.tabela.num_linhas)]
+
+    def trecho(self, inicio: int, fim: int) -> list:
+        if self._linhas is not None:
+            return self._linhas[inicio:fim]
+        return self.base.tabela.trecho(inicio, fim)
+
+    def executar(self, inicio: int, fim: int):
+        entrada = OperadorLinhas(self.base.esquema, self.trecho(inicio, fim), self.descricao)
+        linhas = list(_aplicar_cadeia(self.cadeia, entrada))
+        return self.particionar(linhas) if self.particionar else linhas
+
+
+class _Juncao:
+    """Uma junção do plano left-deep, com a σ/π aplicada logo acima dela"""
+
+    def __init__(self, operador, cadeia: list):
+        self.operador = operador
+        self.cadeia = cadeia
+        self.descricao = operador.descricao()
+        self.esquema_esq = operador.filhos[0].esquema
+        # Na busca por índice a direita não é um filho: só as suas colunas no esquema de saída
+        self.esquema_dir = Esquema(operador.esquema.colunas[len(self.esquema_esq.colunas):])
+        self.folha = None
+        self.posicoes_esq = None
+        self.posicoes_dir = None
+        if isinstance(operador, (OperadorJuncaoHash, OperadorJuncaoMerge)):
+            self.posicoes_esq = operador.indices_esq
+            self.posicoes_dir = operador.indices_dir
+        self.particionar = None
+
+    @property
+    def particionada(self) -> bool:
+        """Se True, as duas entradas são particionadas pela chave; senão a direita é replicada"""
+        return self.posicoes_esq is not None
+
+    def _recriar(self, esquerda, linhas_dir):
+        operador = self.operador
+        if isinstance(operador, OperadorJuncaoIndice):
+            return OperadorJuncaoIndice(
+                esquerda, self.esquema_dir, operador.tabela, operador.indice, operador.indice_esq,
+                operador.etapas, operador.residual, operador.condicao,
+            )
+        direita = OperadorLinhas(operador.filhos[1].esquema, linhas_dir, 'partição')
+        if isinstance(operador, OperadorJuncaoLacos):
+            return OperadorJuncaoLacos(esquerda, direita, operador.predicado, operador.condicao)
+        return OperadorJuncaoHash(
+            esquerda, direita, operador.indices_esq, operador.indices_dir,
+            operador.residual, operador.condicao,
+            # Merge vira hash na partição: constrói sobre o menor lado
+            constroi_direita=getattr(operador, 'constroi_direita', len(linhas_dir) <= len(esquerda.linhas)),
+            memoria_maxima=operador.memoria_maxima,
+        )
+
+    def executar(self, linhas_esq: list, linhas_dir: list | None):
+        esquerda = OperadorLinhas(self.esquema_esq, linhas_esq, 'partição')
+        linhas = list(_aplicar_cadeia(self.cadeia, self._recriar(esquerda, linhas_dir)))
+        return self.particionar(linhas) if self.particionar else linhas
+
+
+class _PlanoParalelo:
+    """Etapas (folhas e junções left-deep) extraídas do plano físico"""
+
+    def __init__(self, raiz, num_particoes: int):
+        cadeia, base = _cadeia(raiz)
+        self.juncoes = []
+        while not isinstance(base, (OperadorScan, OperadorBuscaIndice)):
+            if isinstance(base, OperadorJuncaoIndice):
+                juncao = _Juncao(base, cadeia)
+            elif isinstance(base, (OperadorJuncaoHash, OperadorJuncaoMerge, OperadorJuncaoLacos)):
+                juncao = _Juncao(base, cadeia)
+                juncao.folha = _Folha(*_cadeia(base.filhos[1]))
+            else:
+                raise ValueError(f"Operador não suportado na execução paralela: {base.descricao()}")
+            self.juncoes.append(juncao)
+            cadeia, base = _cadeia(base.filhos[0])
+        self.juncoes.reverse()
+        self.folha_inicial = _Folha(cadeia, base)
+        self.esquema = raiz.esquema
+
+        # Cada etapa particiona a sua saída pela chave de quem a consome
+        for i, juncao in enumerate(self.juncoes):
+            anterior = self.juncoes[i - 1] if i else self.folha_inicial
+            anterior.particionar = _particionador(juncao.posicoes_esq, num_particoes)
+            if juncao.folha is not None:
+                juncao.folha.particionar = _particionador(juncao.posicoes_dir, num_particoes)
+
+    def folhas(self) -> list:
+        return [self.folha_inicial] + [j.folha for j in self.juncoes if j.folha is not None]
+
+
+def _tarefa_folha(indice: int, inicio: int, fim: int):
+    return _plano_atual.folhas()[indice].executar(inicio, fim)
+
+
+def _tarefa_juncao(indice: int, linhas_esq: list, linhas_dir: list | None):
+    return _plano_atual.juncoes[indice].executar(linhas_esq, linhas_dir)
+
+
+class ResultadoParalelo:
+    """Resultado da execução paralela: colunas, linhas e métricas por etapa"""
+
+    def __init__(self, colunas: list, linhas: list, etapas: list, tempo_total: float):
+        self.colunas = colunas
+        self._linhas = linhas
+        self.etapas = etapas
+        self.tempo_total = tempo_total
+
+    def __iter__(self):
+        return iter(self._linhas)
+
+    def linhas(self) -> list:
+        return self._linhas
+
+    def metricas(self) -> list:
+        """Uma entrada por etapa: tarefas, linhas produzidas e tempo (ms)"""
+        return self.etapas
+
+
+class ExecutorParalelo:
+    """Executa o plano do `Executor` em partições, num pool de processos"""
+
+    def __init__(self, banco, processos: int | None = None, num_particoes: int | None = None,
+                 tamanho_morsel: int = TAMANHO_MORSEL, **opcoes_executor):
+        """
+        Args:
+            banco: Tabelas a consultar
+            processos: Processos de trabalho (padrão: os.cpu_count())
+            num_particoes: Partições por junção (padrão: igual a `processos`)
+            tamanho_morsel: Linhas da tabela base por tarefa de leitura
+            opcoes_executor: Repassadas ao `Executor` (ex: memoria_maxima)
+        """
+        if tamanho_morsel <= 0:
+            raise ValueError(f"Tamanho de morsel inválido: {tamanho_morsel}")
+        self.executor = Executor(banco, **opcoes_executor)
+        self.processos = processos or os.cpu_count() or 1
+        self.num_particoes = num_particoes or self.processos
+        self.tamanho_morsel = tamanho_morsel
+
+    @staticmethod
+    def fork_disponivel() -> bool:
+        return 'fork' in multiprocessing.get_all_start_methods()
+
+    def _morsels(self, folha) -> list:
+        passo = self.tamanho_morsel
+        return [
+            (inicio, min(inicio + passo, fim))
+            for comeco, fim in folha.faixas() for inicio in range(comeco, fim, passo)
+        ] or [(0, 0)]
+
+    def _juntar_particoes(self, resultados: list, particionado: bool) -> list:
+        """Resultados das tarefas -> uma lista de linhas por partição"""
+        if particionado:
+            particoes = [[] for _ in range(self.num_particoes)]
+            for resultado in resultados:
+                for p, linhas in enumerate(resultado):
+                    particoes[p].extend(linhas)
+            return particoes
+        linhas = [linha for resultado in resultados for linha in resultado]
+        # Sem chave: divide em blocos contíguos, um por partição
+        tamanho = -(-len(linhas) // self.num_particoes) or 1
+        return [linhas[i:i + tamanho] for i in range(0, len(linhas), tamanho)] or [[]]
+
+    def _executar_etapas(self, plano: _PlanoParalelo, mapear, etapas: list) -> list:
+        folhas = plano.folhas()
+        saidas = []
+        for indice, folha in enumerate(folhas):
+            inicio = time.perf_counter()
+            tarefas = [(indice, a, b) for a, b in self._morsels(folha)]
+            resultados = mapear(_tarefa_folha, tarefas)
+            saidas.append((folha, resultados))
+            etapas.append({
+                'etapa': f"folha {folha.descricao}", 'tarefas': len(tarefas),
+                'linhas': _contar(resultados, folha.particionar is not None),
+                'tempo_ms': (time.perf_counter() - inicio) * 1000,
+            })
+
+        folha, resultados = saidas[0]
+        if not plano.juncoes:
+            return [linha for resultado in resultados for linha in resultado]
+        esquerda = self._juntar_particoes(resultados, folha.particionar is not None)
+        direitas = iter(saidas[1:])
+
+        for indice, juncao in enumerate(plano.juncoes):
+            inicio = time.perf_counter()
+            if juncao.folha is None:
+                tarefas = [(indice, linhas, None) for linhas in esquerda]
+            else:
+                folha, resultados = next(direitas)
+                if juncao.particionada:
+                    direita = self._juntar_particoes(resultados, True)
+                    tarefas = [(indice, esquerda[p], direita[p]) for p in range(self.num_particoes)]
+                else:
+                    replicada = [linha for resultado in resultados for linha in resultado]
+                    tarefas = [(indice, linhas, replicada) for linhas in esquerda]
+            resultados = mapear(_tarefa_juncao, tarefas)
+            particionado = juncao.particionar is not None
+            etapas.append({
+                'etapa': juncao.descricao, 'tarefas': len(tarefas),
+                'linhas': _contar(resultados, particionado),
+                'tempo_ms': (time.perf_counter() - inicio) * 1000,
+            })
+            if indice + 1 < len(plano.juncoes):
+                esquerda = self._juntar_particoes(resultados, particionado)
+        return [linha for resultado in resultados for linha in resultado]
+
+    def executar(self, parsed_query: dict) -> ResultadoParalelo:
+        """Executa a query em partições e retorna todas as linhas do resultado"""
+        global _plano_atual
+        inicio = time.perf_counter()
+        plano = _PlanoParalelo(self.executor.preparar(parsed_query), self.num_particoes)
+
+        etapas = []
+        _plano_atual = plano
+        try:
+            if self.processos == 1 or not self.fork_disponivel():
+                linhas = self._executar_etapas(plano, _mapear_local, etapas)
+            else:
+                # Criado depois do plano: os processos herdam o plano via fork
+                from concurrent.futures import ProcessPoolExecutor
+                contexto = multiprocessing.get_context('fork')
+                with ProcessPoolExecutor(max_workers=self.processos, mp_context=contexto) as pool:
+                    def mapear(funcao, tarefas):
+                        return list(pool.map(funcao, *zip(*tarefas)))
+                    linhas = self._executar_etapas(plano, mapear, etapas)
+        finally:
+            _plano_atual = None
+        return ResultadoParalelo(list(plano.esquema.colunas), linhas, etapas, time.perf_counter() - inicio)
+
+
+def _mapear_local(funcao, tarefas: list) -> list:
+    return [funcao(*tarefa) for tarefa in tarefas]
+
+
+def _contar(resultados: list, particionado: bool) -> int:
+    if particionado:
+        return sum(len(linhas) for resultado in resultados for linhas in resultado)
+    return sum(len(resultado) for resultado in resultados)
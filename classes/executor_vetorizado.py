@@ -0,0 +1,364 @@
+"""
+Executor vetorizado (colunar) com NumPy
+
+Executa o mesmo plano lógico de `classes.plano` (o que o AlgebraRelacional
+imprime), mas cada relação intermediária é um conjunto de colunas NumPy:
+
+- σ: o predicado vira uma máscara booleana avaliada sobre colunas inteiras
+- π: escolhe as colunas sem copiar os dados
+- ⋈: equi-junção por ordenação + busca binária (np.argsort/np.searchsorted);
+  junções sem chave viram produto cartesiano filtrado por máscara
+- ⋉: filtro de junção por pertinência das chaves (np.isin)
+
+Tabelas colunares (`classes.armazenamento_colunar`) já estão nesse formato:
+seus arrays mapeados em memória são usados sem conversão, e os filtros logo
+acima do Scan descartam os blocos que os zone maps excluem.
+
+Valores nulos: colunas numéricas usam NaN e colunas de texto usam '' (o
+mesmo que o carregamento CSV trata como nulo); nulos nunca satisfazem
+comparações nem casam em junções. Cada coluna guarda o tipo do catálogo,
+e colunas INT com nulos (float64) voltam a ser inteiros no resultado.
+
+Requer a biblioteca opcional `numpy`.
+"""
+
+try:
+    import numpy as np  # type: ignore
+    NUMPY_DISPONIVEL = True
+except Exception:
+    NUMPY_DISPONIVEL = False
+
+from classes.banco_dados import BancoDados
+from classes.plano import (
+    Coluna,
+    Comparacao,
+    Conjuncao,
+    Disjuncao,
+    Juncao,
+    Literal,
+    Projecao,
+    Scan,
+    Selecao,
+    Semijuncao,
+    construir_plano,
+    juntar_conjuncoes,
+)
+from classes.predicados import (
+    OPERADORES,
+    OPERADORES_INVERTIDOS,
+    Esquema,
+    converter_literal,
+    tipo_da_coluna,
+)
+
+
+def _mascara_nao_nulo(coluna):
+    if coluna.dtype.kind == 'f':
+        return ~np.isnan(coluna)
+    if coluna.dtype.kind == 'U':
+        return coluna != ''
+    return np.ones(len(coluna), dtype=bool)
+
+
+def _array_da_coluna(valores: list, tipo: str | None):
+    """Converte valores Python (com None) para um array NumPy tipado"""
+    if tipo == 'INT' and None not in valores:
+        return np.array(valores, dtype=np.int64)
+    if tipo in ('INT', 'DECIMAL'):
+        return np.array([np.nan if v is None else v for v in valores], dtype=np.float64)
+    return np.array(['' if v is None else str(v) for v in valores], dtype=str)
+
+
+def _valores_da_coluna(coluna, tipo: str | None) -> list:
+    """Array NumPy -> valores Python (NaN e '' voltam a ser None; INT com nulos volta a int)"""
+    valores = coluna.tolist()
+    if coluna.dtype.kind == 'f':
+        if tipo == 'INT':
+            return [None if v != v else int(v) for v in valores]
+        return [None if v != v else v for v in valores]
+    if coluna.dtype.kind == 'U':
+        return [v if v != '' else None for v in valores]
+    return valores
+
+
+class Relacao:
+    """Relação colunar: esquema + uma coluna NumPy e o tipo (catálogo) por posição"""
+    __slots__ = ('esquema', 'colunas', 'tipos')
+
+    def __init__(self, esquema: Esquema, colunas: list, tipos: list):
+        self.esquema = esquema
+        self.colunas = colunas
+        self.tipos = tipos
+
+    @property
+    def num_linhas(self) -> int:
+        return len(self.colunas[0]) if self.colunas else 0
+
+    def filtrar(self, mascara) -> 'Relacao':
+        return Relacao(self.esquema, [c[mascara] for c in self.colunas], self.tipos)
+
+
+class ResultadoVetorizado:
+    """Resultado da execução vetorizada"""
+
+    def __init__(self, relacao: Relacao, etapas: list):
+        self.relacao = relacao
+        self.colunas = list(relacao.esquema.colunas)
+        self.etapas = etapas
+
+    @property
+    def arrays(self) -> dict:
+        return dict(zip(self.colunas, self.relacao.colunas))
+
+    def linhas(self) -> list:
+        """Linhas como tuplas Python, com os mesmos valores do executor por linhas"""
+        return list(zip(*(
+            _valores_da_coluna(coluna, tipo) for coluna, tipo in zip(self.relacao.colunas, self.relacao.tipos)
+        )))
+
+    def metricas(self) -> list:
+        """Linhas produzidas por etapa, na ordem de avaliação"""
+        return [{'operador': descricao, 'linhas': linhas} for descricao, linhas in self.etapas]
+
+    def total_linhas_processadas(self) -> int:
+        return sum(linhas for _, linhas in self.etapas)
+
+
+class ExecutorVetorizado:
+    """Avalia o plano lógico operador a operador sobre colunas NumPy"""
+
+    def __init__(self, banco: BancoDados):
+        if not NUMPY_DISPONIVEL:
+            raise ImportError("Dependência ausente. Instale: pip install numpy")
+        self.banco = banco
+        self.catalogo = banco.catalogo
+        self._cache_tabelas = {}
+
+    def _relacao_da_tabela(self, nome: str, filtros: list = ()) -> tuple:
+        """
+        Colunas NumPy da tabela
+
+        Tabelas colunares são usadas diretamente (arrays mapeados em memória),
+        lendo só os blocos cujos mínimos/máximos admitem os `filtros`; as
+        demais são convertidas uma vez enquanto não mudarem.
+
+        Returns:
+            (relação, descrição da leitura)
+        """
+        tabela = self.banco.tabela(nome)
+        if hasattr(tabela, 'colunas_blocos'):
+            blocos = tabela.blocos_candidatos(list(filtros))
+            relacao = Relacao(Esquema(tabela.esquema), tabela.colunas_blocos(blocos), tabela.tipos)
+            return relacao, f"scan {tabela.nome} (blocos {len(blocos)}/{tabela.num_blocos})"
+        return self._converter_tabela(tabela), f"scan {tabela.nome}"
+
+    def _converter_tabela(self, tabela) -> Relacao:
+        # Versão única entre as tabelas; muda a cada carga ou inserção (e com o arquivo, em CSV)
+        chave = tabela.versao
+        relacao = self._cache_tabelas.get(tabela.nome)
+        if relacao is not None and relacao[0] == chave:
+            return relacao[1]
+
+        valores = list(zip(*tabela.linhas())) or [[] for _ in tabela.colunas]
+        tipos = [self.catalogo.tipo_coluna(tabela.nome, nome_coluna) for nome_coluna in tabela.colunas]
+        colunas = [_array_da_coluna(list(vals), tipo) for vals, tipo in zip(valores, tipos)]
+        resultado = Relacao(Esquema(tabela.esquema), colunas, tipos)
+        self._cache_tabelas[tabela.nome] = (chave, resultado)
+        return resultado
+
+    def _mascara_comparacao(self, predicado: Comparacao, relacao: Relacao):
+        esquerda, direita = predicado.esquerda, predicado.direita
+        simbolo = predicado.operador
+        if isinstance(esquerda, Literal) and isinstance(direita, Coluna):
+            esquerda, direita = direita, esquerda
+            simbolo = OPERADORES_INVERTIDOS[simbolo]
+        funcao = OPERADORES[simbolo]
+        esquema = relacao.esquema
+
+        if isinstance(esquerda, Coluna) and isinstance(direita, Coluna):
+            a = relacao.colunas[esquema.indice(esquerda)]
+            b = relacao.colunas[esquema.indice(direita)]
+            return funcao(a, b) & _mascara_nao_nulo(a) & _mascara_nao_nulo(b)
+
+        if isinstance(esquerda, Coluna):
+            a = relacao.colunas[esquema.indice(esquerda)]
+            valor = converter_literal(direita, tipo_da_coluna(esquerda, esquema, self.catalogo))
+            if a.dtype.kind == 'U':
+                valor = str(valor)
+            return np.asarray(funcao(a, valor), dtype=bool) & _mascara_nao_nulo(a)
+
+        constante = funcao(esquerda.valor, direita.valor)
+        return np.full(relacao.num_linhas, bool(constante))
+
+    def _mascara_predicado(self, predicado, relacao: Relacao):
+        if isinstance(predicado, Comparacao):
+            return self._mascara_comparacao(predicado, relacao)
+        if isinstance(predicado, Conjuncao):
+            return self._mascara(predicado.termos, relacao)
+        if isinstance(predicado, Disjuncao):
+            mascara = np.zeros(relacao.num_linhas, dtype=bool)
+            for termo in predicado.termos:
+                mascara |= self._mascara_predicado(termo, relacao)
+            return mascara
+        raise ValueError(f"Condição não suportada pelo executor: {predicado.texto}")
+
+    def _mascara(self, predicados: list, relacao: Relacao):
+        mascara = np.ones(relacao.num_linhas, dtype=bool)
+        for predicado in predicados:
+            mascara &= self._mascara_predicado(predicado, relacao)
+        return mascara
+
+    def _indices_equijuncao(self, chave_a, chave_b) -> tuple:
+        """
+        Pares de posições (i, j) com chave_a[i] == chave_b[j]
+
+        Ordena `chave_b` e localiza o intervalo de cada valor de `chave_a`
+        com busca binária; os intervalos são expandidos sem laço Python.
+        """
+        ordem = np.argsort(chave_b, kind='stable')
+        ordenada = chave_b[ordem]
+        inicio = np.searchsorted(ordenada, chave_a, side='left')
+        fim = np.searchsorted(ordenada, chave_a, side='right')
+        contagem = np.where(_mascara_nao_nulo(chave_a), fim - inicio, 0)
+
+        indices_a = np.repeat(np.arange(len(chave_a)), contagem)
+        deslocamento = np.arange(int(contagem.sum())) - np.repeat(np.cumsum(contagem) - contagem, contagem)
+        indices_b = ordem[np.repeat(inicio, contagem) + deslocamento]
+        return indices_a, indices_b
+
+    def _juncao(self, esquerda: Relacao, direita: Relacao, predicados: list) -> Relacao:
+        chave = None
+        residuais = []
+        for predicado in predicados:
+            if chave is None and predicado.eh_equijuncao:
+                a, b = predicado.esquerda, predicado.direita
+                if esquerda.esquema.indice(a) is None:
+                    a, b = b, a
+                i, j = esquerda.esquema.indice(a), direita.esquema.indice(b)
+                if i is not None and j is not None:
+                    chave = (i, j)
+                    continue
+            residuais.append(predicado)
+
+        if chave is not None:
+            chave_esq = esquerda.colunas[chave[0]]
+            chave_dir = direita.colunas[chave[1]]
+            # Ordena o menor lado; o maior é percorrido pela busca binária
+            if direita.num_linhas <= esquerda.num_linhas:
+                indices_esq, indices_dir = self._indices_equijuncao(chave_esq, chave_dir)
+            else:
+                indices_dir, indices_esq = self._indices_equijuncao(chave_dir, chave_esq)
+        else:
+            indices_esq = np.repeat(np.arange(esquerda.num_linhas), direita.num_linhas)
+            indices_dir = np.tile(np.arange(direita.num_linhas), esquerda.num_linhas)
+
+        combinada = Relacao(
+            esquerda.esquema + direita.esquema,
+            [c[indices_esq] for c in esquerda.colunas] + [c[indices_dir] for c in direita.colunas],
+            esquerda.tipos + direita.tipos,
+        )
+        if residuais:
+            combinada = combinada.filtrar(self._mascara(residuais, combinada))
+        return combinada
+
+    def _semijuncao(self, filho: Relacao, fonte: Relacao, predicados: list) -> Relacao:
+        """Linhas do filho cuja chave aparece na fonte (sem a igualdade entre os dois, o filho inteiro)"""
+        for predicado in predicados:
+            if not predicado.eh_equijuncao:
+                continue
+            a, b = predicado.esquerda, predicado.direita
+            i, j = filho.esquema.indice(a), fonte.esquema.indice(b)
+            if i is None or j is None:
+                i, j = filho.esquema.indice(b), fonte.esquema.indice(a)
+            if i is None or j is None:
+                continue
+            chave, chaves_fonte = filho.colunas[i], fonte.colunas[j]
+            chaves_fonte = chaves_fonte[_mascara_nao_nulo(chaves_fonte)]
+            return filho.filtrar(np.isin(chave, chaves_fonte) & _mascara_nao_nulo(chave))
+        return filho
+
+    def _avaliar(self, no, etapas: list, filtros: list = ()) -> tuple:
+        """
+        Avalia um nó lógico; retorna (relação, predicados pendentes)
+
+        `filtros`: predicados das σ acima de um Scan, sem junção entre eles
+        (usados só para descartar blocos de tabelas colunares; as σ continuam
+        aplicando-os)
+        """
+        if isinstance(no, Scan):
+            if no.acesso is not None:
+                filtros = list(filtros) + list(no.acesso.predicados)
+            relacao, descricao = self._relacao_da_tabela(no.tabela, filtros)
+            etapas.append((descricao, relacao.num_linhas))
+            if no.acesso is not None:
+                # Sobre colunas inteiras, a máscara já é a forma mais rápida de
+                # aplicar as condições do índice
+                relacao = relacao.filtrar(self._mascara(no.acesso.predicados, relacao))
+                etapas.append((f"σ {no.acesso.condicao}", relacao.num_linhas))
+            return relacao, []
+
+        if isinstance(no, Projecao):
+            filho, pendentes = self._avaliar(no.filho, etapas, filtros)
+            indices = []
+            for nome in no.colunas:
+                indice = filho.esquema.indice_nome(nome)
+                if indice is None:
+                    raise ValueError(f"Coluna indisponível para projeção: {nome}")
+                indices.append(indice)
+            relacao = Relacao(
+                Esquema([filho.esquema.colunas[i] for i in indices]),
+                [filho.colunas[i] for i in indices],
+                [filho.tipos[i] for i in indices],
+            )
+            etapas.append((f"π {', '.join(relacao.esquema.colunas)}", relacao.num_linhas))
+            return relacao, pendentes
+
+        if isinstance(no, Selecao):
+            filho, pendentes = self._avaliar(no.filho, etapas, list(filtros) + list(no.predicados))
+            predicados = pendentes + list(no.predicados)
+            aplicaveis = [p for p in predicados if filho.esquema.contem(p)]
+            restantes = [p for p in predicados if not filho.esquema.contem(p)]
+            if aplicaveis:
+                filho = filho.filtrar(self._mascara(aplicaveis, filho))
+                etapas.append((f"σ {juntar_conjuncoes(aplicaveis)}", filho.num_linhas))
+            return filho, restantes
+
+        if isinstance(no, Juncao):
+            esquerda, pendentes_esq = self._avaliar(no.esquerda, etapas)
+            direita, pendentes_dir = self._avaliar(no.direita, etapas)
+            esquema = esquerda.esquema + direita.esquema
+            predicados = pendentes_esq + pendentes_dir + list(no.predicados)
+            aplicaveis = [p for p in predicados if esquema.contem(p)]
+            restantes = [p for p in predicados if not esquema.contem(p)]
+            relacao = self._juncao(esquerda, direita, aplicaveis)
+            condicao = juntar_conjuncoes(aplicaveis)
+            etapas.append((f"⋈ {condicao}" if condicao else "×", relacao.num_linhas))
+            return relacao, restantes
+
+        if isinstance(no, Semijuncao):
+            filho, pendentes = self._avaliar(no.filho, etapas, filtros)
+            fonte, _pendentes_fonte = self._avaliar(no.fonte, etapas)
+            relacao = self._semijuncao(filho, fonte, no.predicados)
+            if relacao is not filho:
+                etapas.append((f"⋉ {no.condicao}", relacao.num_linhas))
+            return relacao, pendentes
+
+        raise TypeError(f"Nó de plano desconhecido: {no!r}")
+
+    def executar(self, parsed_query: dict) -> ResultadoVetorizado:
+        """
+        Executa a query parseada (original ou otimizada) em modo colunar
+
+        Args:
+            parsed_query: Dicionário do Parser (ou de uma heurística)
+
+        Returns:
+            ResultadoVetorizado com as colunas finais
+        """
+        etapas = []
+        relacao, pendentes = self._avaliar(construir_plano(parsed_query), etapas)
+        if pendentes:
+            raise ValueError(
+                f"Condição referencia coluna indisponível no plano: {juntar_conjuncoes(pendentes)}"
+            )
+        return ResultadoVetorizado(relacao, etapas)
@@ -0,0 +1,209 @@
+"""
+EXPLAIN / EXPLAIN ANALYZE dos planos físicos do executor
+
+EXPLAIN anota cada operador com a cardinalidade estimada (a mesma usada pelo
+executor para escolher o lado de construção das junções hash) e o custo
+estimado, no mesmo modelo das heurísticas de caminho de acesso e de
+algoritmo de junção: o custo é medido em leituras sequenciais de linha e é
+acumulado da subárvore (o do operador somado ao dos filhos).
+
+EXPLAIN ANALYZE executa o plano (descartando as linhas do resultado) e
+acrescenta, por operador, as linhas reais, o tempo (inclusive o dos filhos e
+o próprio) e o pico de memória. Operadores com limite de memória mostram o
+limite e, após a execução, quanto despejaram em disco. A memória vem do
+`tracemalloc`, que deixa a execução mais lenta: os tempos medidos com ela
+ligada servem para comparar operadores e planos entre si, não como tempo
+absoluto da query.
+"""
+
+import math
+import time
+import tracemalloc
+
+from classes.heuristica_algoritmo_juncao import CUSTO_COMPARACAO_ORDENACAO, CUSTO_CONSTRUCAO_HASH
+from classes.heuristica_caminho_acesso import CUSTO_LINHA_INDICE
+from classes.operadores import (
+    OperadorBuscaIndice,
+    OperadorJuncaoHash,
+    OperadorJuncaoIndice,
+    OperadorJuncaoLacos,
+    OperadorJuncaoMerge,
+    OperadorScan,
+    OperadorSemijuncao,
+)
+
+
+def _ordenar(linhas: float) -> float:
+    return linhas * math.log2(linhas + 1) * CUSTO_COMPARACAO_ORDENACAO
+
+
+def custo_proprio(operador) -> float:
+    """Custo estimado do próprio operador (sem o dos filhos)"""
+    linhas = [filho.linhas_estimadas or 0.0 for filho in operador.filhos]
+    if isinstance(operador, OperadorScan):
+        return float(operador.linhas_estimadas or 0.0)
+    if isinstance(operador, OperadorBuscaIndice):
+        total = operador.tabela.num_linhas
+        if operador.condicao is None:
+            # Leitura da tabela inteira em ordem do índice
+            return float(total)
+        return (operador.linhas_estimadas or 0.0) * CUSTO_LINHA_INDICE + math.log2(total + 1)
+    if isinstance(operador, OperadorJuncaoHash):
+        esquerda, direita = linhas
+        construcao, sondagem = (direita, esquerda) if operador.constroi_direita else (esquerda, direita)
+        return CUSTO_CONSTRUCAO_HASH * construcao + sondagem
+    if isinstance(operador, OperadorJuncaoMerge):
+        esquerda, direita = linhas
+        return (
+            esquerda + direita
+            + (_ordenar(esquerda) if operador.ordena_esquerda else 0.0)
+            + (_ordenar(direita) if operador.ordena_direita else 0.0)
+        )
+    if isinstance(operador, OperadorJuncaoIndice):
+        esquerda = linhas[0]
+        total = operador.tabela.num_linhas
+        descida = 1.0 if operador.indice.tipo == 'hash' else math.log2(total + 1)
+        return esquerda * descida + (operador.linhas_estimadas or 0.0) * CUSTO_LINHA_INDICE
+    if isinstance(operador, OperadorSemijuncao):
+        # Filtro montado com as chaves da fonte e testado em cada linha do filho
+        filho, fonte = linhas
+        return CUSTO_CONSTRUCAO_HASH * fonte + filho
+    if isinstance(operador, OperadorJuncaoLacos):
+        esquerda, direita = linhas
+        return esquerda * direita
+    # σ e π são aplicados em fluxo sobre as linhas do filho
+    return 0.0
+
+
+def formatar_bytes(quantidade: int) -> str:
+    for unidade in ('B', 'KiB', 'MiB'):
+        if quantidade < 1024 or unidade == 'MiB':
+            return f"{quantidade:.0f} {unidade}" if unidade == 'B' else f"{quantidade:.1f} {unidade}"
+        quantidade /= 1024
+
+
+class ExplicacaoPlano:
+    """
+    Plano físico anotado com estimativas (e, após ANALYZE, valores reais)
+
+    Use `Executor.explicar(parsed, analisar=...)` para obtê-lo e
+    `GrafoExecucao(parsed, explicacao=...)` para exibi-lo como árvore de
+    texto ou grafo.
+    """
+
+    def __init__(self, raiz, analisado: bool = False, tempo_total: float = 0.0,
+                 memoria_pico: int | None = None):
+        self.raiz = raiz
+        self.analisado = analisado
+        self.tempo_total = tempo_total
+        self.memoria_pico = memoria_pico
+        self.custos = {}
+        self._calcular_custos(raiz)
+
+    @classmethod
+    def analisar(cls, raiz, memoria: bool = True) -> 'ExplicacaoPlano':
+        """
+        Executa o plano medindo cada operador (as linhas do resultado são descartadas)
+
+        Args:
+            raiz: Operador raiz ainda não executado
+            memoria: Se True, mede a memória com `tracemalloc` (mais lento)
+        """
+        for operador in raiz.percorrer():
+            operador.medir = True
+        iniciou_rastreio = memoria and not tracemalloc.is_tracing()
+        if iniciou_rastreio:
+            tracemalloc.start()
+        elif memoria:
+            tracemalloc.reset_peak()
+        try:
+            inicio = time.perf_counter()
+            for _ in raiz:
+                pass
+            tempo_total = time.perf_counter() - inicio
+            memoria_pico = tracemalloc.get_traced_memory()[1] if memoria else None
+        finally:
+            if iniciou_rastreio:
+                tracemalloc.stop()
+        return cls(raiz, analisado=True, tempo_total=tempo_total, memoria_pico=memoria_pico)
+
+    def _calcular_custos(self, operador) -> float:
+        total = custo_proprio(operador) + sum(self._calcular_custos(f) for f in operador.filhos)
+        self.custos[id(operador)] = total
+        return total
+
+    def custo(self, operador) -> float:
+        """Custo estimado acumulado da subárvore do operador"""
+        return self.custos[id(operador)]
+
+    @staticmethod
+    def tempo_proprio(operador) -> float:
+        """Tempo do operador sem o tempo gasto nos filhos"""
+        return max(operador.tempo - sum(f.tempo for f in operador.filhos), 0.0)
+
+    def anotacao(self, operador) -> str:
+        """Ex: 'est. 12 linhas, custo 340 | real 11 linhas, 0.42 ms (própria 0.10 ms), 3.2 KiB'"""
+        texto = f"est. {operador.linhas_estimadas or 0:.0f} linhas, custo {self.custo(operador):.0f}"
+        if operador.memoria_maxima is not None:
+            texto += f", limite {formatar_bytes(operador.memoria_maxima)}"
+        if not self.analisado:
+            return texto
+        texto += (
+            f" | real {operador.linhas_produzidas} linhas, {operador.tempo * 1000:.2f} ms"
+            f" (própria {self.tempo_proprio(operador) * 1000:.2f} ms)"
+        )
+        if self.memoria_pico is not None:
+            texto += f", {formatar_bytes(operador.memoria_pico)}"
+        if operador.bytes_despejados:
+            texto += (
+                f", despejo {formatar_bytes(operador.bytes_despejados)}"
+                f" em {operador.arquivos_despejados} arquivo(s)"
+            )
+        return texto
+
+    def nos(self) -> list:
+        """Um dicionário por operador (pré-ordem), com profundidade e anotações"""
+        resultado = []
+
+        def visitar(operador, profundidade: int):
+            no = {
+                'operador': operador.descricao(),
+                'profundidade': profundidade,
+                'linhas_estimadas': operador.linhas_estimadas,
+                'custo_estimado': self.custo(operador),
+            }
+            if operador.memoria_maxima is not None:
+                no['memoria_maxima'] = operador.memoria_maxima
+            if self.analisado:
+                no.update(
+                    linhas=operador.linhas_produzidas,
+                    tempo_ms=operador.tempo * 1000,
+                    tempo_proprio_ms=self.tempo_proprio(operador) * 1000,
+                )
+                if self.memoria_pico is not None:
+                    no['memoria_pico'] = operador.memoria_pico
+                if operador.memoria_maxima is not None:
+                    no['bytes_despejados'] = operador.bytes_despejados
+            resultado.append(no)
+            for filho in operador.filhos:
+                visitar(filho, profundidade + 1)
+
+        visitar(self.raiz, 0)
+        return resultado
+
+    def resumo(self) -> dict:
+        """Totais do plano (estimados e, após ANALYZE, medidos)"""
+        resumo = {
+            'Linhas estimadas': f"{self.raiz.linhas_estimadas or 0:.0f}",
+            'Custo estimado': f"{self.custo(self.raiz):.0f}",
+        }
+        if self.analisado:
+            resumo['Linhas reais'] = self.raiz.linhas_produzidas
+            resumo['Linhas processadas'] = sum(op.linhas_produzidas for op in self.raiz.percorrer())
+            resumo['Tempo total (ms)'] = f"{self.tempo_total * 1000:.2f}"
+            if self.memoria_pico is not None:
+                resumo['Memória (pico)'] = formatar_bytes(self.memoria_pico)
+            despejados = sum(op.bytes_despejados for op in self.raiz.percorrer())
+            if despejados:
+                resumo['Despejo em disco'] = formatar_bytes(despejados)
+        return resumo
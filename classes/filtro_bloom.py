@@ -0,0 +1,49 @@
+"""
+Filtro de Bloom para os filtros de junção em tempo de execução
+
+Responde "talvez presente" ou "certamente ausente" usando alguns bits por
+chave, em vez de guardar as chaves: não há falsos negativos, e a taxa de
+falsos positivos fica próxima de `taxa_falsos_positivos` enquanto o número
+de chaves não passar da capacidade.
+
+As k posições de cada chave vêm de dois valores de hash (h1 + i·h2). Como
+usam o `hash()` do Python, o filtro só vale no processo que o construiu (ou
+em processos criados por fork a partir dele).
+"""
+
+import math
+
+
+class FiltroBloom:
+    """Conjunto aproximado de chaves (m bits, k funções de hash)"""
+
+    def __init__(self, capacidade: int, taxa_falsos_positivos: float = 0.01):
+        if not 0 < taxa_falsos_positivos < 1:
+            raise ValueError(f"Taxa de falsos positivos inválida: {taxa_falsos_positivos}")
+        capacidade = max(capacidade, 1)
+        self.num_bits = max(8, math.ceil(-capacidade * math.log(taxa_falsos_positivos) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacidade * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.num_chaves = 0
+
+    def _posicoes(self, chave) -> list:
+        h1 = hash(chave)
+        h2 = hash((chave, 0x5BD1E995)) | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def adicionar(self, chave):
+        bits = self._bits
+        for posicao in self._posicoes(chave):
+            bits[posicao >> 3] |= 1 << (posicao & 7)
+        self.num_chaves += 1
+
+    def __contains__(self, chave) -> bool:
+        bits = self._bits
+        return all(bits[posicao >> 3] & (1 << (posicao & 7)) for posicao in self._posicoes(chave))
+
+    @property
+    def tamanho_bytes(self) -> int:
+        return len(self._bits)
+
+    def __repr__(self) -> str:
+        return f"FiltroBloom({self.num_chaves} chaves, {self.num_bits} bits, k={self.num_hashes})"
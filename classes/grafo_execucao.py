@@ -3,141 +3,369 @@ Gerador de Grafo de Execução para Álgebra Relacional
 
 Este módulo cria representações visuais da árvore de execução
 de operações de álgebra relacional.
+
+O plano é sempre uma árvore, então o layout é hierárquico e calculado em
+tempo linear no número de nós: cada operador fica no nível da sua
+profundidade e centralizado sobre os filhos; cada subárvore ocupa uma
+faixa horizontal própria, sem sobreposição. O resultado é determinístico
+(mesmo desenho a cada execução) e pode ser emitido diretamente como SVG,
+DOT (Graphviz) ou texto ASCII.
+
+Com uma `ExplicacaoPlano` (EXPLAIN / EXPLAIN ANALYZE, ver
+`classes.explicacao`), o desenho passa a ser o do plano físico do executor e
+cada operador ganha uma segunda linha com as linhas e o custo estimados (e,
+após a execução, as linhas reais, o tempo e a memória).
+
+PNG é opcional e usa o Matplotlib apenas para rasterizar o mesmo layout,
+com uma `Figure` por chamada (sem o estado global do pyplot), podendo ser
+gravado em arquivo ou em memória. O Matplotlib só é importado quando um PNG
+é de fato desenhado: importar este módulo não carrega dependências pesadas.
 """
 
-try:
-    import networkx as nx  # type: ignore
-    import matplotlib.pyplot as plt  # type: ignore
-    NETWORKX_DISPONIVEL = True
-except Exception:
-    NETWORKX_DISPONIVEL = False
+import importlib.util
+import io
+import os
+from html import escape
+
+from classes.plano import Projecao, Scan, Selecao, Semijuncao, construir_plano
+
+# Só verifica se o pacote existe; a importação fica para `_desenhar_png`
+MATPLOTLIB_DISPONIVEL = importlib.util.find_spec('matplotlib') is not None
+
+# Cores por tipo de operador
+CORES = {
+    'tabela': '#cfe8ff',
+    'juncao': '#f4cccc',
+    'selecao': '#fff2cc',
+    'projecao': '#d9ead3',
+    'semijuncao': '#ead1dc',
+}
+
+# Tipo de nó (cor) de cada operador físico do executor (`Operador.nome`)
+TIPOS_OPERADOR = {
+    'scan': 'tabela',
+    'indice': 'tabela',
+    'selecao': 'selecao',
+    'projecao': 'projecao',
+    'juncao': 'juncao',
+    'semijuncao': 'semijuncao',
+}
+
+# Medidas do layout (em pixels)
+LARGURA_CARACTERE = 7
+ALTURA_NO = 30
+ESPACO_HORIZONTAL = 20
+ESPACO_VERTICAL = 50
+MARGEM = 20
+MAX_CARACTERES_ROTULO = 60
+ALTURA_DETALHE = 16
+
+
+class NoDesenho:
+    """Operador posicionado no layout (x = centro, y = topo do nível)"""
+    __slots__ = ('rotulo', 'tipo', 'filhos', 'detalhe', 'largura', 'altura', 'largura_subarvore',
+                 'x', 'y', 'nivel')
+
+    def __init__(self, rotulo: str, tipo: str, filhos: list, detalhe: str | None = None):
+        self.rotulo = rotulo
+        self.tipo = tipo
+        self.filhos = filhos
+        self.detalhe = detalhe
+        texto = _abreviar(rotulo)
+        self.largura = max(len(texto), len(detalhe or '')) * LARGURA_CARACTERE + 16
+        self.altura = ALTURA_NO + (ALTURA_DETALHE if detalhe else 0)
+        self.largura_subarvore = 0
+        self.x = 0.0
+        self.y = 0.0
+        self.nivel = 0
+
+    @property
+    def texto(self) -> str:
+        return _abreviar(self.rotulo)
+
+
+def _abreviar(rotulo: str) -> str:
+    if len(rotulo) <= MAX_CARACTERES_ROTULO:
+        return rotulo
+    return rotulo[:MAX_CARACTERES_ROTULO - 1] + '…'
+
+
+def _rotulo(no) -> str:
+    if isinstance(no, Scan):
+        if no.acesso is not None:
+            return f"{no.tabela} [{no.acesso.descricao}]"
+        return no.tabela
+    if isinstance(no, Projecao):
+        return f"π {', '.join(no.colunas)}"
+    if isinstance(no, Selecao):
+        return f"σ {no.condicao}"
+    if isinstance(no, Semijuncao):
+        return f"⋉ {no.condicao}"
+    if not no.condicao:
+        return "×"
+    algoritmo = f"[{no.algoritmo}]" if no.algoritmo else ''
+    return f"⋈{algoritmo} {no.condicao}"
+
+
+def _converter(no) -> NoDesenho:
+    return NoDesenho(_rotulo(no), no.tipo, [_converter(filho) for filho in no.filhos()])
+
+
+def _converter_operador(operador, explicacao) -> NoDesenho:
+    return NoDesenho(
+        operador.descricao(),
+        TIPOS_OPERADOR.get(operador.nome, operador.nome),
+        [_converter_operador(filho, explicacao) for filho in operador.filhos],
+        explicacao.anotacao(operador),
+    )
+
+
+def calcular_layout(raiz: NoDesenho) -> tuple:
+    """
+    Posiciona a árvore em níveis (tempo linear)
+
+    1. pós-ordem: largura de cada subárvore = max(largura do nó, soma das
+       larguras das subárvores filhas + espaços)
+    2. pré-ordem: cada filho recebe uma faixa contígua dentro da faixa do pai,
+       e o pai fica centralizado sobre os filhos
+
+    Todos os níveis têm a altura do nó mais alto (nós com detalhe têm uma
+    linha a mais).
+
+    Returns:
+        (nós em pré-ordem, largura total, altura total)
+    """
+    altura_nivel = ALTURA_NO
+
+    def medir(no: NoDesenho):
+        nonlocal altura_nivel
+        altura_nivel = max(altura_nivel, no.altura)
+        for filho in no.filhos:
+            medir(filho)
+        soma = sum(f.largura_subarvore for f in no.filhos) + ESPACO_HORIZONTAL * max(len(no.filhos) - 1, 0)
+        no.largura_subarvore = max(no.largura, soma)
+
+    ordem = []
+
+    def posicionar(no: NoDesenho, esquerda: float, nivel: int):
+        ordem.append(no)
+        no.nivel = nivel
+        no.y = MARGEM + nivel * (altura_nivel + ESPACO_VERTICAL)
+        if not no.filhos:
+            no.x = esquerda + no.largura_subarvore / 2
+            return
+        soma = sum(f.largura_subarvore for f in no.filhos) + ESPACO_HORIZONTAL * (len(no.filhos) - 1)
+        cursor = esquerda + (no.largura_subarvore - soma) / 2
+        for filho in no.filhos:
+            posicionar(filho, cursor, nivel + 1)
+            cursor += filho.largura_subarvore + ESPACO_HORIZONTAL
+        no.x = (no.filhos[0].x + no.filhos[-1].x) / 2
+
+    medir(raiz)
+    posicionar(raiz, MARGEM, 0)
+    niveis = max(no.nivel for no in ordem) + 1
+    largura = raiz.largura_subarvore + 2 * MARGEM
+    altura = 2 * MARGEM + niveis * altura_nivel + (niveis - 1) * ESPACO_VERTICAL
+    return ordem, largura, altura
 
 
 class GrafoExecucao:
     """Classe para gerar grafos de execução de álgebra relacional"""
-    
-    def __init__(self, parsed_query: dict):
+
+    def __init__(self, parsed_query: dict, explicacao=None):
         """
         Inicializa o gerador de grafo
-        
+
         Args:
             parsed_query: Dicionário retornado pelo Parser
+            explicacao: `ExplicacaoPlano` do mesmo parsed (`Executor.explicar`);
+                se informada, desenha o plano físico anotado
         """
         self.parsed = parsed_query
+        self.explicacao = explicacao
         self.select_cols = parsed_query.get('SELECT', [])
         self.from_table = parsed_query.get('FROM', '')
         self.inner_joins = parsed_query.get('INNER_JOIN', [])
         self.where_clause = parsed_query.get('WHERE', None)
 
-    def gerar_grafo_networkx(self, nome_arquivo: str = 'grafo_networkx.png') -> str:
+    def _arvore(self) -> NoDesenho:
+        if self.explicacao is not None:
+            return _converter_operador(self.explicacao.raiz, self.explicacao)
+        return _converter(construir_plano(self.parsed))
+
+    def gerar_ascii_tree(self) -> str:
+        """Árvore do plano em texto, raiz no topo (com a anotação do EXPLAIN, se houver)"""
+        linhas = []
+
+        def visitar(no: NoDesenho, prefixo: str, ultimo: bool, raiz: bool):
+            rotulo = f"{no.rotulo}  ({no.detalhe})" if no.detalhe else no.rotulo
+            if raiz:
+                linhas.append(rotulo)
+                prefixo_filhos = ''
+            else:
+                linhas.append(f"{prefixo}{'└── ' if ultimo else '├── '}{rotulo}")
+                prefixo_filhos = prefixo + ('    ' if ultimo else '│   ')
+            for i, filho in enumerate(no.filhos):
+                visitar(filho, prefixo_filhos, i == len(no.filhos) - 1, False)
+
+        visitar(self._arvore(), '', True, True)
+        return '\n'.join(linhas)
+
+    def gerar_ordem_execucao(self) -> list:
         """
-        Gera uma imagem PNG usando NetworkX + Matplotlib (puro Python, sem binários externos).
-        Requer as bibliotecas opcionais `networkx` e `matplotlib`.
+        Operadores na ordem em que são avaliados (filhos antes do pai)
+
+        Returns:
+            Lista de (tipo do nó, rótulo)
         """
-        if not NETWORKX_DISPONIVEL:
-            raise ImportError("Dependências ausentes. Instale: pip install networkx matplotlib")
-
-        G = nx.DiGraph()
-
-        # Criar nós
-        def add_node(nid: str, label: str, tipo: str):
-            G.add_node(nid, label=label, tipo=tipo)
-
-        # Criar arestas
-        def add_edge(a: str, b: str):
-            G.add_edge(a, b)
-
-        nid_counter = 0
-        def next_id():
-            nonlocal nid_counter
-            nid_counter += 1
-            return f"n{nid_counter}"
-
-        n_from = next_id()
-        add_node(n_from, self.from_table, 'tabela')
-        ultimo = n_from
-        
-        # Adicionar projeção antecipada para a tabela FROM (se existir)
-        from_projecao_antecipada = self.parsed.get('FROM_PROJECAO_ANTECIPADA', None)
-        if from_projecao_antecipada:
-            n_proj_from = next_id()
-            cols_proj = ', '.join(from_projecao_antecipada)
-            add_node(n_proj_from, f"π {cols_proj}", 'projecao')
-            add_edge(ultimo, n_proj_from)
-            ultimo = n_proj_from
-        
-        # Adicionar seleção antecipada para a tabela FROM (se existir)
-        from_where_antecipado = self.parsed.get('FROM_WHERE_ANTECIPADO', None)
-        if from_where_antecipado:
-            n_sel_from = next_id()
-            add_node(n_sel_from, f"σ {from_where_antecipado}", 'selecao')
-            add_edge(ultimo, n_sel_from)
-            ultimo = n_sel_from
-
-        for join in self.inner_joins:
-            n_tab = next_id()
-            add_node(n_tab, join['tabela'], 'tabela')
-            
-            # Se tem projecao_antecipada, adiciona nó de projeção
-            if 'projecao_antecipada' in join:
-                n_proj_antecipada = next_id()
-                cols_proj = ', '.join(join['projecao_antecipada'])
-                add_node(n_proj_antecipada, f"π {cols_proj}", 'projecao')
-                add_edge(n_tab, n_proj_antecipada)
-                n_tab = n_proj_antecipada  # Atualiza para usar o nó de projeção
-            
-            # Se tem where_antecipado, adiciona nó de seleção antes da junção
-            if 'where_antecipado' in join:
-                n_sel_antecipada = next_id()
-                add_node(n_sel_antecipada, f"σ {join['where_antecipado']}", 'selecao')
-                add_edge(n_tab, n_sel_antecipada)
-                n_tab = n_sel_antecipada  # Atualiza para usar o nó de seleção
-            
-            n_join = next_id()
-            add_node(n_join, f"⋈ {join['condicao']}", 'juncao')
-            add_edge(ultimo, n_join)
-            add_edge(n_tab, n_join)
-            ultimo = n_join
-
-        if self.where_clause:
-            n_sel = next_id()
-            add_node(n_sel, f"σ {self.where_clause}", 'selecao')
-            add_edge(ultimo, n_sel)
-            ultimo = n_sel
-
-        if self.select_cols != ['*']:
-            cols = ', '.join(self.select_cols)
-            n_proj = next_id()
-            add_node(n_proj, f"π {cols}", 'projecao')
-            add_edge(ultimo, n_proj)
-            ultimo = n_proj
-
-        # Layout simples (spring)
-        pos = nx.spring_layout(G, seed=42)
-
-        # Cores por tipo
-        color_map = {
-            'tabela': '#cfe8ff',
-            'juncao': '#f4cccc',
-            'selecao': '#fff2cc',
-            'projecao': '#d9ead3',
+        ordem = []
+
+        def visitar(no: NoDesenho):
+            for filho in no.filhos:
+                visitar(filho)
+            ordem.append((no.tipo, no.rotulo))
+
+        visitar(self._arvore())
+        return ordem
+
+    def exibir_estatisticas(self) -> dict:
+        """Contagem de operadores por tipo e altura do plano (mais os totais do EXPLAIN, se houver)"""
+        raiz = self._arvore()
+        contagem = {tipo: 0 for tipo in CORES}
+        ordem, _, _ = calcular_layout(raiz)
+        for no in ordem:
+            contagem[no.tipo] = contagem.get(no.tipo, 0) + 1
+        estatisticas = {
+            'Operadores': len(ordem),
+            'Tabelas': contagem['tabela'],
+            'Junções': contagem['juncao'],
+            'Seleções': contagem['selecao'],
+            'Projeções': contagem['projecao'],
         }
-        node_colors = [color_map.get(G.nodes[n].get('tipo', ''), '#ffffff') for n in G.nodes]
-        labels = {n: G.nodes[n].get('label', n) for n in G.nodes}
+        if contagem['semijuncao']:
+            estatisticas['Semijunções'] = contagem['semijuncao']
+        estatisticas['Níveis'] = max(no.nivel for no in ordem) + 1
+        if self.explicacao is not None:
+            estatisticas.update(self.explicacao.resumo())
+        return estatisticas
+
+    def gerar_dot(self) -> str:
+        """Grafo no formato DOT do Graphviz (arestas no sentido do fluxo de dados)"""
+        def aspas(texto: str) -> str:
+            return '"' + texto.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+
+        linhas = [
+            'digraph plano {',
+            '  rankdir=BT;',
+            '  node [shape=box, style="rounded,filled", fontname="Helvetica", fontsize=10];',
+        ]
+        ordem, _, _ = calcular_layout(self._arvore())
+        ids = {id(no): f"n{i}" for i, no in enumerate(ordem, 1)}
+        for no in ordem:
+            rotulo = f"{no.rotulo}\n{no.detalhe}" if no.detalhe else no.rotulo
+            linhas.append(f"  {ids[id(no)]} [label={aspas(rotulo)}, fillcolor={aspas(CORES.get(no.tipo, '#ffffff'))}];")
+        for no in ordem:
+            for filho in no.filhos:
+                linhas.append(f"  {ids[id(filho)]} -> {ids[id(no)]};")
+        linhas.append('}')
+        return '\n'.join(linhas)
 
-        plt.figure(figsize=(10, 8))
-        nx.draw_networkx_nodes(G, pos, node_color=node_colors, node_size=1500, edgecolors='#666')
-        nx.draw_networkx_edges(G, pos, arrows=True, arrowstyle='-|>', arrowsize=15, edge_color='#888')
-        nx.draw_networkx_labels(G, pos, labels, font_size=8)
-        plt.axis('off')
+    def gerar_svg(self, nome_arquivo: str | None = None) -> str:
+        """
+        Desenha o plano em SVG (sem dependências externas)
+
+        Args:
+            nome_arquivo: Se informado, também grava o SVG neste arquivo
+
+        Returns:
+            O documento SVG
+        """
+        ordem, largura, altura = calcular_layout(self._arvore())
+        partes = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{largura:.0f}" height="{altura:.0f}" '
+            f'viewBox="0 0 {largura:.0f} {altura:.0f}" font-family="Helvetica, Arial, sans-serif" font-size="12">',
+            '<defs><marker id="seta" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="8" markerHeight="8" '
+            'orient="auto"><path d="M0,0 L10,5 L0,10 z" fill="#888"/></marker></defs>',
+        ]
+        for no in ordem:
+            for filho in no.filhos:
+                partes.append(
+                    f'<line x1="{filho.x:.1f}" y1="{filho.y:.1f}" x2="{no.x:.1f}" y2="{no.y + no.altura:.1f}" '
+                    f'stroke="#888" stroke-width="1.5" marker-end="url(#seta)"/>'
+                )
+        for no in ordem:
+            detalhe = ''
+            if no.detalhe:
+                detalhe = (
+                    f'<text x="{no.x:.1f}" y="{no.y + ALTURA_NO + ALTURA_DETALHE / 2 - 4:.1f}" '
+                    f'text-anchor="middle" dominant-baseline="central" font-size="10" '
+                    f'fill="#444">{escape(no.detalhe)}</text>'
+                )
+            partes.append(
+                f'<g><title>{escape(no.rotulo)}</title>'
+                f'<rect x="{no.x - no.largura / 2:.1f}" y="{no.y:.1f}" width="{no.largura}" height="{no.altura}" '
+                f'rx="6" fill="{CORES.get(no.tipo, "#ffffff")}" stroke="#666"/>'
+                f'<text x="{no.x:.1f}" y="{no.y + ALTURA_NO / 2:.1f}" text-anchor="middle" '
+                f'dominant-baseline="central">{escape(no.texto)}</text>{detalhe}</g>'
+            )
+        partes.append('</svg>')
+        svg = '\n'.join(partes)
+
+        if nome_arquivo:
+            with open(nome_arquivo, 'w', encoding='utf-8') as arquivo:
+                arquivo.write(svg)
+        return svg
+
+    def _desenhar_png(self, destino, dpi: int = 150):
+        """Rasteriza o mesmo layout do SVG com Matplotlib em `destino` (caminho ou arquivo binário)"""
+        if not MATPLOTLIB_DISPONIVEL:
+            raise ImportError("Dependência ausente. Instale: pip install matplotlib")
+        from matplotlib.figure import Figure  # type: ignore
+        from matplotlib.patches import FancyBboxPatch  # type: ignore
 
+        ordem, largura, altura = calcular_layout(self._arvore())
+        figura = Figure(figsize=(largura / 100, altura / 100))
+        eixo = figura.add_axes((0, 0, 1, 1))
+        eixo.set_xlim(0, largura)
+        eixo.set_ylim(altura, 0)
+        eixo.axis('off')
+
+        for no in ordem:
+            for filho in no.filhos:
+                eixo.annotate(
+                    '', xy=(no.x, no.y + no.altura), xytext=(filho.x, filho.y),
+                    arrowprops={'arrowstyle': '-|>', 'color': '#888', 'lw': 1.5},
+                )
+        for no in ordem:
+            eixo.add_patch(FancyBboxPatch(
+                (no.x - no.largura / 2, no.y), no.largura, no.altura,
+                boxstyle='round,pad=0,rounding_size=6',
+                facecolor=CORES.get(no.tipo, '#ffffff'), edgecolor='#666',
+            ))
+            eixo.text(no.x, no.y + ALTURA_NO / 2, no.texto, ha='center', va='center', fontsize=8)
+            if no.detalhe:
+                eixo.text(no.x, no.y + ALTURA_NO + ALTURA_DETALHE / 2 - 4, no.detalhe,
+                          ha='center', va='center', fontsize=7, color='#444')
+
+        figura.savefig(destino, dpi=dpi, format='png')
+
+    def gerar_grafo_networkx(self, nome_arquivo: str = 'grafo_networkx.png') -> str:
+        """
+        Gera uma imagem PNG do plano (layout hierárquico, rasterizado com Matplotlib).
+        Requer a biblioteca opcional `matplotlib`; para saída sem dependências use `gerar_svg`.
+        O nome é mantido por compatibilidade (o NetworkX não é mais necessário).
+        """
         try:
-            plt.tight_layout()
-            plt.savefig(nome_arquivo, dpi=180)
-            plt.close()
+            self._desenhar_png(nome_arquivo)
+        except ImportError:
+            raise
         except Exception as e:
-            plt.close()
-            raise Exception(f"Erro ao salvar imagem NetworkX: {e}")
+            raise Exception(f"Erro ao salvar imagem PNG: {e}")
 
-        import os
         return os.path.abspath(nome_arquivo)
+
+    def gerar_png_bytes(self, dpi: int = 150) -> bytes:
+        """Mesma imagem de `gerar_grafo_networkx`, gerada em memória (sem tocar o disco)"""
+        buffer = io.BytesIO()
+        self._desenhar_png(buffer, dpi=dpi)
+        return buffer.getvalue()
@@ -0,0 +1,178 @@
+import math
+
+from classes.catalogo import catalogo_padrao
+from classes.estimador import EstimadorCardinalidade
+from classes.heuristica_caminho_acesso import CUSTO_LINHA_INDICE
+from classes.plano import AcessoIndice, conjuncoes
+
+# Anotação do algoritmo escolhido em cada INNER_JOIN
+CHAVE_ALGORITMO = 'algoritmo'
+ALGORITMOS = ('hash', 'merge', 'indice', 'loop')
+
+# Custos relativos à leitura sequencial de uma linha
+CUSTO_CONSTRUCAO_HASH = 2.0
+CUSTO_COMPARACAO_ORDENACAO = 1.0
+
+
+def custo_leitura(estimador: EstimadorCardinalidade, tabela: str, acesso: dict | None) -> float:
+    """Custo de ler a folha: scan de todas as linhas ou busca no índice da anotação 'acesso'"""
+    linhas = estimador.linhas_tabela(tabela)
+    acesso = AcessoIndice.de_anotacao(acesso)
+    if acesso is None:
+        return linhas
+    seletividade = estimador.selecao(linhas, list(acesso.predicados)) / max(linhas, 1.0)
+    return seletividade * linhas * CUSTO_LINHA_INDICE + math.log2(linhas + 1)
+
+
+class HeuristicaAlgoritmoJuncao:
+    """
+    Escolhe o algoritmo físico de cada INNER_JOIN pelo custo estimado:
+
+    - hash: constrói a tabela hash sobre a menor entrada e sonda com a outra
+    - merge: intercala as duas entradas ordenadas pela chave; entradas já
+      ordenadas (lidas por um índice ordenado na coluna da chave, ou saída de
+      outra junção merge pela mesma chave) não precisam ser ordenadas
+    - indice: laços aninhados com busca no índice da tabela da direita pela
+      chave de cada linha da esquerda; a tabela da direita nem é lida por
+      inteiro, o que compensa quando a esquerda é pequena
+    - loop: laços aninhados (única opção sem igualdade entre colunas)
+
+    Cardinalidades vêm do `EstimadorCardinalidade` (estatísticas do
+    catálogo, se houver) e das condições antecipadas de cada tabela. A
+    escolha vira a anotação 'algoritmo' do JOIN, usada pelo executor e
+    exibida na álgebra relacional (ex: ⋈[merge]).
+    """
+
+    def __init__(self, parsed_query: dict, catalogo=None, estimador: EstimadorCardinalidade | None = None):
+        self.parsed_original = parsed_query or {}
+        self.catalogo = catalogo if catalogo is not None else catalogo_padrao()
+        self.estimador = estimador if estimador is not None else EstimadorCardinalidade(self.catalogo)
+
+    def _tem_indice(self, coluna, tipos=('hash', 'ordenado')) -> bool:
+        return any(
+            indice.tipo in tipos for indice in self.catalogo.indices_coluna(coluna.tabela, coluna.nome)
+        )
+
+    def _leitura_ordenada(self, tabela: str, acesso: dict | None, coluna) -> bool:
+        """Indica se a folha pode ser lida em ordem da coluna (índice ordenado)"""
+        if coluna.tabela.upper() != tabela.upper() or not self._tem_indice(coluna, ('ordenado',)):
+            return False
+        if not acesso:
+            return True
+        return acesso['indice'] == 'ordenado' and acesso['coluna'] == coluna.qualificado
+
+    @staticmethod
+    def _ordenar(linhas: float) -> float:
+        return linhas * math.log2(linhas + 1) * CUSTO_COMPARACAO_ORDENACAO
+
+    def _chave(self, predicados: tuple, tabela_direita: str, tabelas_esquerda: set):
+        """(coluna da esquerda, coluna da direita, predicado) da primeira equi-junção entre os lados"""
+        for predicado in predicados:
+            if not predicado.eh_equijuncao:
+                continue
+            a, b = predicado.esquerda, predicado.direita
+            if a.tabela.upper() == tabela_direita.upper():
+                a, b = b, a
+            if b.tabela.upper() == tabela_direita.upper() and a.tabela.upper() in tabelas_esquerda:
+                return a, b, predicado
+        return None
+
+    def _custos(self, join: dict, linhas_esq: float, ordem_esq: tuple, tabelas_esquerda: set) -> tuple:
+        """
+        Custo de cada algoritmo aplicável ao JOIN
+
+        Returns:
+            ({algoritmo: custo}, chave (esq, dir, predicado) ou None, linhas da saída)
+        """
+        tabela = join['tabela']
+        predicados = conjuncoes(join.get('condicao'))
+        filtros = list(conjuncoes(join.get('where_antecipado')))
+        linhas_tabela = self.estimador.linhas_tabela(tabela)
+        linhas_dir = self.estimador.selecao(linhas_tabela, filtros)
+        leitura_dir = custo_leitura(self.estimador, tabela, join.get('acesso'))
+
+        chave = self._chave(predicados, tabela, tabelas_esquerda)
+        chaves = [p for p in predicados if p.eh_equijuncao]
+        residuais = [p for p in predicados if not p.eh_equijuncao]
+        linhas_saida = self.estimador.juncao(linhas_esq, linhas_dir, chaves, residuais)
+
+        if chave is None:
+            return {'loop': leitura_dir + linhas_esq * linhas_dir}, None, linhas_saida
+
+        coluna_esq, coluna_dir, predicado = chave
+        custos = {
+            'hash': leitura_dir + CUSTO_CONSTRUCAO_HASH * min(linhas_esq, linhas_dir) + max(linhas_esq, linhas_dir),
+            'loop': leitura_dir + linhas_esq * linhas_dir,
+        }
+
+        dir_ordenada = self._leitura_ordenada(tabela, join.get('acesso'), coluna_dir)
+        esq_ordenada = coluna_esq.qualificado in ordem_esq
+        custos['merge'] = (
+            leitura_dir + linhas_esq + linhas_dir
+            + (0.0 if esq_ordenada else self._ordenar(linhas_esq))
+            + (0.0 if dir_ordenada else self._ordenar(linhas_dir))
+        )
+
+        if self._tem_indice(coluna_dir):
+            seletividade = self.estimador.seletividade_juncao(predicado, linhas_esq, linhas_tabela)
+            if seletividade is None:
+                seletividade = 1 / max(linhas_tabela, 1.0)
+            descida = 1.0 if self._tem_indice(coluna_dir, ('hash',)) else math.log2(linhas_tabela + 1)
+            correspondencias = linhas_esq * linhas_tabela * seletividade
+            custos['indice'] = linhas_esq * descida + correspondencias * CUSTO_LINHA_INDICE
+
+        return custos, chave, linhas_saida
+
+    def _ordem_inicial(self, parsed: dict, joins: list) -> tuple:
+        """Colunas pelas quais a tabela do FROM pode ser lida em ordem (chave do 1º JOIN)"""
+        tabela = parsed['FROM']
+        chave = self._chave(conjuncoes(joins[0].get('condicao')), joins[0]['tabela'], {tabela.upper()})
+        if chave is not None and self._leitura_ordenada(tabela, parsed.get('FROM_ACESSO'), chave[0]):
+            return (chave[0].qualificado,)
+        return ()
+
+    def otimizar(self) -> dict:
+        """
+        Retorna o parsed com o algoritmo de cada JOIN anotado
+
+        Retorna o parsed de entrada (sem cópia) se nenhuma anotação mudar; só
+        os JOINs cuja anotação muda são recriados.
+        """
+        parsed = self.parsed_original
+        inner_joins = parsed.get('INNER_JOIN', []) or []
+        if not inner_joins or not parsed.get('FROM'):
+            return parsed
+
+        tabela_from = parsed['FROM']
+        linhas = self.estimador.selecao(
+            self.estimador.linhas_tabela(tabela_from), list(conjuncoes(parsed.get('FROM_WHERE_ANTECIPADO')))
+        )
+        ordem = self._ordem_inicial(parsed, inner_joins)
+        tabelas_esquerda = {tabela_from.upper()}
+
+        joins = []
+        alterou = False
+        for join in inner_joins:
+            custos, chave, linhas_saida = self._custos(join, linhas, ordem, tabelas_esquerda)
+            algoritmo = min(custos, key=lambda nome: (custos[nome], ALGORITMOS.index(nome)))
+
+            if algoritmo == 'merge':
+                # Saída em ordem da chave (igual nas colunas dos dois lados)
+                ordem = (chave[0].qualificado, chave[1].qualificado)
+            elif algoritmo == 'hash':
+                ordem = ()
+            # indice e loop percorrem a esquerda em sequência: a ordem se mantém
+
+            if join.get(CHAVE_ALGORITMO) != algoritmo:
+                join = dict(join)
+                join[CHAVE_ALGORITMO] = algoritmo
+                alterou = True
+            joins.append(join)
+            linhas = linhas_saida
+            tabelas_esquerda.add(join['tabela'].upper())
+
+        if not alterou:
+            return parsed
+        parsed_otimizado = dict(parsed)
+        parsed_otimizado['INNER_JOIN'] = joins
+        return parsed_otimizado
@@ -1,23 +1,33 @@
+from classes.catalogo import catalogo_padrao
+from classes.plano import Coluna, conjuncoes
+
+
 class HeuristicaReducaoAtributos:
-    def __init__(self, parsed_query: dict):
+    def __init__(self, parsed_query: dict, catalogo=None):
         self.parsed_original = parsed_query
+        self.catalogo = catalogo if catalogo is not None else catalogo_padrao()
+        self._tabelas_consulta = []
+
+    def _qualificar(self, coluna: Coluna) -> list:
+        """
+        Tabela.Coluna da coluna; sem tabela, uma entrada para cada tabela da
+        query que tem a coluna (se for ambígua, nenhuma delas pode descartá-la)
+        """
+        if coluna.tabela:
+            return [coluna.qualificado]
+        return [
+            f"{tabela}.{coluna.nome}" for tabela in self._tabelas_consulta
+            if self.catalogo.existe_coluna(tabela, coluna.nome)
+        ]
 
     def _extrair_colunas_necessarias(self, texto: str) -> list:
         """Extrai todas as colunas (Tabela.Coluna) de um texto"""
         colunas = []
-        if not texto:
-            return colunas
-        
-        # Remove parênteses e quebra em palavras
-        palavras = texto.replace('(', '').replace(')', '').split()
         
-        for palavra in palavras:
-            # Se tem ponto e não é um operador, é uma coluna
-            if '.' in palavra and not any(op in palavra for op in ['=', '>', '<', '!', 'LIKE']):
-                # Remove possíveis vírgulas ou aspas
-                coluna = palavra.strip(',').strip("'").strip('"')
-                if coluna:
-                    colunas.append(coluna)
+        # Usa as conjunções já analisadas em vez de quebrar o texto em palavras
+        for predicado in conjuncoes(texto):
+            for coluna in predicado.colunas:
+                colunas.extend(self._qualificar(coluna))
         
         return colunas
 
@@ -33,20 +43,30 @@ class HeuristicaReducaoAtributos:
         return resultado
 
     def otimizar(self) -> dict:
-        """Otimiza a query aplicando projeções o mais cedo possível"""
+        """
+        Otimiza a query aplicando projeções o mais cedo possível
+
+        Só os JOINs cuja projeção muda são recriados; os demais (e o próprio
+        dicionário, se nada mudar) são reaproveitados sem cópia.
+        """
         select_cols = self.parsed_original.get('SELECT', [])
         from_table = self.parsed_original.get('FROM', '')
         inner_joins = self.parsed_original.get('INNER_JOIN', [])
         where_clause = self.parsed_original.get('WHERE', None)
         from_where_antecipado = self.parsed_original.get('FROM_WHERE_ANTECIPADO', None)
+        self._tabelas_consulta = [from_table] + [join['tabela'] for join in inner_joins]
+
+        # SELECT * precisa de todas as colunas: não há o que podar
+        if '*' in select_cols:
+            return self.parsed_original
 
         # Coleta todas as colunas necessárias
         todas_colunas = []
         
         # Colunas do SELECT
         for col in select_cols:
-            if '.' in col:
-                todas_colunas.append(col)
+            tabela, _, nome = col.rpartition('.')
+            todas_colunas.extend(self._qualificar(Coluna(tabela or None, nome)))
         
         # Colunas do WHERE principal
         todas_colunas.extend(self._extrair_colunas_necessarias(where_clause))
@@ -67,42 +87,35 @@ class HeuristicaReducaoAtributos:
         todas_colunas = list(set(todas_colunas))
         colunas_por_tabela = self._agrupar_por_tabela(todas_colunas)
 
-        # Adiciona projeções aos JOINs
+        # Adiciona projeções aos JOINs (reaproveita os que não mudam)
         joins_otimizados = []
         for join in inner_joins:
-            tabela = join['tabela']
-            join_otimizado = {
-                'tabela': tabela,
-                'condicao': join['condicao']
-            }
-            
-            # Preserva where_antecipado se existir
-            if 'where_antecipado' in join:
-                join_otimizado['where_antecipado'] = join['where_antecipado']
-            
-            # Adiciona projeção antecipada se houver colunas para esta tabela
-            if tabela in colunas_por_tabela:
-                join_otimizado['projecao_antecipada'] = sorted(colunas_por_tabela[tabela])
-            
-            joins_otimizados.append(join_otimizado)
+            projecao = colunas_por_tabela.get(join['tabela'])
+            projecao = sorted(projecao) if projecao else None
+            if join.get('projecao_antecipada') != projecao:
+                join = dict(join)
+                if projecao:
+                    join['projecao_antecipada'] = projecao
+                else:
+                    join.pop('projecao_antecipada', None)
+            joins_otimizados.append(join)
 
-        # Constrói o resultado mantendo a estrutura padrão
-        resultado = {
-            'SELECT': select_cols,
-            'FROM': from_table,
-            'INNER_JOIN': joins_otimizados
-        }
-        
-        # Adiciona WHERE somente se houver valor
-        if where_clause:
-            resultado['WHERE'] = where_clause
-        
-        # Preserva FROM_WHERE_ANTECIPADO se existir
-        if from_where_antecipado:
-            resultado['FROM_WHERE_ANTECIPADO'] = from_where_antecipado
+        projecao_from = colunas_por_tabela.get(from_table)
+        projecao_from = sorted(projecao_from) if projecao_from else None
+
+        mudou_from = self.parsed_original.get('FROM_PROJECAO_ANTECIPADA') != projecao_from
+        mudou_joins = any(a is not b for a, b in zip(joins_otimizados, inner_joins))
+        if not mudou_from and not mudou_joins:
+            return self.parsed_original
+
+        # Constrói o resultado mantendo as demais chaves
+        resultado = dict(self.parsed_original)
+        resultado['INNER_JOIN'] = joins_otimizados
         
         # Adiciona projeção antecipada para FROM se houver
-        if from_table in colunas_por_tabela:
-            resultado['FROM_PROJECAO_ANTECIPADA'] = sorted(colunas_por_tabela[from_table])
+        if projecao_from:
+            resultado['FROM_PROJECAO_ANTECIPADA'] = projecao_from
+        else:
+            resultado.pop('FROM_PROJECAO_ANTECIPADA', None)
         
-        return resultado
\ No newline at end of file
+        return resultado
@@ -0,0 +1,133 @@
+import math
+
+from classes.catalogo import catalogo_padrao
+from classes.estimador import EstimadorCardinalidade
+from classes.plano import conjuncoes
+from classes.predicados import filtro_literal
+
+# Anotação do caminho de acesso: chave no JOIN e equivalente da tabela do FROM
+CHAVE_ACESSO = 'acesso'
+CHAVE_ACESSO_FROM = 'FROM_ACESSO'
+
+# Custo de buscar uma linha pelo índice em relação a lê-la num scan sequencial
+# (acesso fora de ordem às linhas da tabela)
+CUSTO_LINHA_INDICE = 4.0
+
+OPERADORES_LIMITE_INFERIOR = ('>', '>=')
+OPERADORES_LIMITE_SUPERIOR = ('<', '<=')
+
+
+class HeuristicaCaminhoAcesso:
+    """
+    Escolhe, para cada tabela base, entre scan sequencial e busca por índice.
+
+    Os candidatos são as comparações `coluna <op> literal` já antecipadas
+    ('where_antecipado' / FROM_WHERE_ANTECIPADO) sobre colunas com índice
+    declarado no catálogo:
+
+    - índice hash: igualdade
+    - índice ordenado: igualdade ou intervalo (um limite inferior e/ou um
+      superior sobre a mesma coluna)
+
+    O custo da busca é seletividade × linhas × CUSTO_LINHA_INDICE (mais a
+    descida no índice); o do scan é o número de linhas. O índice só é usado
+    quando é mais barato, e a escolha vira a anotação 'acesso' do JOIN
+    (FROM_ACESSO para a tabela do FROM):
+
+        {'indice': 'ordenado', 'coluna': 'PRODUTO.PRECO', 'condicao': 'PRODUTO.PRECO > 100'}
+
+    As condições resolvidas pelo índice continuam no 'where_antecipado'; o
+    plano (`classes.plano.construir_folha`) as retira da σ da folha.
+    """
+
+    SEPARADOR_AND = ' AND '
+
+    def __init__(self, parsed_query: dict, catalogo=None, estimador: EstimadorCardinalidade | None = None):
+        self.parsed_original = parsed_query or {}
+        self.catalogo = catalogo if catalogo is not None else catalogo_padrao()
+        self.estimador = estimador if estimador is not None else EstimadorCardinalidade(self.catalogo)
+
+    def _candidatos(self, tabela: str, where_antecipado: str | None) -> list:
+        """(seletividade, anotação) para cada uso possível de um índice da tabela"""
+        por_coluna = {}
+        for predicado in conjuncoes(where_antecipado):
+            filtro = filtro_literal(predicado)
+            if filtro is None or filtro[0].tabela is None or filtro[0].tabela.upper() != tabela.upper():
+                continue
+            por_coluna.setdefault(filtro[0].qualificado, []).append((predicado, filtro[1]))
+
+        candidatos = []
+        for qualificado, filtros in por_coluna.items():
+            nome_coluna = qualificado.split('.', 1)[1]
+            for indice in self.catalogo.indices_coluna(tabela, nome_coluna):
+                escolhidos = self._predicados_indice(indice.tipo, filtros)
+                if not escolhidos:
+                    continue
+                seletividade = 1.0
+                for predicado in escolhidos:
+                    seletividade *= self.estimador.seletividade(predicado)
+                candidatos.append((seletividade, {
+                    'indice': indice.tipo,
+                    'coluna': qualificado,
+                    'condicao': self.SEPARADOR_AND.join(p.texto for p in escolhidos),
+                }))
+        return candidatos
+
+    @staticmethod
+    def _predicados_indice(tipo: str, filtros: list) -> list:
+        """Predicados de uma coluna que o índice consegue resolver"""
+        for predicado, operador in filtros:
+            if operador == '=':
+                return [predicado]
+        if tipo != 'ordenado':
+            return []
+        inferior = next((p for p, op in filtros if op in OPERADORES_LIMITE_INFERIOR), None)
+        superior = next((p for p, op in filtros if op in OPERADORES_LIMITE_SUPERIOR), None)
+        return [p for p in (inferior, superior) if p is not None]
+
+    def _acesso(self, tabela: str, where_antecipado: str | None) -> dict | None:
+        """Anotação do índice mais barato, ou None se o scan sequencial for melhor"""
+        candidatos = self._candidatos(tabela, where_antecipado)
+        if not candidatos:
+            return None
+        linhas = self.estimador.linhas_tabela(tabela)
+        seletividade, anotacao = min(candidatos, key=lambda candidato: candidato[0])
+        custo_indice = seletividade * linhas * CUSTO_LINHA_INDICE + math.log2(linhas + 1)
+        return anotacao if custo_indice < linhas else None
+
+    def otimizar(self) -> dict:
+        """
+        Retorna o parsed com os caminhos de acesso anotados
+
+        Retorna o parsed de entrada (sem cópia) se nenhuma anotação mudar; só
+        os JOINs cuja anotação muda são recriados.
+        """
+        parsed = self.parsed_original
+        if not parsed.get('FROM'):
+            return parsed
+
+        parsed_otimizado = None
+        acesso_from = self._acesso(parsed['FROM'], parsed.get('FROM_WHERE_ANTECIPADO'))
+        if acesso_from != parsed.get(CHAVE_ACESSO_FROM):
+            parsed_otimizado = dict(parsed)
+            if acesso_from is None:
+                parsed_otimizado.pop(CHAVE_ACESSO_FROM, None)
+            else:
+                parsed_otimizado[CHAVE_ACESSO_FROM] = acesso_from
+
+        joins = []
+        alterou_joins = False
+        for join in parsed.get('INNER_JOIN', []) or []:
+            acesso = self._acesso(join['tabela'], join.get('where_antecipado'))
+            if acesso != join.get(CHAVE_ACESSO):
+                join = {chave: valor for chave, valor in join.items() if chave != CHAVE_ACESSO}
+                if acesso is not None:
+                    join[CHAVE_ACESSO] = acesso
+                alterou_joins = True
+            joins.append(join)
+
+        if alterou_joins:
+            if parsed_otimizado is None:
+                parsed_otimizado = dict(parsed)
+            parsed_otimizado['INNER_JOIN'] = joins
+        return parsed_otimizado if parsed_otimizado is not None else parsed
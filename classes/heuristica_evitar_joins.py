@@ -1,4 +1,4 @@
-import re
+from classes.plano import conjuncoes
 
 
 class HeuristicaEvitarProdutoCartesiano:
@@ -21,16 +21,11 @@ class HeuristicaEvitarProdutoCartesiano:
 
 	SEPARADOR_AND = ' AND '
 
-	# Regex para extrair igualdades entre duas colunas: TABELA.COL = TABELA2.COL
-	RE_EQUIJOIN = re.compile(r"([A-Z0-9_]+)\.([A-Z0-9_]+)\s*=\s*([A-Z0-9_]+)\.([A-Z0-9_]+)")
-
 	def __init__(self, parsed_query: dict):
 		self.parsed_original = parsed_query or {}
 
 	def _extrair_condicoes_where(self, where_clause: str) -> list:
-		if not where_clause:
-			return []
-		return [c.strip() for c in where_clause.split(self.SEPARADOR_AND) if c.strip()]
+		return list(conjuncoes(where_clause))
 
 	def _encontrar_join_para_tabelas(self, inner_joins: list, t1: str, t2: str):
 		"""Retorna índice do join mais apropriado para associar a condição entre t1 e t2.
@@ -52,18 +47,23 @@ class HeuristicaEvitarProdutoCartesiano:
 
 		# Se algum candidato já tem condicao que menciona a outra tabela, escolha-o
 		for idx, j in candidatos:
-			cond = j.get('condicao', '') or ''
-			if t1 != j.get('tabela', '') and f"{t1}." in cond:
+			tabelas_cond = {t for p in conjuncoes(j.get('condicao')) for t in p.tabelas}
+			if t1 != j.get('tabela', '') and t1 in tabelas_cond:
 				return idx
-			if t2 != j.get('tabela', '') and f"{t2}." in cond:
+			if t2 != j.get('tabela', '') and t2 in tabelas_cond:
 				return idx
 
 		# Caso padrão: retorna o primeiro candidato
 		return candidatos[0][0]
 
 	def otimizar(self) -> dict:
-		parsed = dict(self.parsed_original) if self.parsed_original else {}
+		"""Retorna o parsed com as equijunções do WHERE movidas para os JOINs.
 
+		Os dicionários de JOIN de entrada nunca são alterados: só os JOINs que
+		recebem condições são recriados. Se nada mudar, o parsed de entrada é
+		retornado sem cópia.
+		"""
+		parsed = self.parsed_original
 		inner_joins = list(parsed.get('INNER_JOIN', []))
 		if not inner_joins:
 			return parsed
@@ -74,12 +74,12 @@ class HeuristicaEvitarProdutoCartesiano:
 		usadas = set()
 
 		# Tentar associar equijoins do WHERE aos JOINs
-		for i, cond in enumerate(condicoes):
-			m = self.RE_EQUIJOIN.search(cond)
-			if not m:
+		for i, predicado in enumerate(condicoes):
+			if not predicado.eh_equijuncao:
 				continue
 
-			t1, c1, t2, c2 = m.group(1), m.group(2), m.group(3), m.group(4)
+			cond = predicado.texto
+			t1, t2 = predicado.esquerda.tabela, predicado.direita.tabela
 
 			idx = self._encontrar_join_para_tabelas(inner_joins, t1, t2)
 			if idx is None:
@@ -88,33 +88,38 @@ class HeuristicaEvitarProdutoCartesiano:
 			join = inner_joins[idx]
 
 			# Se a condição já estiver presente, apenas marque como usada
-			if cond in (join.get('condicao') or ''):
+			textos_join = [p.texto for p in conjuncoes(join.get('condicao'))]
+			if cond in textos_join:
 				usadas.add(i)
 				continue
 
-			# Anexa a condição ao join (preservando possível condicao existente)
+			# Anexa a condição a uma cópia do join (preservando possível condicao existente)
+			join = dict(join)
 			if join.get('condicao'):
-				# evita duplicar
-				if cond not in join['condicao']:
-					join['condicao'] = f"{join['condicao']}{self.SEPARADOR_AND}{cond}"
+				join['condicao'] = f"{join['condicao']}{self.SEPARADOR_AND}{cond}"
 			else:
 				join['condicao'] = cond
 
 			inner_joins[idx] = join
 			usadas.add(i)
 
+		# Reordena INNER_JOIN: primeiros joins com condicao, depois sem condicao
+		with_cond = [j for j in inner_joins if j.get('condicao')]
+		without_cond = [j for j in inner_joins if not j.get('condicao')]
+		joins_ordenados = with_cond + without_cond
+
+		originais = parsed.get('INNER_JOIN', [])
+		if not usadas and all(a is b for a, b in zip(joins_ordenados, originais)):
+			return parsed
+
 		# Reconstrói WHERE com as condições não usadas
-		restantes = [c for idx, c in enumerate(condicoes) if idx not in usadas]
+		restantes = [c.texto for idx, c in enumerate(condicoes) if idx not in usadas]
 		parsed_atualizado = dict(parsed)
 		if restantes:
 			parsed_atualizado['WHERE'] = self.SEPARADOR_AND.join(restantes)
 		else:
 			parsed_atualizado['WHERE'] = None
-
-		# Reordena INNER_JOIN: primeiros joins com condicao, depois sem condicao
-		with_cond = [j for j in inner_joins if j.get('condicao')]
-		without_cond = [j for j in inner_joins if not j.get('condicao')]
-		parsed_atualizado['INNER_JOIN'] = with_cond + without_cond
+		parsed_atualizado['INNER_JOIN'] = joins_ordenados
 
 		return parsed_atualizado
 
@@ -0,0 +1,170 @@
+from classes.plano import Coluna, conjuncoes
+from classes.predicados import filtro_literal
+
+# Chaves da tabela do FROM equivalentes a 'where_antecipado' de um INNER_JOIN
+CHAVE_WHERE_FROM = 'FROM_WHERE_ANTECIPADO'
+
+
+class _UniaoBusca:
+    """Conjuntos disjuntos de colunas (union-find com compressão de caminho)"""
+
+    def __init__(self):
+        self.pai = {}
+
+    def encontrar(self, coluna: Coluna) -> Coluna:
+        self.pai.setdefault(coluna, coluna)
+        raiz = coluna
+        while self.pai[raiz] != raiz:
+            raiz = self.pai[raiz]
+        while self.pai[coluna] != raiz:
+            self.pai[coluna], coluna = raiz, self.pai[coluna]
+        return raiz
+
+    def unir(self, a: Coluna, b: Coluna):
+        raiz_a, raiz_b = self.encontrar(a), self.encontrar(b)
+        if raiz_a != raiz_b:
+            self.pai[raiz_b] = raiz_a
+
+    def classes(self) -> dict:
+        """Raiz -> colunas da classe (na ordem em que foram vistas)"""
+        resultado = {}
+        for coluna in self.pai:
+            resultado.setdefault(self.encontrar(coluna), []).append(coluna)
+        return resultado
+
+
+class HeuristicaPredicadosTransitivos:
+    """
+    Infere filtros por transitividade das igualdades de junção:
+
+    - as igualdades entre colunas (condições dos INNER_JOIN e do WHERE)
+      formam classes de equivalência de colunas (union-find)
+    - cada filtro `coluna <op> literal` (no WHERE ou já antecipado numa
+      tabela) vale para todas as colunas da mesma classe
+    - o filtro derivado é acrescentado ao 'where_antecipado' de cada tabela
+      da classe (FROM_WHERE_ANTECIPADO para a tabela do FROM)
+
+    Ex: CLIENTE.IDCLIENTE = PEDIDO.CLIENTE_IDCLIENTE e
+    PEDIDO.CLIENTE_IDCLIENTE = 42 geram CLIENTE.IDCLIENTE = 42 no CLIENTE.
+
+    Como todas as junções são internas, a igualdade garante valores iguais
+    (e não nulos) nas linhas do resultado, então o filtro derivado não muda
+    a resposta; só reduz as entradas das junções.
+    """
+
+    SEPARADOR_AND = ' AND '
+
+    def __init__(self, parsed_query: dict):
+        self.parsed_original = parsed_query or {}
+
+    @staticmethod
+    def _filtro_literal(predicado):
+        """(coluna qualificada, operador, literal) de uma comparação coluna-literal, senão None"""
+        filtro = filtro_literal(predicado)
+        return filtro if filtro is not None and filtro[0].tabela else None
+
+    def _condicoes_por_tabela(self, parsed: dict) -> dict:
+        """Tabela -> condição antecipada atual (texto)"""
+        condicoes = {parsed['FROM']: parsed.get(CHAVE_WHERE_FROM)}
+        for join in parsed.get('INNER_JOIN', []):
+            condicoes[join['tabela']] = join.get('where_antecipado')
+        return condicoes
+
+    def _derivar(self, parsed: dict, antecipadas: dict) -> dict:
+        """Tabela -> filtros derivados (textos) ainda ausentes na tabela"""
+        uniao = _UniaoBusca()
+        filtros = []
+        textos = [join.get('condicao') for join in parsed.get('INNER_JOIN', [])]
+        textos += [parsed.get('WHERE')] + list(antecipadas.values())
+        for texto in textos:
+            for predicado in conjuncoes(texto):
+                if predicado.eh_equijuncao:
+                    uniao.unir(predicado.esquerda, predicado.direita)
+                    continue
+                filtro = self._filtro_literal(predicado)
+                if filtro is not None:
+                    filtros.append(filtro)
+
+        # Filtros já presentes em cada tabela, na forma (coluna, operador, literal)
+        # (assim `42 > T.X` e `T.X < 42` contam como o mesmo filtro)
+        presentes = {
+            tabela: {self._chave(f) for f in map(self._filtro_literal, conjuncoes(texto)) if f}
+            for tabela, texto in antecipadas.items()
+        }
+        classes = uniao.classes()
+        derivados = {}
+        for coluna, operador, literal in filtros:
+            if coluna not in uniao.pai:
+                continue
+            for outra in classes[uniao.encontrar(coluna)]:
+                if outra == coluna or outra.tabela not in antecipadas:
+                    continue
+                chave = self._chave((outra, operador, literal))
+                if chave in presentes[outra.tabela]:
+                    continue
+                presentes[outra.tabela].add(chave)
+                derivados.setdefault(outra.tabela, []).append(f"{outra.qualificado} {operador} {literal.texto}")
+        return derivados
+
+    @staticmethod
+    def _chave(filtro: tuple) -> tuple:
+        coluna, operador, literal = filtro
+        return coluna, '<>' if operador == '!=' else operador, literal.texto
+
+    def _acrescentar(self, existente: str | None, condicoes: list) -> str:
+        atuais = [p.texto for p in conjuncoes(existente)]
+        return self.SEPARADOR_AND.join(atuais + condicoes)
+
+    def otimizar(self) -> dict:
+        """
+        Retorna o parsed com os filtros derivados antecipados
+
+        Retorna o parsed de entrada (sem cópia) se não houver JOINs, se nada
+        novo puder ser inferido ou se a mesma tabela aparecer mais de uma vez
+        (sem aliases não dá para saber a qual ocorrência a coluna se refere).
+        Só os JOINs que recebem filtros são recriados.
+        """
+        parsed = self.parsed_original
+        inner_joins = parsed.get('INNER_JOIN', [])
+        if not inner_joins or not parsed.get('FROM'):
+            return parsed
+
+        antecipadas = self._condicoes_por_tabela(parsed)
+        if len(antecipadas) != len(inner_joins) + 1:
+            return parsed
+
+        derivados = self._derivar(parsed, antecipadas)
+        if not derivados:
+            return parsed
+
+        parsed_otimizado = dict(parsed)
+        tabela_from = parsed['FROM']
+        if tabela_from in derivados:
+            parsed_otimizado[CHAVE_WHERE_FROM] = self._acrescentar(
+                parsed.get(CHAVE_WHERE_FROM), derivados[tabela_from]
+            )
+
+        joins = []
+        for join in inner_joins:
+            if join['tabela'] in derivados:
+                join = dict(join)
+                join['where_antecipado'] = self._acrescentar(
+                    join.get('where_antecipado'), derivados[join['tabela']]
+                )
+            joins.append(join)
+        parsed_otimizado['INNER_JOIN'] = joins
+        return parsed_otimizado
+
+
+if __name__ == '__main__':
+    exemplo = {
+        'SELECT': ['CLIENTE.NOME', 'PEDIDO.IDPEDIDO'],
+        'FROM': 'CLIENTE',
+        'INNER_JOIN': [
+            {'tabela': 'PEDIDO', 'condicao': 'CLIENTE.IDCLIENTE = PEDIDO.CLIENTE_IDCLIENTE',
+             'where_antecipado': 'PEDIDO.CLIENTE_IDCLIENTE = 42'},
+        ],
+        'WHERE': None,
+    }
+
+    print(HeuristicaPredicadosTransitivos(exemplo).otimizar())
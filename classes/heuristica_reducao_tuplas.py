@@ -1,3 +1,6 @@
+from classes.plano import conjuncoes
+
+
 class HeuristicaReducaoTuplas:
     # Constante para o separador AND
     SEPARADOR_AND = ' AND '
@@ -6,36 +9,45 @@ class HeuristicaReducaoTuplas:
         self.parsed_original = parsed_query
     
     def _extrair_condicoes_por_tabela(self, where_clause: str) -> dict:
-        """Extrai condições do WHERE agrupadas por tabela"""
+        """
+        Extrai do WHERE as cláusulas que referenciam uma única tabela
+
+        O WHERE já vem na forma normal conjuntiva (`conjuncoes`), então grupos
+        OR sobre uma só tabela também são antecipados; cláusulas com colunas
+        de mais de uma tabela (ou sem tabela) ficam no WHERE.
+        """
         condicoes_por_tabela = {}
         
-        if not where_clause:
-            return condicoes_por_tabela
-        
-        condicoes = where_clause.split(self.SEPARADOR_AND)
-        
-        for condicao in condicoes:
-            condicao = condicao.strip()
-            # Identifica qual tabela está sendo filtrada
-            for parte in condicao.split():
-                if '.' in parte and not any(op in parte for op in ['=', '>', '<', '!', 'LIKE']):
-                    tabela = parte.split('.')[0]
-                    if tabela not in condicoes_por_tabela:
-                        condicoes_por_tabela[tabela] = []
-                    condicoes_por_tabela[tabela].append(condicao)
-                    break
+        # Cláusulas já analisadas (cache compartilhado com o Parser)
+        for predicado in conjuncoes(where_clause):
+            if len(predicado.tabelas) == 1 and all(c.tabela for c in predicado.colunas):
+                tabela = predicado.tabelas[0]
+                if tabela not in condicoes_por_tabela:
+                    condicoes_por_tabela[tabela] = []
+                condicoes_por_tabela[tabela].append(predicado.texto)
         
         return condicoes_por_tabela
     
+    def _acrescentar(self, existente: str | None, condicoes: list) -> str:
+        """Junta condições novas às já antecipadas (sem repetir)"""
+        atuais = [p.texto for p in conjuncoes(existente)]
+        return self.SEPARADOR_AND.join(atuais + [c for c in condicoes if c not in atuais])
+
     def otimizar(self) -> dict:
-        """Otimiza a query aplicando seleções o mais cedo possível"""
-        select_cols = self.parsed_original.get('SELECT', [])
+        """
+        Otimiza a query aplicando seleções o mais cedo possível
+
+        Só os JOINs que recebem condições são recriados; os demais (e o
+        próprio dicionário, se nada mudar) são reaproveitados sem cópia.
+        """
         from_table = self.parsed_original.get('FROM', '')
         inner_joins = self.parsed_original.get('INNER_JOIN', [])
         where_clause = self.parsed_original.get('WHERE', None)
         
         # Identifica quais condições podem ser aplicadas antecipadamente
         condicoes_por_tabela = self._extrair_condicoes_por_tabela(where_clause)
+        if not condicoes_por_tabela:
+            return self.parsed_original
         
         # Cria nova estrutura de JOINs com seleções antecipadas
         joins_otimizados = []
@@ -43,43 +55,42 @@ class HeuristicaReducaoTuplas:
         
         for join in inner_joins:
             tabela = join['tabela']
-            join_otimizado = {
-                'tabela': tabela,
-                'condicao': join['condicao']
-            }
             
-            # Se há condições para esta tabela, adiciona where_antecipado
+            # Se há condições para esta tabela, acrescenta ao where_antecipado
             if tabela in condicoes_por_tabela:
-                join_otimizado['where_antecipado'] = self.SEPARADOR_AND.join(condicoes_por_tabela[tabela])
+                join = dict(join)
+                join['where_antecipado'] = self._acrescentar(
+                    join.get('where_antecipado'), condicoes_por_tabela[tabela]
+                )
                 condicoes_antecipadas.extend(condicoes_por_tabela[tabela])
             
-            joins_otimizados.append(join_otimizado)
+            joins_otimizados.append(join)
         
         # Adiciona condições da tabela FROM às antecipadas
         if from_table in condicoes_por_tabela:
             condicoes_antecipadas.extend(condicoes_por_tabela[from_table])
+
+        if not condicoes_antecipadas:
+            return self.parsed_original
         
         # Remove do WHERE as condições que foram antecipadas
-        where_atualizado = None
-        if where_clause:
-            condicoes_originais = [c.strip() for c in where_clause.split(self.SEPARADOR_AND)]
-            condicoes_restantes = [c for c in condicoes_originais if c not in condicoes_antecipadas]
-            if condicoes_restantes:
-                where_atualizado = self.SEPARADOR_AND.join(condicoes_restantes)
+        condicoes_originais = [p.texto for p in conjuncoes(where_clause)]
+        condicoes_restantes = [c for c in condicoes_originais if c not in condicoes_antecipadas]
         
         # Constrói o parsed otimizado mantendo a estrutura padrão
-        parsed_otimizado = {
-            'SELECT': select_cols,
-            'FROM': from_table,
-            'INNER_JOIN': joins_otimizados
-        }
+        parsed_otimizado = dict(self.parsed_original)
+        parsed_otimizado['INNER_JOIN'] = joins_otimizados
         
-        # Adiciona WHERE somente se houver condições restantes
-        if where_atualizado:
-            parsed_otimizado['WHERE'] = where_atualizado
+        # Mantém WHERE somente se houver condições restantes
+        if condicoes_restantes:
+            parsed_otimizado['WHERE'] = self.SEPARADOR_AND.join(condicoes_restantes)
+        else:
+            parsed_otimizado.pop('WHERE', None)
         
         # Se a tabela FROM tem condições, adiciona where_antecipado
         if from_table in condicoes_por_tabela:
-            parsed_otimizado['FROM_WHERE_ANTECIPADO'] = self.SEPARADOR_AND.join(condicoes_por_tabela[from_table])
+            parsed_otimizado['FROM_WHERE_ANTECIPADO'] = self._acrescentar(
+                parsed_otimizado.get('FROM_WHERE_ANTECIPADO'), condicoes_por_tabela[from_table]
+            )
         
-        return parsed_otimizado
\ No newline at end of file
+        return parsed_otimizado
@@ -1,104 +1,226 @@
+from classes.catalogo import catalogo_padrao
+from classes.estimador import EstimadorCardinalidade
+from classes.plano import conjuncoes
+
+# Chaves das anotações da tabela do FROM equivalentes às de cada INNER_JOIN
+CHAVES_FOLHA_FROM = {
+    'where_antecipado': 'FROM_WHERE_ANTECIPADO',
+    'projecao_antecipada': 'FROM_PROJECAO_ANTECIPADA',
+    'acesso': 'FROM_ACESSO',
+}
+
+
 class HeuristicaReordenarFolhas:
     """
-    Heurística simples para reordenar os nós folha (tabelas base/join) da
-    árvore de consulta. A ideia é priorizar (colocar mais cedo na lista de
-    INNER_JOIN) as tabelas que aparentam ser mais seletivas, com base em:
-
-    - presença de condições antecipadas ('where_antecipado')
-    - número de condições (separadas por 'AND') para cada tabela
-    - presença de projeção antecipada ('projecao_antecipada')
-    - menções da tabela nas condições globais (WHERE ou FROM_WHERE_ANTECIPADO)
-
-    Observação: esta é uma heurística leve e segura para junções internas (INNER JOIN).
-    Não altera a semântica das junções internas, apenas redefine a ordem das
-    operações de junção para favorecer scans/filtragens mais seletivas primeiro.
+    Reordena os nós folha (tabelas base/join) da árvore de consulta pelo
+    custo estimado, no estilo do otimizador do System R (Selinger):
+
+    - a cardinalidade de cada folha vem das estatísticas do catálogo
+      (`classes.estatisticas.analisar`) e da seletividade das suas condições
+      antecipadas ('where_antecipado'); sem estatísticas, usa valores padrão
+    - as condições de junção viram seletividades (1 / max(valores distintos))
+    - programação dinâmica sobre subconjuntos de tabelas escolhe a ordem
+      left-deep com menor soma das cardinalidades intermediárias, evitando
+      produtos cartesianos sempre que o grafo de junções é conexo
+
+    Com mais de LIMITE_PROGRAMACAO_DINAMICA tabelas, usa uma escolha gulosa
+    (menor resultado intermediário a cada passo). A tabela do FROM também
+    pode mudar, e as condições de junção são redistribuídas para o primeiro
+    JOIN em que todas as suas tabelas estão disponíveis.
+
+    Observação: apenas ordens left-deep são geradas, pois são as que a lista
+    INNER_JOIN consegue representar. Não altera a semântica das junções
+    internas, apenas redefine a ordem das operações de junção.
     """
 
     SEPARADOR_AND = ' AND '
+    LIMITE_PROGRAMACAO_DINAMICA = 12
 
-    def __init__(self, parsed_query: dict):
+    def __init__(self, parsed_query: dict, catalogo=None, estimador: EstimadorCardinalidade | None = None):
         self.parsed_original = parsed_query or {}
+        if estimador is None:
+            estimador = EstimadorCardinalidade(catalogo if catalogo is not None else catalogo_padrao())
+        self.estimador = estimador
+
+    def _folhas(self, parsed: dict) -> list:
+        """Tabela do FROM seguida das tabelas dos JOINs, com as anotações de cada uma"""
+        folha_from = {'tabela': parsed['FROM']}
+        for chave, chave_from in CHAVES_FOLHA_FROM.items():
+            if parsed.get(chave_from):
+                folha_from[chave] = parsed[chave_from]
+        return [folha_from] + list(parsed.get('INNER_JOIN', []))
+
+    def _cardinalidade_folha(self, folha: dict) -> float:
+        linhas = self.estimador.linhas_tabela(folha['tabela'])
+        return self.estimador.selecao(linhas, list(conjuncoes(folha.get('where_antecipado'))))
+
+    def _predicados_juncao(self, folhas: list) -> list:
+        """
+        Condições de junção como (predicado, máscara de folhas referenciadas)
 
-    def _contar_condicoes(self, texto: str) -> int:
-        if not texto:
-            return 0
-        return len([c for c in texto.split(self.SEPARADOR_AND) if c.strip()])
-
-    def _score_para_join(self, join: dict, where_global: str, from_where_antecipado: str) -> int:
-        """Calcula uma pontuação simples para um join com base em sinais de seletividade.
-
-        Pontuação heurística (valores arbitrários, calibráveis):
-        - where_antecipado: +5 por condição
-        - projecao_antecipada: +1 por coluna projetada (reduz custo de transmissão)
-        - ocorrência do nome da tabela em WHERE/FROM_WHERE_ANTECIPADO/condicao: +1 por ocorrência
-        - presença de condição complexa na condicao do join: +1
+        A máscara tem um bit por folha (posição em `folhas`).
         """
-        score = 0
-
-        tabela = join.get('tabela', '')
-
-        # where antecipado do próprio join
-        if 'where_antecipado' in join and join['where_antecipado']:
-            score += 5 * self._contar_condicoes(join['where_antecipado'])
-
-        # projecao antecipada (reduz tamanho das tuplas)
-        if 'projecao_antecipada' in join and join['projecao_antecipada']:
-            try:
-                score += 1 * len(join['projecao_antecipada'])
-            except Exception:
-                # se estiver em formato inesperado, ignore
-                pass
-
-        # conta menções ao nome da tabela nas cláusulas globais e na condição do join
-        cond = join.get('condicao', '') or ''
-        chamadas = 0
-        for texto in (where_global or '', from_where_antecipado or '', cond):
-            if not texto:
+        posicoes = {folha['tabela'].upper(): i for i, folha in enumerate(folhas)}
+        predicados = []
+        for folha in folhas[1:]:
+            for predicado in conjuncoes(folha.get('condicao')):
+                mascara = 0
+                for tabela in predicado.tabelas:
+                    if tabela.upper() in posicoes:
+                        mascara |= 1 << posicoes[tabela.upper()]
+                predicados.append((predicado, mascara))
+        return predicados
+
+    def _seletividade_juncao(self, predicado, mascara: int, cardinalidades_base: list) -> float:
+        if getattr(predicado, 'eh_equijuncao', False) and bin(mascara).count('1') == 2:
+            i, j = (p for p in range(len(cardinalidades_base)) if mascara >> p & 1)
+            seletividade = self.estimador.seletividade_juncao(
+                predicado, cardinalidades_base[i], cardinalidades_base[j]
+            )
+            if seletividade is not None:
+                return seletividade
+        return self.estimador.seletividade(predicado)
+
+    @staticmethod
+    def _cardinalidade(mascara: int, cardinalidades: list, predicados: list) -> float:
+        """Linhas estimadas da junção das folhas em `mascara` (independe da ordem)"""
+        linhas = 1.0
+        for i, cardinalidade in enumerate(cardinalidades):
+            if mascara >> i & 1:
+                linhas *= cardinalidade
+        for _predicado, mascara_pred, seletividade in predicados:
+            if mascara_pred & mascara == mascara_pred:
+                linhas *= seletividade
+        return linhas
+
+    def _custo(self, ordem: list, cardinalidades: list, predicados: list) -> float:
+        """Soma das cardinalidades intermediárias de uma ordem left-deep"""
+        custo, mascara = 0.0, 1 << ordem[0]
+        for i in ordem[1:]:
+            mascara |= 1 << i
+            custo += self._cardinalidade(mascara, cardinalidades, predicados)
+        return custo
+
+    def _ordem_programacao_dinamica(self, cardinalidades: list, predicados: list) -> list:
+        """Ordem left-deep de menor custo (soma das cardinalidades intermediárias)"""
+        n = len(cardinalidades)
+        memo_cardinalidade = {}
+
+        def cardinalidade(mascara: int) -> float:
+            if mascara not in memo_cardinalidade:
+                memo_cardinalidade[mascara] = self._cardinalidade(mascara, cardinalidades, predicados)
+            return memo_cardinalidade[mascara]
+
+        # subconjunto -> (custo, ordem); máscaras maiores só vêm de menores
+        melhores = {1 << i: (0.0, [i]) for i in range(n)}
+        for mascara in range(1, 1 << n):
+            if mascara not in melhores:
                 continue
-            # conta ocorrências simples do nome da tabela seguido de ponto (TABELA.)
-            chamadas += texto.count(f"{tabela}.")
-
-        score += chamadas
-
-        # se a condição do join tem um '=' (padrão de equi-join), dá pequeno bônus
-        if '=' in cond:
-            score += 1
-
-        return score
+            custo, ordem = melhores[mascara]
+            candidatas = [i for i in range(n) if not mascara >> i & 1]
+            conectadas = [i for i in candidatas if self._conecta(mascara, i, predicados)]
+            for i in conectadas or candidatas:
+                nova = mascara | 1 << i
+                novo_custo = custo + cardinalidade(nova)
+                if nova not in melhores or novo_custo < melhores[nova][0]:
+                    melhores[nova] = (novo_custo, ordem + [i])
+        return melhores[(1 << n) - 1][1]
+
+    def _ordem_gulosa(self, cardinalidades: list, predicados: list) -> list:
+        """Começa pela menor folha e acrescenta a que gera o menor resultado"""
+        n = len(cardinalidades)
+        inicial = min(range(n), key=lambda i: cardinalidades[i])
+        ordem, mascara, linhas = [inicial], 1 << inicial, cardinalidades[inicial]
+        while len(ordem) < n:
+            candidatas = [i for i in range(n) if not mascara >> i & 1]
+            conectadas = [i for i in candidatas if self._conecta(mascara, i, predicados)]
+            melhor, melhor_linhas = None, None
+            for i in conectadas or candidatas:
+                nova = mascara | 1 << i
+                resultado = linhas * cardinalidades[i]
+                for _predicado, mascara_pred, seletividade in predicados:
+                    if mascara_pred & nova == mascara_pred and mascara_pred >> i & 1:
+                        resultado *= seletividade
+                if melhor is None or resultado < melhor_linhas:
+                    melhor, melhor_linhas = i, resultado
+            ordem.append(melhor)
+            mascara |= 1 << melhor
+            linhas = melhor_linhas
+        return ordem
+
+    @staticmethod
+    def _conecta(mascara: int, folha: int, predicados: list) -> bool:
+        bit = 1 << folha
+        return any(
+            mascara_pred & bit and mascara_pred & mascara and mascara_pred & ~(mascara | bit) == 0
+            for _predicado, mascara_pred, _seletividade in predicados
+        )
+
+    def _reconstruir(self, parsed: dict, folhas: list, ordem: list, predicados: list) -> dict:
+        """Monta FROM/INNER_JOIN na nova ordem, redistribuindo as condições de junção"""
+        parsed_otimizado = dict(parsed)
+        primeira = folhas[ordem[0]]
+        parsed_otimizado['FROM'] = primeira['tabela']
+        for chave, chave_from in CHAVES_FOLHA_FROM.items():
+            parsed_otimizado.pop(chave_from, None)
+            if primeira.get(chave):
+                parsed_otimizado[chave_from] = primeira[chave]
+
+        disponiveis = 1 << ordem[0]
+        pendentes = list(predicados)
+        joins = []
+        for posicao in ordem[1:]:
+            disponiveis |= 1 << posicao
+            condicao = [p for p, mascara, _ in pendentes if mascara & disponiveis == mascara]
+            pendentes = [item for item in pendentes if item[1] & disponiveis != item[1]]
+
+            folha = folhas[posicao]
+            texto = self.SEPARADOR_AND.join(p.texto for p in condicao)
+            if posicao == 0 or folha.get('condicao') != texto:
+                # Folha do FROM vira JOIN, ou condição redistribuída: novo dicionário
+                folha = {chave: valor for chave, valor in folha.items() if chave != 'condicao'}
+                folha['condicao'] = texto
+            joins.append(folha)
+
+        parsed_otimizado['INNER_JOIN'] = joins
+        return parsed_otimizado
 
     def otimizar(self) -> dict:
-        """Retorna um novo parsed_query com a lista 'INNER_JOIN' reordenada.
+        """Retorna um novo parsed_query com FROM/INNER_JOIN na ordem de menor custo.
 
-        A função preserva as demais chaves do dicionário. Caso não haja INNER_JOIN,
-        a função retorna o parsed original inalterado.
+        A função preserva as demais chaves do dicionário. Retorna o parsed original
+        inalterado (sem cópia) caso não haja INNER_JOIN, a ordem atual já tenha custo
+        mínimo ou a mesma tabela apareça mais de uma vez (sem aliases não dá para
+        saber a qual ocorrência cada condição se refere).
         """
-        parsed = dict(self.parsed_original) if self.parsed_original else {}
-
-        inner_joins = list(parsed.get('INNER_JOIN', []))
-        if not inner_joins:
+        parsed = self.parsed_original
+        if not parsed.get('INNER_JOIN') or not parsed.get('FROM'):
             return parsed
 
-        where_global = parsed.get('WHERE', None)
-        from_where_antecipado = parsed.get('FROM_WHERE_ANTECIPADO', None)
-
-        # Calcula score para cada join
-        scored = []
-        for join in inner_joins:
-            try:
-                s = self._score_para_join(join, where_global, from_where_antecipado)
-            except Exception:
-                s = 0
-            scored.append((s, join))
-
-        # Ordena em ordem decrescente de score: tabelas mais seletivas primeiro
-        scored.sort(key=lambda x: x[0], reverse=True)
-
-        joins_ordenados = [j for (_s, j) in scored]
-
-        parsed_otimizado = dict(parsed)
-        parsed_otimizado['INNER_JOIN'] = joins_ordenados
+        folhas = self._folhas(parsed)
+        if len({folha['tabela'].upper() for folha in folhas}) != len(folhas):
+            return parsed
 
-        return parsed_otimizado
+        cardinalidades = [self._cardinalidade_folha(folha) for folha in folhas]
+        base = [self.estimador.linhas_tabela(folha['tabela']) for folha in folhas]
+        predicados = [
+            (predicado, mascara, self._seletividade_juncao(predicado, mascara, base))
+            for predicado, mascara in self._predicados_juncao(folhas)
+        ]
+
+        if len(folhas) <= self.LIMITE_PROGRAMACAO_DINAMICA:
+            ordem = self._ordem_programacao_dinamica(cardinalidades, predicados)
+        else:
+            ordem = self._ordem_gulosa(cardinalidades, predicados)
+
+        # Mantém a ordem atual se ela já for tão barata quanto a escolhida
+        # (evita alternar entre ordens empatadas a cada execução)
+        atual = list(range(len(folhas)))
+        if ordem == atual or (
+            self._custo(atual, cardinalidades, predicados) <= self._custo(ordem, cardinalidades, predicados)
+        ):
+            return parsed
+        return self._reconstruir(parsed, folhas, ordem, predicados)
 
 
 if __name__ == '__main__':
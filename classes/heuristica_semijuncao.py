@@ -0,0 +1,152 @@
+from classes.catalogo import catalogo_padrao
+from classes.estimador import EstimadorCardinalidade
+from classes.heuristica_algoritmo_juncao import CHAVE_ALGORITMO, CUSTO_CONSTRUCAO_HASH, custo_leitura
+from classes.plano import conjuncoes
+from classes.predicados import filtro_literal
+
+# Anotação das reduções por semijunção de cada folha (lista de
+# {'condicao': igualdade, 'origem': tabela da fonte})
+CHAVE_SEMIJUNCAO = 'semijuncao'
+CHAVE_SEMIJUNCAO_FROM = 'FROM_SEMIJUNCAO'
+
+
+class HeuristicaSemijuncao:
+    """
+    Filtros de junção em tempo de execução (redução por semijunção, ⋉)
+
+    Numa igualdade entre uma tabela T, que entra cedo no plano left-deep, e
+    uma tabela S com filtro antecipado, que só entra no k-ésimo JOIN, as
+    linhas de T cuja chave não aparece em σ(S) serão descartadas pela
+    junção com S, mas antes passam por todas as junções intermediárias. Com
+    a anotação 'semijuncao' na folha de T, o executor lê σ(S) primeiro,
+    monta o conjunto das suas chaves (ou um filtro de Bloom, se for grande)
+    e descarta essas linhas já na leitura de T.
+
+    A redução é anotada quando o trabalho economizado (uma sondagem por linha
+    descartada em cada junção intermediária) supera o custo estimado de
+    reler σ(S), montar o filtro e testar cada linha de T; na prática, só com
+    duas ou mais junções intermediárias. Assume-se chave estrangeira
+    uniforme: sobrevive a σ(S) a fração das linhas de T dada pela
+    seletividade do filtro de S, e a cada junção intermediária a dada pela
+    do filtro da tabela juntada. Filtros de S sobre a chave que os
+    predicados transitivos já copiaram para a chave de T não contam: se só
+    restarem esses, a redução não descartaria nada e não é anotada. Folhas
+    lidas por busca em índice dentro da junção (algoritmo 'indice') não são
+    lidas por scan e não recebem filtro.
+    """
+
+    def __init__(self, parsed_query: dict, catalogo=None, estimador: EstimadorCardinalidade | None = None):
+        self.parsed_original = parsed_query or {}
+        self.catalogo = catalogo if catalogo is not None else catalogo_padrao()
+        self.estimador = estimador if estimador is not None else EstimadorCardinalidade(self.catalogo)
+
+    def _folhas(self, parsed: dict) -> list:
+        """(tabela, where_antecipado, acesso, algoritmo do JOIN) de cada folha, na ordem de entrada"""
+        folhas = [(parsed['FROM'], parsed.get('FROM_WHERE_ANTECIPADO'), parsed.get('FROM_ACESSO'), None)]
+        for join in parsed.get('INNER_JOIN', []) or []:
+            folhas.append((join['tabela'], join.get('where_antecipado'), join.get('acesso'), join.get(CHAVE_ALGORITMO)))
+        return folhas
+
+    @staticmethod
+    def _filtros_literais(predicados: list, coluna) -> set:
+        """(operador, valor) dos filtros `coluna <op> literal` sobre a coluna"""
+        filtros = set()
+        for predicado in predicados:
+            filtro = filtro_literal(predicado)
+            if filtro is not None and filtro[0].qualificado.upper() == coluna.qualificado.upper():
+                filtros.add((filtro[1], filtro[2].valor))
+        return filtros
+
+    def _reducoes(self, parsed: dict) -> list:
+        """Lista de reduções (anotações) por folha"""
+        folhas = self._folhas(parsed)
+        posicoes = {tabela.upper(): posicao for posicao, (tabela, *_resto) in enumerate(folhas)}
+        predicados = [list(conjuncoes(where)) for _tabela, where, *_resto in folhas]
+        totais = []
+        linhas = []
+        seletividades = []
+        for (tabela, *_resto), filtros in zip(folhas, predicados):
+            total = self.estimador.linhas_tabela(tabela)
+            filtradas = self.estimador.selecao(total, filtros)
+            totais.append(total)
+            linhas.append(filtradas)
+            seletividades.append(filtradas / max(total, 1.0))
+
+        reducoes = [[] for _ in folhas]
+        for k, join in enumerate(parsed.get('INNER_JOIN', []) or []):
+            origem = k + 1
+            tabela_origem, where_origem, acesso_origem, _algoritmo = folhas[origem]
+            if not where_origem:
+                continue
+            for predicado in conjuncoes(join.get('condicao')):
+                if not predicado.eh_equijuncao:
+                    continue
+                a, b = predicado.esquerda, predicado.direita
+                if not a.tabela or not b.tabela:
+                    continue
+                if a.tabela.upper() == tabela_origem.upper():
+                    a, b = b, a
+                alvo = posicoes.get(a.tabela.upper())
+                if b.tabela.upper() != tabela_origem.upper() or alvo is None or alvo >= origem:
+                    continue
+                if folhas[alvo][3] == 'indice':
+                    continue
+                # Filtros da origem sobre a chave que já foram copiados para a
+                # chave do alvo (predicados transitivos) não descartam mais nada:
+                # só o restante do filtro da origem reduz as linhas do alvo
+                no_alvo = self._filtros_literais(predicados[alvo], a)
+                extras = [
+                    p for p in predicados[origem]
+                    if not (self._filtros_literais([p], b) & no_alvo)
+                ]
+                if not extras:
+                    continue
+                seletividade = self.estimador.selecao(totais[origem], extras) / max(totais[origem], 1.0)
+                # Junções pelas quais as linhas do alvo passam antes de encontrar a
+                # origem: em cada uma, uma linha descartada economiza ao menos a
+                # sondagem; as que sobrevivem diminuem com o filtro de cada tabela juntada
+                economia = 0.0
+                restantes = linhas[alvo] * (1.0 - seletividade)
+                for intermediaria in range(max(alvo - 1, 0), k):
+                    economia += restantes
+                    if intermediaria + 1 != alvo:
+                        restantes *= seletividades[intermediaria + 1]
+                custo = (
+                    custo_leitura(self.estimador, tabela_origem, acesso_origem)
+                    + CUSTO_CONSTRUCAO_HASH * linhas[origem] + linhas[alvo]
+                )
+                if economia > custo:
+                    reducoes[alvo].append({'condicao': predicado.texto, 'origem': tabela_origem})
+        return reducoes
+
+    def otimizar(self) -> dict:
+        """
+        Retorna o parsed com as reduções por semijunção anotadas nas folhas
+
+        Retorna o parsed de entrada (sem cópia) se nenhuma anotação mudar; só
+        os JOINs cuja anotação muda são recriados.
+        """
+        parsed = self.parsed_original
+        inner_joins = parsed.get('INNER_JOIN', []) or []
+        if not inner_joins or not parsed.get('FROM'):
+            return parsed
+
+        reducoes = self._reducoes(parsed)
+        alterou = False
+        parsed_otimizado = dict(parsed)
+        if (parsed.get(CHAVE_SEMIJUNCAO_FROM) or []) != reducoes[0]:
+            parsed_otimizado[CHAVE_SEMIJUNCAO_FROM] = reducoes[0] or None
+            alterou = True
+
+        joins = []
+        for join, reducao in zip(inner_joins, reducoes[1:]):
+            if (join.get(CHAVE_SEMIJUNCAO) or []) != reducao:
+                join = dict(join)
+                join[CHAVE_SEMIJUNCAO] = reducao or None
+                alterou = True
+            joins.append(join)
+
+        if not alterou:
+            return parsed
+        parsed_otimizado['INNER_JOIN'] = joins
+        return parsed_otimizado
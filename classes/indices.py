@@ -0,0 +1,92 @@
+"""
+Índices secundários sobre as linhas de uma tabela
+
+Dois tipos, declarados no catálogo (`Catalogo.definir_indice`) e construídos
+sob demanda pelo armazenamento (`Tabela.indice`):
+
+- IndiceHash: dicionário valor -> linhas; busca por igualdade em O(1)
+- IndiceOrdenado: chaves ordenadas + linhas na mesma ordem; igualdade e
+  intervalos com busca binária (`bisect`) em O(log n + k)
+
+Os índices guardam referências às próprias tuplas da tabela (não copiam as
+linhas). Valores nulos não entram no índice, pois nunca satisfazem uma
+comparação.
+"""
+
+from bisect import bisect_left, bisect_right
+
+TIPOS_INDICE = ('hash', 'ordenado')
+
+
+class IndiceHash:
+    """Índice por igualdade: valor -> lista de linhas"""
+
+    tipo = 'hash'
+
+    def __init__(self, linhas, posicao: int):
+        self.posicao = posicao
+        self._entradas = {}
+        for linha in linhas:
+            valor = linha[posicao]
+            if valor is not None:
+                self._entradas.setdefault(valor, []).append(linha)
+
+    @property
+    def num_chaves(self) -> int:
+        return len(self._entradas)
+
+    def buscar(self, valor) -> list:
+        return self._entradas.get(valor, [])
+
+    def __repr__(self) -> str:
+        return f"IndiceHash(posição {self.posicao}, {self.num_chaves} chaves)"
+
+
+class IndiceOrdenado:
+    """Índice ordenado: chaves em ordem crescente e as linhas correspondentes"""
+
+    tipo = 'ordenado'
+
+    def __init__(self, linhas, posicao: int):
+        self.posicao = posicao
+        pares = sorted(
+            ((linha[posicao], linha) for linha in linhas if linha[posicao] is not None),
+            key=lambda par: par[0],
+        )
+        self.chaves = [chave for chave, _ in pares]
+        self.linhas = [linha for _, linha in pares]
+
+    @property
+    def num_chaves(self) -> int:
+        return len(self.chaves)
+
+    def buscar(self, valor) -> list:
+        return self.linhas[bisect_left(self.chaves, valor):bisect_right(self.chaves, valor)]
+
+    def intervalo(self, minimo=None, maximo=None, inclui_minimo: bool = True,
+                  inclui_maximo: bool = True) -> list:
+        """
+        Linhas com chave entre `minimo` e `maximo` (None = sem limite)
+
+        As linhas saem em ordem crescente de chave, o que permite a uma junção
+        por intercalação consumir o resultado sem ordenar de novo.
+        """
+        inicio = 0
+        fim = len(self.chaves)
+        if minimo is not None:
+            inicio = (bisect_left if inclui_minimo else bisect_right)(self.chaves, minimo)
+        if maximo is not None:
+            fim = (bisect_right if inclui_maximo else bisect_left)(self.chaves, maximo)
+        return self.linhas[inicio:fim] if inicio < fim else []
+
+    def __repr__(self) -> str:
+        return f"IndiceOrdenado(posição {self.posicao}, {self.num_chaves} chaves)"
+
+
+def construir_indice(tipo: str, linhas, posicao: int):
+    """Constrói um índice do tipo indicado sobre a coluna na `posicao` das linhas"""
+    if tipo == 'hash':
+        return IndiceHash(linhas, posicao)
+    if tipo == 'ordenado':
+        return IndiceOrdenado(linhas, posicao)
+    raise ValueError(f"Tipo de índice inválido: {tipo}")
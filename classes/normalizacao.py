@@ -0,0 +1,45 @@
+"""
+Normalização de queries para uso como chave de cache
+
+A impressão digital de uma query é o texto em maiúsculas, com espaços
+colapsados e cada literal (número ou string) trocado por '?'. Duas queries
+com o mesmo formato e literais diferentes têm a mesma impressão digital.
+"""
+
+import re
+
+MARCADOR = '?'
+
+# Literais: strings entre aspas simples ou números fora de identificadores
+RE_LITERAL = re.compile(r"'[^']*'|(?<![\w.])\d+(?:\.\d+)?")
+
+
+def normalizar_consulta(query: str) -> tuple:
+    """
+    Calcula a impressão digital da query e extrai seus literais
+
+    Args:
+        query: Texto SQL
+
+    Returns:
+        (impressao_digital, literais) onde literais é a lista dos textos
+        dos literais na ordem em que aparecem (já em maiúsculas)
+    """
+    texto = query.strip().upper()
+    literais = RE_LITERAL.findall(texto)
+    sem_literais = RE_LITERAL.sub(MARCADOR, texto)
+    return ' '.join(sem_literais.split()), literais
+
+
+def separar_literais(texto: str) -> list:
+    """Divide o texto nos trechos fixos entre os literais (len = literais + 1)"""
+    return RE_LITERAL.split(texto)
+
+
+def religar_literais(trechos: list, literais: list) -> str:
+    """Intercala os trechos fixos com os novos literais"""
+    partes = [trechos[0]]
+    for literal, trecho in zip(literais, trechos[1:]):
+        partes.append(literal)
+        partes.append(trecho)
+    return ''.join(partes)
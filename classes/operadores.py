@@ -0,0 +1,646 @@
+"""
+Operadores físicos do executor (modelo iterador / pull)
+
+Cada operador é iterável: ao ser percorrido, puxa linhas dos filhos e as
+repassa adiante uma a uma (geradores), sem materializar relações
+intermediárias. Todo operador conta as linhas que produziu, o que permite
+comparar o trabalho realizado por planos diferentes da mesma query.
+
+Com `medir` ligado (EXPLAIN ANALYZE, ver `classes.explicacao`), cada
+operador também acumula o tempo gasto nas suas chamadas (inclusive o dos
+filhos) e o maior acréscimo de memória rastreada pelo `tracemalloc`
+observado desde a primeira chamada.
+
+Os operadores que acumulam linhas em memória (junção hash, ordenação da
+junção merge) aceitam um limite (`memoria_maxima`, em bytes, estimado pelo
+tamanho das tuplas): ao ultrapassá-lo, despejam as linhas em arquivos
+temporários (junção hash particionada / "grace", ordenação externa com
+intercalação das execuções) e contam os bytes gravados em
+`bytes_despejados`.
+
+`ordenado_por` guarda as posições da linha pelas quais a saída do operador
+sai em ordem crescente (leitura por índice ordenado, junção merge), o que
+permite à junção merge pular a ordenação de uma entrada.
+"""
+
+import heapq
+import sys
+import time
+import tracemalloc
+from itertools import chain, groupby
+from operator import itemgetter
+
+from classes.arquivo_temporario import ArquivoTemporario
+from classes.filtro_bloom import FiltroBloom
+from classes.predicados import Esquema
+
+# Partições por nível da junção hash particionada; uma partição que ainda
+# não cabe na memória é particionada de novo, até MAX_NIVEIS_PARTICAO níveis
+# (depois disso é processada em memória, ex: muitas linhas com a mesma chave)
+NUM_PARTICOES = 16
+MAX_NIVEIS_PARTICAO = 3
+
+# Execuções (arquivos) intercaladas de uma vez pela ordenação externa: quando
+# um nível acumula esse número de execuções, elas são intercaladas numa única
+# execução do nível seguinte (cada linha é regravada ~log_32(execuções) vezes)
+FATOR_INTERCALACAO = 32
+
+# Chaves distintas até as quais o filtro de junção em tempo de execução é um
+# conjunto exato; acima disso, vira um filtro de Bloom com essa taxa de
+# falsos positivos (poucos bytes por chave em vez do objeto da chave)
+LIMITE_FILTRO_EXATO = 100_000
+TAXA_FALSOS_POSITIVOS = 0.01
+
+
+def tamanho_linha(linha: tuple) -> int:
+    """Bytes ocupados pela tupla e seus valores (estimativa do uso de memória)"""
+    return sys.getsizeof(linha) + sum(map(sys.getsizeof, linha))
+
+
+class Operador:
+    """Base dos operadores físicos"""
+
+    nome = 'operador'
+
+    def __init__(self, esquema: Esquema, filhos: tuple = ()):
+        self.esquema = esquema
+        self.filhos = filhos
+        self.linhas_produzidas = 0
+        self.linhas_estimadas = None
+        self.ordenado_por = ()
+        self.medir = False
+        self.tempo = 0.0
+        self.memoria_pico = 0
+        self.memoria_maxima = None
+        self.bytes_despejados = 0
+        self.arquivos_despejados = 0
+
+    def _gerar(self):
+        raise NotImplementedError
+
+    def __iter__(self):
+        if self.medir:
+            yield from self._iterar_medindo()
+            return
+        for linha in self._gerar():
+            self.linhas_produzidas += 1
+            yield linha
+
+    def _iterar_medindo(self):
+        relogio = time.perf_counter
+        rastreando = tracemalloc.is_tracing()
+        base = tracemalloc.get_traced_memory()[0] if rastreando else 0
+        inicio = relogio()
+        linhas = iter(self._gerar())
+        while True:
+            try:
+                linha = next(linhas)
+            except StopIteration:
+                return
+            finally:
+                self.tempo += relogio() - inicio
+                if rastreando:
+                    self.memoria_pico = max(self.memoria_pico, tracemalloc.get_traced_memory()[0] - base)
+            self.linhas_produzidas += 1
+            yield linha
+            inicio = relogio()
+
+    def descricao(self) -> str:
+        return self.nome
+
+    def percorrer(self):
+        """Operadores da subárvore em pré-ordem"""
+        yield self
+        for filho in self.filhos:
+            yield from filho.percorrer()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.descricao()})"
+
+
+class OperadorScan(Operador):
+    """Leitura sequencial de uma tabela base"""
+
+    nome = 'scan'
+
+    def __init__(self, tabela):
+        super().__init__(Esquema(tabela.esquema))
+        self.tabela = tabela
+        # Blocos a ler (tabela colunar com zone maps); None lê a tabela inteira
+        self.blocos = None
+
+    def _gerar(self):
+        if self.blocos is None:
+            return self.tabela.linhas()
+        return self.tabela.linhas(self.blocos)
+
+    def descricao(self) -> str:
+        if self.blocos is None:
+            return f"scan {self.tabela.nome}"
+        return f"scan {self.tabela.nome} (blocos {len(self.blocos)}/{self.tabela.num_blocos})"
+
+
+class OperadorBuscaIndice(Operador):
+    """
+    Leitura de uma tabela base por índice secundário
+
+    Igualdade: `buscar(valor)` (hash ou ordenado). Intervalo: `intervalo`
+    com busca binária sobre as chaves do índice ordenado; sem condição
+    (None) e sem limites, lê a tabela inteira em ordem da coluna indexada.
+    """
+
+    nome = 'indice'
+
+    def __init__(self, tabela, indice, condicao: str | None, valor=None, minimo=None, maximo=None,
+                 inclui_minimo: bool = True, inclui_maximo: bool = True, igualdade: bool = True):
+        super().__init__(Esquema(tabela.esquema))
+        self.tabela = tabela
+        self.indice = indice
+        self.condicao = condicao
+        self.igualdade = igualdade
+        self.valor = valor
+        self.limites = (minimo, maximo, inclui_minimo, inclui_maximo)
+        # Igualdade: todas as linhas têm a mesma chave; intervalo: índice ordenado
+        self.ordenado_por = (indice.posicao,)
+
+    def _gerar(self):
+        if self.igualdade:
+            return iter(self.indice.buscar(self.valor))
+        return iter(self.indice.intervalo(*self.limites))
+
+    def descricao(self) -> str:
+        condicao = self.condicao or f"ordem {self.tabela.esquema[self.indice.posicao]}"
+        return f"índice {self.indice.tipo} {self.tabela.nome} [{condicao}]"
+
+
+class OperadorLinhas(Operador):
+    """Linhas já materializadas com o esquema indicado (ex: uma partição vinda de outro processo)"""
+
+    nome = 'linhas'
+
+    def __init__(self, esquema: Esquema, linhas: list, origem: str = 'linhas'):
+        super().__init__(esquema)
+        self.linhas = linhas
+        self.origem = origem
+
+    def _gerar(self):
+        return iter(self.linhas)
+
+    def descricao(self) -> str:
+        return f"{self.origem} ({len(self.linhas)} linhas)"
+
+
+class OperadorSelecao(Operador):
+    """Seleção (σ): repassa só as linhas que satisfazem o predicado"""
+
+    nome = 'selecao'
+
+    def __init__(self, filho: Operador, predicado, condicao: str):
+        super().__init__(filho.esquema, (filho,))
+        self.predicado = predicado
+        self.condicao = condicao
+        self.ordenado_por = filho.ordenado_por
+
+    def _gerar(self):
+        predicado = self.predicado
+        for linha in self.filhos[0]:
+            if predicado(linha):
+                yield linha
+
+    def descricao(self) -> str:
+        return f"σ {self.condicao}"
+
+
+class OperadorProjecao(Operador):
+    """Projeção (π): mantém apenas as posições indicadas"""
+
+    nome = 'projecao'
+
+    def __init__(self, filho: Operador, indices: list):
+        super().__init__(Esquema([filho.esquema.colunas[i] for i in indices]), (filho,))
+        self.indices = indices
+        self.ordenado_por = tuple(
+            posicao for posicao, indice in enumerate(indices) if indice in filho.ordenado_por
+        )
+
+    def _gerar(self):
+        if len(self.indices) == 1:
+            indice = self.indices[0]
+            return ((linha[indice],) for linha in self.filhos[0])
+        extrair = itemgetter(*self.indices)
+        return (extrair(linha) for linha in self.filhos[0])
+
+    def descricao(self) -> str:
+        return f"π {', '.join(self.esquema.colunas)}"
+
+
+class OperadorSemijuncao(Operador):
+    """
+    Filtro de junção em tempo de execução (redução por semijunção, ⋉)
+
+    Lê a fonte inteira (a folha filtrada da outra tabela da igualdade) e
+    guarda as suas chaves: num conjunto exato até LIMITE_FILTRO_EXATO chaves
+    distintas, senão num filtro de Bloom. Depois repassa, em streaming, só
+    as linhas do filho cuja chave pode estar no filtro. A junção com a fonte
+    continua mais acima no plano e descarta os falsos positivos do Bloom.
+    Chaves nulas nunca passam.
+
+    `filtro`: filtro já construído (ex: pelo coordenador da execução
+    paralela); com ele, a fonte não é lida.
+    """
+
+    nome = 'semijuncao'
+
+    def __init__(self, filho: Operador, fonte: Operador, indice: int, indice_fonte: int, condicao: str,
+                 filtro=None):
+        super().__init__(filho.esquema, (filho, fonte))
+        self.indice = indice
+        self.indice_fonte = indice_fonte
+        self.condicao = condicao
+        self.filtro = filtro
+        self.ordenado_por = filho.ordenado_por
+
+    def construir_filtro(self):
+        """Conjunto (ou filtro de Bloom) das chaves não nulas da fonte; lê a fonte uma vez"""
+        if self.filtro is not None:
+            return self.filtro
+        indice = self.indice_fonte
+        chaves = set()
+        linhas = iter(self.filhos[1])
+        for linha in linhas:
+            chave = linha[indice]
+            if chave is None:
+                continue
+            chaves.add(chave)
+            if len(chaves) > LIMITE_FILTRO_EXATO:
+                capacidade = max(int(self.filhos[1].linhas_estimadas or 0), 2 * len(chaves))
+                filtro = FiltroBloom(capacidade, TAXA_FALSOS_POSITIVOS)
+                for chave in chaves:
+                    filtro.adicionar(chave)
+                for linha in linhas:
+                    if linha[indice] is not None:
+                        filtro.adicionar(linha[indice])
+                self.filtro = filtro
+                return filtro
+        self.filtro = frozenset(chaves)
+        return self.filtro
+
+    def _gerar(self):
+        filtro = self.construir_filtro()
+        indice = self.indice
+        for linha in self.filhos[0]:
+            chave = linha[indice]
+            if chave is not None and chave in filtro:
+                yield linha
+
+    def descricao(self) -> str:
+        if self.filtro is None:
+            return f"⋉ {self.condicao}"
+        if isinstance(self.filtro, FiltroBloom):
+            tipo = f"bloom, {self.filtro.num_chaves} chaves, {self.filtro.tamanho_bytes} bytes"
+        else:
+            tipo = f"conjunto, {len(self.filtro)} chaves"
+        return f"⋉ {self.condicao} ({tipo})"
+
+
+class OperadorJuncaoLacos(Operador):
+    """
+    Junção por laços aninhados (em blocos)
+
+    O lado direito é lido uma vez para memória; o esquerdo é percorrido em
+    streaming e cada linha é combinada com todas as do lado direito.
+    """
+
+    nome = 'juncao'
+
+    def __init__(self, esquerda: Operador, direita: Operador, predicado, condicao: str):
+        super().__init__(esquerda.esquema + direita.esquema, (esquerda, direita))
+        self.predicado = predicado
+        self.condicao = condicao
+        self.ordenado_por = esquerda.ordenado_por
+
+    def _gerar(self):
+        esquerda, direita = self.filhos
+        linhas_direita = list(direita)
+        predicado = self.predicado
+        for linha_esq in esquerda:
+            for linha_dir in linhas_direita:
+                linha = linha_esq + linha_dir
+                if predicado is None or predicado(linha):
+                    yield linha
+
+    def descricao(self) -> str:
+        return f"⋈[loop] {self.condicao}" if self.condicao else "×"
+
+
+def _extrator_chave(indices: list):
+    """Função linha -> chave (valor único ou tupla, para chaves compostas)"""
+    if len(indices) == 1:
+        return itemgetter(indices[0])
+    return itemgetter(*indices)
+
+
+class OperadorJuncaoHash(Operador):
+    """
+    Junção hash para equi-junções
+
+    Lê o lado de construção para uma tabela hash (memória proporcional a ele)
+    e percorre o lado de sondagem em streaming: O(n + m). A linha de saída
+    mantém sempre a ordem esquerda + direita, qualquer que seja o lado de
+    construção. Chaves nulas nunca casam.
+
+    Com `memoria_maxima`, se a tabela hash ultrapassar o limite, os dois
+    lados são particionados pelo hash da chave em arquivos temporários e
+    cada par de partições é juntado separadamente (grace hash join).
+    """
+
+    nome = 'juncao'
+
+    def __init__(self, esquerda: Operador, direita: Operador, indices_esq: list, indices_dir: list,
+                 residual, condicao: str, constroi_direita: bool = True, memoria_maxima: int | None = None):
+        super().__init__(esquerda.esquema + direita.esquema, (esquerda, direita))
+        self.indices_esq = indices_esq
+        self.indices_dir = indices_dir
+        self.residual = residual
+        self.condicao = condicao
+        self.constroi_direita = constroi_direita
+        self.memoria_maxima = memoria_maxima
+        # Sondando com a esquerda, a saída segue a ordem da esquerda (a menos
+        # que a junção seja particionada em disco)
+        self.ordenado_por = esquerda.ordenado_por if constroi_direita and memoria_maxima is None else ()
+
+    def _construir(self, linhas, chave_construcao, limite: int | None) -> tuple:
+        """
+        Tabela hash do lado de construção
+
+        Returns:
+            (tabela, True se o limite foi ultrapassado e a leitura interrompida)
+        """
+        composta = len(self.indices_esq) > 1
+        tabela = {}
+        usado = 0
+        for linha in linhas:
+            chave = chave_construcao(linha)
+            if chave is None or (composta and None in chave):
+                continue
+            tabela.setdefault(chave, []).append(linha)
+            if limite is not None:
+                usado += tamanho_linha(linha)
+                if usado > limite:
+                    return tabela, True
+        return tabela, False
+
+    def _sondar(self, tabela: dict, linhas, chave_sondagem):
+        residual = self.residual
+        constroi_direita = self.constroi_direita
+        for linha in linhas:
+            correspondentes = tabela.get(chave_sondagem(linha))
+            if not correspondentes:
+                continue
+            for outra in correspondentes:
+                combinada = linha + outra if constroi_direita else outra + linha
+                if residual is None or residual(combinada):
+                    yield combinada
+
+    def _particionar(self, linhas, chave, nivel: int) -> list:
+        composta = len(self.indices_esq) > 1
+        particoes = [ArquivoTemporario() for _ in range(NUM_PARTICOES)]
+        for linha in linhas:
+            valor = chave(linha)
+            if valor is None or (composta and None in valor):
+                continue
+            # O nível entra no hash para redistribuir as chaves a cada nível
+            particoes[hash((nivel, valor)) % NUM_PARTICOES].escrever(linha)
+        for particao in particoes:
+            particao.concluir()
+            self.bytes_despejados += particao.bytes_escritos
+        self.arquivos_despejados += NUM_PARTICOES
+        return particoes
+
+    def _juncao_particionada(self, construcao, sondagem, chave_construcao, chave_sondagem, nivel: int):
+        particoes_construcao = self._particionar(construcao, chave_construcao, nivel)
+        particoes_sondagem = self._particionar(sondagem, chave_sondagem, nivel)
+        try:
+            for de_construcao, de_sondagem in zip(particoes_construcao, particoes_sondagem):
+                if not de_construcao.num_linhas or not de_sondagem.num_linhas:
+                    continue
+                limite = self.memoria_maxima if nivel + 1 < MAX_NIVEIS_PARTICAO else None
+                tabela, excedeu = self._construir(de_construcao.ler(), chave_construcao, limite)
+                if excedeu:
+                    yield from self._juncao_particionada(
+                        de_construcao.ler(), de_sondagem.ler(), chave_construcao, chave_sondagem, nivel + 1
+                    )
+                else:
+                    yield from self._sondar(tabela, de_sondagem.ler(), chave_sondagem)
+        finally:
+            for particao in particoes_construcao + particoes_sondagem:
+                particao.fechar()
+
+    def _gerar(self):
+        esquerda, direita = self.filhos
+        if self.constroi_direita:
+            construcao, sondagem = direita, esquerda
+            chave_construcao = _extrator_chave(self.indices_dir)
+            chave_sondagem = _extrator_chave(self.indices_esq)
+        else:
+            construcao, sondagem = esquerda, direita
+            chave_construcao = _extrator_chave(self.indices_esq)
+            chave_sondagem = _extrator_chave(self.indices_dir)
+
+        linhas_construcao = iter(construcao)
+        tabela, excedeu = self._construir(linhas_construcao, chave_construcao, self.memoria_maxima)
+        if not excedeu:
+            yield from self._sondar(tabela, sondagem, chave_sondagem)
+            return
+        # Limite ultrapassado: particiona o que já foi lido e o restante
+        lidas = chain.from_iterable(tabela.values())
+        del tabela
+        yield from self._juncao_particionada(
+            chain(lidas, linhas_construcao), sondagem, chave_construcao, chave_sondagem, 0
+        )
+
+    def descricao(self) -> str:
+        lado = 'direita' if self.constroi_direita else 'esquerda'
+        return f"⋈[hash] {self.condicao} (build: {lado})"
+
+
+def _sem_chave_nula(linhas, chave, composta: bool):
+    if composta:
+        return (linha for linha in linhas if None not in chave(linha))
+    return (linha for linha in linhas if chave(linha) is not None)
+
+
+class OperadorJuncaoMerge(Operador):
+    """
+    Junção por intercalação (sort-merge) para equi-junções
+
+    Ordena cada entrada pela chave, a menos que ela já venha ordenada
+    (`ordenado_por`), e percorre as duas em paralelo, combinando os grupos
+    de chaves iguais: O(n log n + m log m), ou O(n + m) com entradas já
+    ordenadas. A saída sai em ordem da chave. Chaves nulas nunca casam.
+    """
+
+    nome = 'juncao'
+
+    def __init__(self, esquerda: Operador, direita: Operador, indices_esq: list, indices_dir: list,
+                 residual, condicao: str, memoria_maxima: int | None = None):
+        super().__init__(esquerda.esquema + direita.esquema, (esquerda, direita))
+        self.indices_esq = indices_esq
+        self.indices_dir = indices_dir
+        self.residual = residual
+        self.condicao = condicao
+        self.memoria_maxima = memoria_maxima
+        # Só uma chave simples dispensa a ordenação de uma entrada já ordenada
+        simples = len(indices_esq) == 1
+        self.ordena_esquerda = not (simples and indices_esq[0] in esquerda.ordenado_por)
+        self.ordena_direita = not (simples and indices_dir[0] in direita.ordenado_por)
+        self.ordenado_por = (indices_esq[0], len(esquerda.esquema) + indices_dir[0])
+
+    def _ordenar(self, linhas, chave):
+        """
+        Ordena as linhas; com `memoria_maxima`, ordenação externa: cada trecho
+        que enche a memória é ordenado e gravado num arquivo (uma execução do
+        nível 0) e as execuções restantes são intercaladas na leitura
+
+        As execuções ficam separadas por nível, como os dígitos de um
+        contador: quando um nível chega a FATOR_INTERCALACAO execuções, só
+        elas são intercaladas numa execução do nível seguinte. Cada linha é
+        regravada uma vez por nível, e não a cada intercalação.
+        """
+        if self.memoria_maxima is None:
+            return sorted(linhas, key=chave)
+        niveis = []
+        trecho = []
+        usado = 0
+        for linha in linhas:
+            trecho.append(linha)
+            usado += tamanho_linha(linha)
+            if usado > self.memoria_maxima:
+                trecho.sort(key=chave)
+                self._acrescentar_execucao(niveis, self._gravar_execucao(trecho), chave)
+                trecho = []
+                usado = 0
+        trecho.sort(key=chave)
+        execucoes = [execucao for nivel in niveis for execucao in nivel]
+        if not execucoes:
+            return trecho
+        return self._intercalar(execucoes, trecho, chave)
+
+    def _acrescentar_execucao(self, niveis: list, execucao: ArquivoTemporario, chave):
+        """Põe a execução no nível 0, intercalando os níveis que ficarem cheios"""
+        nivel = 0
+        while True:
+            if nivel == len(niveis):
+                niveis.append([])
+            niveis[nivel].append(execucao)
+            if len(niveis[nivel]) < FATOR_INTERCALACAO:
+                return
+            execucao = self._gravar_execucao(self._intercalar(niveis[nivel], [], chave))
+            niveis[nivel] = []
+            nivel += 1
+
+    def _gravar_execucao(self, linhas) -> ArquivoTemporario:
+        execucao = ArquivoTemporario()
+        execucao.escrever_todas(linhas)
+        execucao.concluir()
+        self.bytes_despejados += execucao.bytes_escritos
+        self.arquivos_despejados += 1
+        return execucao
+
+    @staticmethod
+    def _intercalar(execucoes: list, trecho: list, chave):
+        try:
+            yield from heapq.merge(*(execucao.ler() for execucao in execucoes), trecho, key=chave)
+        finally:
+            for execucao in execucoes:
+                execucao.fechar()
+
+    def _entrada(self, filho: Operador, indices: list, ordenar: bool):
+        chave = _extrator_chave(indices)
+        linhas = _sem_chave_nula(filho, chave, len(indices) > 1)
+        if ordenar:
+            linhas = self._ordenar(linhas, chave)
+        return groupby(linhas, key=chave)
+
+    def _gerar(self):
+        esquerda, direita = self.filhos
+        grupos_esq = self._entrada(esquerda, self.indices_esq, self.ordena_esquerda)
+        grupos_dir = self._entrada(direita, self.indices_dir, self.ordena_direita)
+        residual = self.residual
+
+        grupo_esq = next(grupos_esq, None)
+        grupo_dir = next(grupos_dir, None)
+        while grupo_esq is not None and grupo_dir is not None:
+            chave_esq, chave_dir = grupo_esq[0], grupo_dir[0]
+            if chave_esq < chave_dir:
+                grupo_esq = next(grupos_esq, None)
+            elif chave_dir < chave_esq:
+                grupo_dir = next(grupos_dir, None)
+            else:
+                linhas_dir = list(grupo_dir[1])
+                for linha_esq in grupo_esq[1]:
+                    for linha_dir in linhas_dir:
+                        linha = linha_esq + linha_dir
+                        if residual is None or residual(linha):
+                            yield linha
+                grupo_esq = next(grupos_esq, None)
+                grupo_dir = next(grupos_dir, None)
+
+    def descricao(self) -> str:
+        ordenadas = [lado for lado, ordena in (('esquerda', self.ordena_esquerda),
+                                               ('direita', self.ordena_direita)) if ordena]
+        return f"⋈[merge] {self.condicao} (sort: {', '.join(ordenadas) or 'nenhuma'})"
+
+
+class OperadorJuncaoIndice(Operador):
+    """
+    Junção por laços aninhados com busca em índice (index nested loop)
+
+    Para cada linha da esquerda (em streaming), busca no índice da tabela da
+    direita as linhas com a mesma chave; a tabela da direita nunca é lida
+    por inteiro. Sobre as linhas encontradas aplica as etapas da folha da
+    direita (filtros e projeção antecipados, na ordem do plano) e o
+    predicado residual. A saída segue a ordem da esquerda.
+
+    `etapas`: lista de ('filtro', predicado) / ('projecao', posições),
+    começando pelas linhas da tabela base.
+    """
+
+    nome = 'juncao'
+
+    def __init__(self, esquerda: Operador, esquema_direita: Esquema, tabela, indice, indice_esq: int,
+                 etapas: list, residual, condicao: str):
+        super().__init__(esquerda.esquema + esquema_direita, (esquerda,))
+        self.tabela = tabela
+        self.indice = indice
+        self.indice_esq = indice_esq
+        self.etapas = etapas
+        self.residual = residual
+        self.condicao = condicao
+        self.ordenado_por = esquerda.ordenado_por
+
+    def _folha(self, linhas):
+        for tipo, etapa in self.etapas:
+            if tipo == 'filtro':
+                linhas = [linha for linha in linhas if etapa(linha)]
+            else:
+                extrair = itemgetter(*etapa)
+                linhas = [(extrair(linha),) if len(etapa) == 1 else extrair(linha) for linha in linhas]
+        return linhas
+
+    def _gerar(self):
+        buscar = self.indice.buscar
+        posicao = self.indice_esq
+        residual = self.residual
+        for linha_esq in self.filhos[0]:
+            chave = linha_esq[posicao]
+            if chave is None:
+                continue
+            for linha_dir in self._folha(buscar(chave)):
+                linha = linha_esq + linha_dir
+                if residual is None or residual(linha):
+                    yield linha
+
+    def descricao(self) -> str:
+        coluna = self.tabela.esquema[self.indice.posicao]
+        return f"⋈[indice] {self.condicao} (índice {self.indice.tipo} {coluna})"
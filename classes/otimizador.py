@@ -0,0 +1,181 @@
+"""
+Gerenciador de passos do otimizador
+
+Executa uma lista configurável de passos (as heurísticas) sobre o parsed da
+query, repetindo a lista até um ponto fixo quando um passo habilita outro
+(ex: uma condição movida para um JOIN permite nova reordenação). Para cada
+execução de passo registra o tempo gasto e o que mudou no plano.
+
+Os passos seguem o contrato das heurísticas: recebem o parsed, nunca o
+alteram e retornam o mesmo objeto quando não há mudança; quando há, só as
+partes alteradas são recriadas e o resto (JOINs, listas) é compartilhado
+com a entrada.
+"""
+
+import time
+
+from classes.heuristica_algoritmo_juncao import HeuristicaAlgoritmoJuncao
+from classes.heuristica_atributos import HeuristicaReducaoAtributos
+from classes.heuristica_caminho_acesso import HeuristicaCaminhoAcesso
+from classes.heuristica_evitar_joins import HeuristicaEvitarProdutoCartesiano
+from classes.heuristica_predicados_transitivos import HeuristicaPredicadosTransitivos
+from classes.heuristica_reducao_tuplas import HeuristicaReducaoTuplas
+from classes.heuristica_reordenar_folhas import HeuristicaReordenarFolhas
+from classes.heuristica_semijuncao import HeuristicaSemijuncao
+
+MAX_ITERACOES_PADRAO = 5
+
+
+class Passo:
+    """Passo do otimizador: nome + função parsed -> parsed"""
+    __slots__ = ('nome', 'funcao')
+
+    def __init__(self, nome: str, funcao):
+        self.nome = nome
+        self.funcao = funcao
+
+    @classmethod
+    def de_heuristica(cls, heuristica, **opcoes) -> 'Passo':
+        """Passo a partir de uma classe com o contrato `Heuristica(parsed, ...).otimizar()`"""
+        return cls(heuristica.__name__, lambda parsed: heuristica(parsed, **opcoes).otimizar())
+
+    def __call__(self, parsed: dict) -> dict:
+        return self.funcao(parsed)
+
+    def __repr__(self) -> str:
+        return f"Passo({self.nome})"
+
+
+def passos_padrao() -> list:
+    """Os passos na ordem usada pelo app"""
+    return [
+        Passo.de_heuristica(HeuristicaReducaoTuplas),
+        Passo.de_heuristica(HeuristicaPredicadosTransitivos),
+        Passo.de_heuristica(HeuristicaReducaoAtributos),
+        Passo.de_heuristica(HeuristicaEvitarProdutoCartesiano),
+        Passo.de_heuristica(HeuristicaReordenarFolhas),
+        Passo.de_heuristica(HeuristicaCaminhoAcesso),
+        Passo.de_heuristica(HeuristicaAlgoritmoJuncao),
+        Passo.de_heuristica(HeuristicaSemijuncao),
+    ]
+
+
+def diferencas(anterior: dict, novo: dict) -> list:
+    """
+    Caminhos das partes do plano que mudaram (ex: 'WHERE', 'INNER_JOIN[1].condicao')
+
+    Partes compartilhadas (mesmo objeto) são puladas sem comparação.
+    """
+    if anterior is novo:
+        return []
+    mudancas = []
+    for chave in list(anterior) + [c for c in novo if c not in anterior]:
+        antes, depois = anterior.get(chave), novo.get(chave)
+        if antes is depois or antes == depois:
+            continue
+        if chave == 'INNER_JOIN' and isinstance(antes, list) and isinstance(depois, list):
+            tabelas_antes = [j.get('tabela') for j in antes]
+            tabelas_depois = [j.get('tabela') for j in depois]
+            if tabelas_antes != tabelas_depois:
+                mudancas.append('INNER_JOIN (ordem)')
+                continue
+            for i, (join_antes, join_depois) in enumerate(zip(antes, depois)):
+                if join_antes is join_depois:
+                    continue
+                mudancas.extend(f"INNER_JOIN[{i}].{c}" for c in diferencas(join_antes, join_depois))
+            continue
+        mudancas.append(chave)
+    return mudancas
+
+
+class RegistroPasso:
+    """Uma execução de um passo: iteração, tempo e mudanças no plano"""
+    __slots__ = ('passo', 'iteracao', 'tempo', 'mudancas')
+
+    def __init__(self, passo: str, iteracao: int, tempo: float, mudancas: list):
+        self.passo = passo
+        self.iteracao = iteracao
+        self.tempo = tempo
+        self.mudancas = mudancas
+
+    @property
+    def alterou(self) -> bool:
+        return bool(self.mudancas)
+
+    def para_dict(self) -> dict:
+        return {
+            'passo': self.passo,
+            'iteracao': self.iteracao,
+            'tempo_ms': self.tempo * 1000,
+            'mudancas': list(self.mudancas),
+        }
+
+    def __repr__(self) -> str:
+        return f"RegistroPasso({self.passo}#{self.iteracao}, {self.tempo * 1e6:.0f}us, {self.mudancas})"
+
+
+class ResultadoOtimizacao:
+    """Plano final, planos intermediários e registros de cada passo"""
+
+    def __init__(self, original: dict, final: dict, planos: list, registros: list, iteracoes: int):
+        self.original = original
+        self.final = final
+        # (nome do passo, iteração, parsed após o passo)
+        self.planos = planos
+        self.registros = registros
+        self.iteracoes = iteracoes
+
+    @property
+    def tempo_total(self) -> float:
+        return sum(r.tempo for r in self.registros)
+
+    def apos(self, passo: str, iteracao: int = 1) -> dict:
+        """Parsed logo após a execução de `passo` na iteração indicada"""
+        for nome, numero, parsed in self.planos:
+            if nome == passo and numero == iteracao:
+                return parsed
+        raise KeyError(f"Passo não executado: {passo} (iteração {iteracao})")
+
+    def relatorio(self) -> list:
+        return [registro.para_dict() for registro in self.registros]
+
+
+class Otimizador:
+    """Executa passos em sequência até um ponto fixo"""
+
+    def __init__(self, passos: list | None = None, max_iteracoes: int = MAX_ITERACOES_PADRAO,
+                 ponto_fixo: bool = True):
+        """
+        Args:
+            passos: Passos (Passo ou classe de heurística); padrão: passos_padrao()
+            max_iteracoes: Limite de repetições da lista de passos
+            ponto_fixo: Se False, executa a lista uma única vez
+        """
+        if passos is None:
+            passos = passos_padrao()
+        self.passos = [p if isinstance(p, Passo) else Passo.de_heuristica(p) for p in passos]
+        self.max_iteracoes = max_iteracoes if ponto_fixo else 1
+
+    def otimizar(self, parsed_query: dict) -> ResultadoOtimizacao:
+        atual = parsed_query
+        planos = []
+        registros = []
+        iteracao = 0
+
+        while iteracao < self.max_iteracoes:
+            iteracao += 1
+            alterou = False
+            for passo in self.passos:
+                inicio = time.perf_counter()
+                novo = passo(atual)
+                tempo = time.perf_counter() - inicio
+
+                mudancas = diferencas(atual, novo)
+                registros.append(RegistroPasso(passo.nome, iteracao, tempo, mudancas))
+                planos.append((passo.nome, iteracao, novo))
+                alterou = alterou or bool(mudancas)
+                atual = novo
+            if not alterou:
+                break
+
+        return ResultadoOtimizacao(parsed_query, atual, planos, registros, iteracao)
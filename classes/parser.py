@@ -1,10 +1,180 @@
-import re
-from consts import PADRAO, PALAVRAS_RESERVADAS, TABELAS, COLUNAS
- 
+from classes.cache_lru import CacheLRU
+from classes.catalogo import Catalogo, catalogo_padrao
+from classes.normalizacao import normalizar_consulta, religar_literais, separar_literais
+from classes.plano import Coluna, ErroExpressao, conjuncoes
+from classes.tokenizador import tokenizar
+
+
+class ErroSintaxe(ValueError):
+    """Erro de sintaxe com a posição (caractere) onde foi encontrado"""
+
+    def __init__(self, mensagem: str, posicao: int):
+        super().__init__(f"{mensagem} (posição {posicao})")
+        self.posicao = posicao
+
+
+class _AnalisadorSintatico:
+    """
+    Parser descendente recursivo sobre a lista de tokens
+
+    Gramática aceita:
+        consulta  := SELECT colunas FROM tabela juncao* [WHERE condicao] [;]
+        colunas   := '*' | coluna (',' coluna)*
+        juncao    := INNER JOIN tabela ON coluna '=' coluna
+        condicao  := expressão booleana (AND, OR, NOT, parênteses) até ';' ou o fim
+
+    Cada token é visitado uma única vez, então a análise é O(n) no tamanho da query.
+    """
+
+    def __init__(self, texto: str):
+        self.texto = texto
+        self.tokens = tokenizar(texto)
+        self.pos = 0
+
+    def _atual(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _erro(self, esperado: str):
+        token = self._atual()
+        if token is None:
+            raise ErroSintaxe(f"esperado {esperado}, encontrado fim da query", len(self.texto))
+        raise ErroSintaxe(f"esperado {esperado}, encontrado '{token.valor}'", token.inicio)
+
+    def _eh(self, tipo: str, valor: str | None = None) -> bool:
+        token = self._atual()
+        return (
+            token is not None
+            and token.tipo == tipo
+            and (valor is None or token.valor.upper() == valor)
+        )
+
+    def _consumir(self, tipo: str, valor: str | None = None, esperado: str | None = None):
+        if not self._eh(tipo, valor):
+            self._erro(esperado or (f"'{valor}'" if valor else tipo))
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def _coluna(self) -> str:
+        token = self._atual()
+        if token is not None and token.tipo == 'palavra_chave':
+            raise ErroSintaxe(f"Nome de coluna inválido: '{token.valor}'", token.inicio)
+        token = self._consumir('identificador', esperado='nome de coluna')
+        if token.valor.count('.') > 1:
+            raise ErroSintaxe(
+                f"Coluna com formato inválido (muitos pontos ou nome incorreto): '{token.valor}'",
+                token.inicio,
+            )
+        return token.valor
+
+    def _tabela(self) -> str:
+        token = self._consumir('identificador', esperado='nome de tabela')
+        if '.' in token.valor:
+            raise ErroSintaxe(f"Nome de tabela inválido: {token.valor}", token.inicio)
+        return token.valor
+
+    def _colunas(self) -> list:
+        if self._eh('simbolo', '*'):
+            self.pos += 1
+            colunas = ['*']
+        else:
+            colunas = [self._coluna()]
+        while self._eh('simbolo', ','):
+            self.pos += 1
+            if self._eh('simbolo', '*'):
+                raise ErroSintaxe(
+                    "O simbolo '*' não pode ser combinado com outras colunas.",
+                    self._atual().inicio,
+                )
+            colunas.append(self._coluna())
+        if colunas[0] == '*' and len(colunas) > 1:
+            raise ErroSintaxe("O simbolo '*' não pode ser combinado com outras colunas.", 0)
+        return colunas
+
+    def _juncao(self) -> dict:
+        self._consumir('palavra_chave', 'INNER')
+        self._consumir('palavra_chave', 'JOIN')
+        tabela = self._tabela()
+        self._consumir('palavra_chave', 'ON')
+        inicio = self._consumir('identificador', esperado='coluna da condição do JOIN')
+        self._consumir('operador', '=')
+        fim = self._consumir('identificador', esperado='coluna da condição do JOIN')
+        for token in (inicio, fim):
+            if token.valor.count('.') != 1:
+                raise ErroSintaxe(f"INNER JOIN inválido: coluna '{token.valor}'", token.inicio)
+        return {
+            "tabela": tabela,
+            "condicao": self.texto[inicio.inicio:fim.fim],
+        }
+
+    def _condicao(self) -> str:
+        inicio = self._atual()
+        ultimo = None
+        while self._atual() is not None and not self._eh('simbolo', ';'):
+            ultimo = self.tokens[self.pos]
+            self.pos += 1
+        if ultimo is None:
+            raise ErroSintaxe("Condição WHERE está vazia.", len(self.texto))
+        condicao = self.texto[inicio.inicio:ultimo.fim]
+        try:
+            # Já deixa a FNC da condição no cache de `conjuncoes`
+            conjuncoes(condicao)
+        except ErroExpressao as e:
+            raise ErroSintaxe(e.mensagem, inicio.inicio + e.posicao)
+        return condicao
+
+    def analisar(self) -> dict:
+        self._consumir('palavra_chave', 'SELECT')
+        colunas = self._colunas()
+        self._consumir('palavra_chave', 'FROM')
+        tabela_from = self._tabela()
+
+        inner_joins = []
+        while self._eh('palavra_chave', 'INNER'):
+            inner_joins.append(self._juncao())
+
+        where_clause = None
+        if self._eh('palavra_chave', 'WHERE'):
+            self.pos += 1
+            where_clause = self._condicao()
+
+        if self._eh('simbolo', ';'):
+            self.pos += 1
+        if self._atual() is not None:
+            self._erro("'INNER JOIN', 'WHERE' ou fim da query")
+
+        return {
+            "SELECT": colunas,
+            "FROM": tabela_from,
+            "INNER_JOIN": inner_joins,
+            "WHERE": where_clause,
+        }
+
+
 class Parser:
-    
-    def __init__(self):
-        pass
+
+    def __init__(self, verboso: bool = True, cache: CacheLRU | None = None,
+                 catalogo: Catalogo | None = None):
+        """
+        Args:
+            verboso: Imprime mensagens de validação/erro
+            cache: Cache LRU opcional (compartilhável entre instâncias) indexado
+                pela impressão digital da query; desabilitado quando None
+            catalogo: Esquema usado na validação (padrão: construído de `consts`)
+        """
+        self.verboso = verboso
+        self.cache = cache
+        self.catalogo = catalogo if catalogo is not None else catalogo_padrao()
+        # Motivo da última rejeição (útil quando verboso=False)
+        self.ultimo_erro = None
+
+    def _log(self, mensagem: str):
+        if self.verboso:
+            print(mensagem)
+
+    def _rejeitar(self, mensagem: str):
+        self.ultimo_erro = mensagem
+        self._log(f"❌ {mensagem}")
 
     def _hasPontoVirgula(self, query: str) -> bool:
         if query.endswith(";"):
@@ -18,126 +188,105 @@ class Parser:
         else:
             return False
 
-    def _hasSintaxError(self, query: str) -> bool:
-        match = re.match(PADRAO, query)
-        if not match:
-            return True
-        else:
-            return False
-    
-    def _validade_table_and_columns(self, sentence: str):
-        table_valid = False
-        column_valid = False
-        for word in sentence.split(" "):
-            if word == "" or word.upper() in {"AND", "OR", "=", "<", ">", "<=", ">=", "!="}:
-                continue
-            left_word = word.split(".")[0] if "." in word else word
-            right_word = word.split(".")[1] if "." in word else None
-            
-            for tabela in TABELAS:
-                if (left_word.upper() == tabela.upper()) or left_word is None:
-                    table_valid = True
-                    break
-            for coluna in COLUNAS:
-                if (right_word and coluna.upper()) or right_word is None:
-                    column_valid = True
-                    break
-        if not table_valid or not column_valid:
-            raise ValueError("Tabela ou coluna inválida encontrada.")
+    def _validar_coluna(self, coluna: Coluna, tabelas_consulta: list):
+        if coluna.tabela is None:
+            if self.catalogo.resolver_coluna(coluna.nome, tabelas_consulta) is None:
+                raise ValueError(f"Coluna inválida encontrada: {coluna.nome}")
+        elif not self.catalogo.existe_tabela(coluna.tabela):
+            raise ValueError(f"Tabela inválida encontrada: {coluna.tabela}")
+        elif not self.catalogo.existe_coluna(coluna.tabela, coluna.nome):
+            raise ValueError(f"Coluna inválida encontrada: {coluna.qualificado}")
 
-    def parse(self, query: str) -> dict | None:
+    def _validar_tabelas_e_colunas(self, resultado: dict):
+        """Confere no catálogo (busca por hash) cada tabela e coluna referenciada"""
+        tabelas_consulta = [resultado["FROM"]] + [j["tabela"] for j in resultado["INNER_JOIN"]]
+        for tabela in tabelas_consulta:
+            if not self.catalogo.existe_tabela(tabela):
+                raise ValueError(f"Tabela inválida encontrada: {tabela}")
 
-        query = query.strip()
-        query_upper = query.upper()
-        query_clean = query_upper.rstrip(";").strip()
+        for select in resultado["SELECT"]:
+            if select == "*":
+                continue
+            tabela, _, nome = select.rpartition(".")
+            self._validar_coluna(Coluna(tabela or None, nome), tabelas_consulta)
 
-        if not self._hasPontoVirgula(query_upper):
-            print("❌ Faltando ponto e virgula no final da query!")
-            return None
+        condicoes = [j["condicao"] for j in resultado["INNER_JOIN"]] + [resultado["WHERE"]]
+        for condicao in condicoes:
+            for predicado in conjuncoes(condicao):
+                for coluna in predicado.colunas:
+                    self._validar_coluna(coluna, tabelas_consulta)
 
-        if not self._hasSelect(query_upper):
-            print("❌ Faltando 'SELECT' no início da query!")
-            return None
+    def _criar_modelo(self, resultado: dict) -> tuple:
+        """Guarda o resultado com os literais do WHERE separados dos trechos fixos"""
+        where_clause = resultado["WHERE"]
+        trechos = separar_literais(where_clause) if where_clause else None
+        return (
+            tuple(resultado["SELECT"]),
+            resultado["FROM"],
+            tuple((j["tabela"], j["condicao"]) for j in resultado["INNER_JOIN"]),
+            trechos,
+        )
 
-        if self._hasSintaxError(query_clean):
-            print("❌ Há algum erro de sintax na query!")
-            return None
-        
-        match = re.match(PADRAO, query_clean)
-
-        # Parse das colunas
-        colunas_raw = match.group("select")
-        colunas = [col.strip() for col in colunas_raw.split(",")]
+    def _religar_modelo(self, modelo: tuple, literais: list) -> dict | None:
+        """Reconstrói o resultado de um modelo em cache com os literais atuais"""
+        colunas, tabela_from, juncoes, trechos = modelo
+        if trechos is None:
+            if literais:
+                return None
+            where_clause = None
+        else:
+            if len(trechos) - 1 != len(literais):
+                return None
+            where_clause = religar_literais(trechos, literais)
 
-        if len(colunas) > 1 and "*" in colunas:
-            print("❌ O simbolo '*' não pode ser combinado com outras colunas.")
-            return None
+        return {
+            "SELECT": list(colunas),
+            "FROM": tabela_from,
+            "INNER_JOIN": [{"tabela": t, "condicao": c} for t, c in juncoes],
+            "WHERE": where_clause,
+        }
 
-        for col in colunas:
-            if col == "*":
-                continue
+    def parse(self, query: str) -> dict | None:
+        self.ultimo_erro = None
+        if self.cache is None:
+            return self._parse(query)
 
-            col_upper = col.strip().upper()
+        impressao, literais = normalizar_consulta(query)
+        modelo = self.cache.obter(impressao)
+        if modelo is not None:
+            resultado = self._religar_modelo(modelo, literais)
+            if resultado is not None:
+                self._log("✅ Query sintaticamente válida.")
+                return resultado
 
-            if col_upper in PALAVRAS_RESERVADAS:
-                print(f"❌ Nome de coluna inválido: '{col}'")
-                return None
+        resultado = self._parse(query)
+        if resultado is not None:
+            self.cache.guardar(impressao, self._criar_modelo(resultado))
+        return resultado
 
-            if " " in col:
-                print(f"❌ Erro de sintaxe: espaço indevido na coluna '{col}'")
-                return None
+    def _parse(self, query: str) -> dict | None:
 
-            if "." in col:
-                partes = col.split(".")
-                if len(partes) != 2 or not all(p.isidentifier() for p in partes):
-                    print(f"❌ Coluna com formato inválido (muitos pontos ou nome incorreto): '{col}'")
-                    return None
-            elif not col.isidentifier():
-                print(f"❌ Nome de coluna inválido: '{col}'")
-                return None
+        self.ultimo_erro = None
+        query = query.strip()
+        query_upper = query.upper()
 
+        if not self._hasPontoVirgula(query_upper):
+            self._rejeitar("Faltando ponto e virgula no final da query!")
+            return None
 
-        # Parse do FROM
-        tabela_from = match.group("from")
-        if not tabela_from.isidentifier():
-            print(f"❌ Nome de tabela inválido: {tabela_from}")
+        if not self._hasSelect(query_upper):
+            self._rejeitar("Faltando 'SELECT' no início da query!")
             return None
 
-        # Parse de INNER JOINs
-        inner_joins = []
-        joins_raw = match.group("joins")
-        if joins_raw:
-            join_padrao = r"INNER\s+JOIN\s+(\w+)\s+ON\s+(\w+\.\w+\s*=\s*\w+\.\w+)"
-            for join_match in re.finditer(join_padrao, joins_raw):
-                tabela_join = join_match.group(1)
-                condicao_join = join_match.group(2)
-                if not tabela_join.isidentifier() or "=" not in condicao_join:
-                    print(f"❌ INNER JOIN inválido: {join_match.group(0)}")
-                    return None
-                inner_joins.append({
-                    "tabela": tabela_join,
-                    "condicao": condicao_join
-                })
-
-        # Parse do WHERE
-        where_clause = match.group("where") if match.group("where") else None
-        if where_clause:
-            where_clause = where_clause.strip()
-            if not where_clause:
-                print("❌ Condição WHERE está vazia.")
-                return None
+        try:
+            resultado = _AnalisadorSintatico(query_upper).analisar()
+        except ErroSintaxe as e:
+            self._rejeitar(f"Erro de sintaxe: {e}")
+            return None
 
-        for select in colunas:
-            self._validade_table_and_columns(select)
-        for join in inner_joins:
-            self._validade_table_and_columns(join["condicao"])
-            self._validade_table_and_columns(join["tabela"])
-        self._validade_table_and_columns(where_clause)
+        # A validação já analisa os predicados (cache em `conjuncoes`), que são
+        # reutilizados pelas heurísticas e renderizadores sem nova tokenização
+        self._validar_tabelas_e_colunas(resultado)
 
-        print("✅ Query sintaticamente válida.")
-        return {
-            "SELECT": colunas,
-            "FROM": tabela_from,
-            "INNER_JOIN": inner_joins,
-            "WHERE": where_clause
-        }
+        self._log("✅ Query sintaticamente válida.")
+        return resultado
@@ -0,0 +1,602 @@
+"""
+Plano lógico tipado para a álgebra relacional
+
+Este módulo define uma árvore de operadores compacta (classes com __slots__)
+construída a partir do dicionário retornado pelo Parser. As heurísticas e os
+renderizadores consomem estes nós em vez de redividir e reescanear strings.
+
+Nós de predicado:
+- Coluna: referência TABELA.COLUNA (ou apenas COLUNA)
+- Literal: constante numérica ou string
+- Comparacao: <operando> <operador> <operando>
+- Disjuncao / Conjuncao: OR / AND de outros predicados
+
+Condições com AND, OR, NOT e parênteses são analisadas numa árvore booleana
+e normalizadas para a forma normal conjuntiva (FNC): `conjuncoes` devolve
+as cláusulas da conjunção, cada uma com o conjunto exato de tabelas que
+referencia, de modo que as heurísticas possam antecipar qualquer cláusula
+de uma só tabela (inclusive grupos OR).
+
+Nós de operador:
+- Scan: leitura de uma tabela base, sequencial ou por índice (AcessoIndice)
+- Selecao (σ), Projecao (π) e Juncao (⋈)
+- Semijuncao (⋉): filtro de junção em tempo de execução sobre uma folha
+
+Cada texto de condição é analisado uma única vez (cache em `conjuncoes`),
+então Parser, heurísticas e renderizadores compartilham os mesmos objetos.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+
+from classes.tokenizador import tokenizar
+
+SEPARADOR_AND = ' AND '
+
+
+class Coluna:
+    """Referência a uma coluna, qualificada ou não pelo nome da tabela"""
+    __slots__ = ('tabela', 'nome')
+
+    def __init__(self, tabela: str | None, nome: str):
+        self.tabela = tabela
+        self.nome = nome
+
+    @property
+    def qualificado(self) -> str:
+        return f"{self.tabela}.{self.nome}" if self.tabela else self.nome
+
+    def __eq__(self, outro) -> bool:
+        return isinstance(outro, Coluna) and self.tabela == outro.tabela and self.nome == outro.nome
+
+    def __hash__(self) -> int:
+        return hash((self.tabela, self.nome))
+
+    def __repr__(self) -> str:
+        return f"Coluna({self.qualificado})"
+
+
+class Literal:
+    """Constante de uma condição (int, float ou str sem aspas)"""
+    __slots__ = ('valor', 'texto')
+
+    def __init__(self, valor, texto: str):
+        self.valor = valor
+        self.texto = texto
+
+    def __repr__(self) -> str:
+        return f"Literal({self.texto})"
+
+
+class Comparacao:
+    """Conjunção do tipo `operando operador operando`"""
+    __slots__ = ('esquerda', 'operador', 'direita', 'texto', 'colunas', 'tabelas')
+
+    def __init__(self, esquerda, operador: str, direita, texto: str):
+        self.esquerda = esquerda
+        self.operador = operador
+        self.direita = direita
+        self.texto = texto
+        self.colunas = tuple(o for o in (esquerda, direita) if isinstance(o, Coluna))
+        self.tabelas = _tabelas_em_ordem(self.colunas)
+
+    @property
+    def eh_equijuncao(self) -> bool:
+        """Igualdade entre duas colunas (ex: A.ID = B.A_ID)"""
+        return (
+            self.operador == '='
+            and isinstance(self.esquerda, Coluna)
+            and isinstance(self.direita, Coluna)
+            and self.esquerda.tabela is not None
+            and self.direita.tabela is not None
+        )
+
+    def __repr__(self) -> str:
+        return f"Comparacao({self.texto})"
+
+
+class _Composto:
+    """Base de Conjuncao/Disjuncao: predicados combinados por um conectivo"""
+    __slots__ = ('termos', 'texto', 'colunas', 'tabelas')
+
+    eh_equijuncao = False
+    conectivo = ''
+
+    def __init__(self, termos: tuple):
+        self.termos = termos
+        self.texto = '(' + f' {self.conectivo} '.join(t.texto for t in termos) + ')'
+        colunas = []
+        for termo in termos:
+            colunas.extend(c for c in termo.colunas if c not in colunas)
+        self.colunas = tuple(colunas)
+        self.tabelas = _tabelas_em_ordem(self.colunas)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}{self.texto}"
+
+
+class Conjuncao(_Composto):
+    """AND de predicados (só aparece dentro de uma Disjuncao não distribuída)"""
+    __slots__ = ()
+    conectivo = 'AND'
+
+
+class Disjuncao(_Composto):
+    """OR de predicados; uma cláusula da FNC"""
+    __slots__ = ()
+    conectivo = 'OR'
+
+
+def _tabelas_em_ordem(colunas: tuple) -> tuple:
+    """Tabelas referenciadas pelas colunas, na ordem da primeira ocorrência"""
+    tabelas = []
+    for coluna in colunas:
+        if coluna.tabela and coluna.tabela not in tabelas:
+            tabelas.append(coluna.tabela)
+    return tuple(tabelas)
+
+
+def _operando(tipo: str, texto: str):
+    if tipo == 'identificador':
+        if '.' in texto:
+            tabela, nome = texto.split('.', 1)
+            return Coluna(tabela, nome)
+        return Coluna(None, texto)
+    if tipo == 'numero':
+        return Literal(float(texto) if '.' in texto else int(texto), texto)
+    if tipo == 'string':
+        return Literal(texto[1:-1], texto)
+    return None
+
+
+class ErroExpressao(ValueError):
+    """Condição mal formada (ex: parênteses desbalanceados), com a posição no texto"""
+
+    def __init__(self, mensagem: str, posicao: int):
+        super().__init__(f"{mensagem} (posição {posicao})")
+        self.mensagem = mensagem
+        self.posicao = posicao
+
+
+def _analisar_conjuncao(texto: str, tokens: list, posicao: int) -> Comparacao:
+    """
+    Converte os tokens de uma conjunção em Comparacao
+
+    Raises:
+        ErroExpressao: A conjunção não é uma comparação `operando op operando`
+            (ex: BETWEEN, LIKE, IN), que os executores não sabem avaliar
+    """
+    if len(tokens) == 3 and tokens[1][0] == 'operador':
+        esquerda = _operando(*tokens[0])
+        direita = _operando(*tokens[2])
+        if esquerda is not None and direita is not None:
+            return Comparacao(esquerda, tokens[1][1], direita, texto)
+    raise ErroExpressao(f"Condição não suportada: '{texto}'", posicao)
+
+
+# Operador da comparação negada (NOT A < B equivale a A >= B, inclusive com NULL)
+OPERADORES_NEGADOS = {
+    '=': '<>', '<>': '=', '!=': '=',
+    '<': '>=', '>=': '<', '>': '<=', '<=': '>',
+}
+
+# Limite de cláusulas ao distribuir OR sobre AND; acima dele o grupo OR é
+# mantido como uma única cláusula (evita a explosão exponencial da FNC)
+LIMITE_CLAUSULAS_FNC = 64
+
+
+class _AnalisadorExpressao:
+    """
+    Descida recursiva sobre os tokens de uma condição:
+
+        ou       := e (OR e)*
+        e        := nao (AND nao)*
+        nao      := NOT nao | primario
+        primario := '(' ou ')' | atomo
+
+    Um átomo é a sequência de tokens até o próximo AND/OR/')' de mesmo
+    nível e tem de ser uma comparação; qualquer outra forma (ex: BETWEEN,
+    IN (1, 2)) é rejeitada com ErroExpressao. A árvore usa tuplas
+    ('E', [...]), ('OU', [...]), ('NAO', x) e as comparações de
+    `_analisar_conjuncao` nas folhas.
+    """
+
+    def __init__(self, texto: str):
+        self.texto = texto
+        self.tokens = tokenizar(texto)
+        self.pos = 0
+
+    def _eh(self, tipo: str, valor: str) -> bool:
+        if self.pos >= len(self.tokens):
+            return False
+        token = self.tokens[self.pos]
+        return token.tipo == tipo and token.valor.upper() == valor
+
+    def _posicao(self) -> int:
+        return self.tokens[self.pos].inicio if self.pos < len(self.tokens) else len(self.texto)
+
+    def analisar(self):
+        arvore = self._ou()
+        if self.pos < len(self.tokens):
+            raise ErroExpressao(f"'{self.tokens[self.pos].valor}' inesperado na condição", self._posicao())
+        return arvore
+
+    def _ou(self):
+        termos = [self._e()]
+        while self._eh('palavra_chave', 'OR'):
+            self.pos += 1
+            termos.append(self._e())
+        return termos[0] if len(termos) == 1 else ('OU', termos)
+
+    def _e(self):
+        termos = [self._nao()]
+        while self._eh('palavra_chave', 'AND'):
+            self.pos += 1
+            termos.append(self._nao())
+        return termos[0] if len(termos) == 1 else ('E', termos)
+
+    def _nao(self):
+        if self._eh('palavra_chave', 'NOT'):
+            self.pos += 1
+            return ('NAO', self._nao())
+        return self._primario()
+
+    def _primario(self):
+        if self._eh('simbolo', '('):
+            abertura = self._posicao()
+            self.pos += 1
+            arvore = self._ou()
+            if not self._eh('simbolo', ')'):
+                raise ErroExpressao("Parêntese '(' sem fechamento na condição", abertura)
+            self.pos += 1
+            return arvore
+        return self._atomo()
+
+    def _atomo(self):
+        inicio = self.pos
+        profundidade = 0
+        while self.pos < len(self.tokens):
+            token = self.tokens[self.pos]
+            if token.tipo == 'simbolo' and token.valor == '(':
+                profundidade += 1
+            elif token.tipo == 'simbolo' and token.valor == ')':
+                if profundidade == 0:
+                    break
+                profundidade -= 1
+            elif profundidade == 0 and token.tipo == 'palavra_chave' and token.valor.upper() in ('AND', 'OR'):
+                break
+            self.pos += 1
+        if self.pos == inicio:
+            raise ErroExpressao("Condição vazia", self._posicao())
+        tokens = self.tokens[inicio:self.pos]
+        texto = self.texto[tokens[0].inicio:tokens[-1].fim]
+        return _analisar_conjuncao(texto, [(t.tipo, t.valor) for t in tokens], tokens[0].inicio)
+
+
+def _texto_operando(operando) -> str:
+    return operando.qualificado if isinstance(operando, Coluna) else operando.texto
+
+
+def _negar(arvore):
+    """Empurra o NOT até as folhas (leis de De Morgan)"""
+    if isinstance(arvore, tuple):
+        tipo = arvore[0]
+        if tipo == 'NAO':
+            return _sem_negacao(arvore[1])
+        return ('OU' if tipo == 'E' else 'E', [_negar(termo) for termo in arvore[1]])
+    if isinstance(arvore, Comparacao) and arvore.operador in OPERADORES_NEGADOS:
+        operador = OPERADORES_NEGADOS[arvore.operador]
+        texto = f"{_texto_operando(arvore.esquerda)} {operador} {_texto_operando(arvore.direita)}"
+        return Comparacao(arvore.esquerda, operador, arvore.direita, texto)
+    raise ErroExpressao(f"Condição não pode ser negada: '{arvore.texto}'", 0)
+
+
+def _sem_negacao(arvore):
+    """Forma normal negada: sem NOT (cada comparação negada inverte o operador)"""
+    if isinstance(arvore, tuple):
+        if arvore[0] == 'NAO':
+            return _negar(arvore[1])
+        return (arvore[0], [_sem_negacao(termo) for termo in arvore[1]])
+    return arvore
+
+
+def _predicado(arvore):
+    """Subárvore (sem NOT interno) como um único predicado"""
+    if not isinstance(arvore, tuple):
+        return arvore
+    termos = tuple(_predicado(termo) for termo in arvore[1])
+    return Conjuncao(termos) if arvore[0] == 'E' else Disjuncao(termos)
+
+
+def _sem_repeticao(predicados) -> list:
+    vistos = {}
+    for predicado in predicados:
+        vistos.setdefault(predicado.texto, predicado)
+    return list(vistos.values())
+
+
+def _clausulas(arvore) -> list:
+    """FNC da árvore: lista de cláusulas, cada uma uma lista de predicados (OR)"""
+    if not isinstance(arvore, tuple):
+        return [[arvore]]
+    if arvore[0] == 'E':
+        return [clausula for termo in arvore[1] for clausula in _clausulas(termo)]
+
+    # OU: produto das cláusulas de cada termo
+    resultado = [[]]
+    for termo in arvore[1]:
+        clausulas = _clausulas(termo)
+        if len(resultado) * len(clausulas) > LIMITE_CLAUSULAS_FNC:
+            return [[_predicado(arvore)]]
+        resultado = [anterior + clausula for anterior in resultado for clausula in clausulas]
+    return resultado
+
+
+def analisar_condicao(texto: str) -> list:
+    """
+    Analisa uma condição booleana e a normaliza para a FNC
+
+    Returns:
+        Lista de predicados cuja conjunção (AND) equivale à condição; grupos
+        OR viram Disjuncao
+
+    Raises:
+        ErroExpressao: Condição mal formada
+    """
+    arvore = _sem_negacao(_AnalisadorExpressao(texto).analisar())
+    resultado = []
+    for clausula in _clausulas(arvore):
+        termos = _sem_repeticao(clausula)
+        resultado.append(termos[0] if len(termos) == 1 else Disjuncao(tuple(termos)))
+    return _sem_repeticao(resultado)
+
+
+@lru_cache(maxsize=65536)
+def conjuncoes(texto: str | None) -> tuple:
+    """
+    Divide uma condição nas cláusulas da sua forma normal conjuntiva
+
+    Args:
+        texto: Condição como aparece no dicionário parseado
+
+    Returns:
+        Tupla de Comparacao/Disjuncao; comparações simples preservam o
+        texto original
+    """
+    if not texto:
+        return ()
+    return tuple(analisar_condicao(texto))
+
+
+def juntar_conjuncoes(predicados) -> str | None:
+    """Reconstrói a condição textual a partir das conjunções"""
+    textos = [p.texto for p in predicados]
+    return SEPARADOR_AND.join(textos) if textos else None
+
+
+class AcessoIndice:
+    """
+    Caminho de acesso por índice de uma tabela base
+
+    Vem da anotação 'acesso' do JOIN (FROM_ACESSO para a tabela do FROM):
+    {'indice': 'hash' | 'ordenado', 'coluna': 'TABELA.COLUNA', 'condicao': '...'}.
+    A condição é a parte do 'where_antecipado' resolvida pelo índice.
+    """
+    __slots__ = ('indice', 'coluna', 'condicao', 'predicados')
+
+    def __init__(self, indice: str, coluna: str, condicao: str):
+        self.indice = indice
+        tabela, _, nome = coluna.rpartition('.')
+        self.coluna = Coluna(tabela or None, nome)
+        self.condicao = condicao
+        self.predicados = conjuncoes(condicao)
+
+    @classmethod
+    def de_anotacao(cls, anotacao: dict | None) -> 'AcessoIndice | None':
+        if not anotacao:
+            return None
+        return cls(anotacao['indice'], anotacao['coluna'], anotacao['condicao'])
+
+    @property
+    def descricao(self) -> str:
+        return f"índice {self.indice}: {self.condicao}"
+
+    def __repr__(self) -> str:
+        return f"AcessoIndice({self.descricao})"
+
+
+class Scan:
+    """Leitura de uma tabela base (sequencial, ou pelo índice em `acesso`)"""
+    __slots__ = ('tabela', 'acesso')
+
+    tipo = 'tabela'
+
+    def __init__(self, tabela: str, acesso: AcessoIndice | None = None):
+        self.tabela = tabela
+        self.acesso = acesso
+
+    def filhos(self) -> tuple:
+        return ()
+
+    def __repr__(self) -> str:
+        if self.acesso is not None:
+            return f"Scan({self.tabela}, {self.acesso.descricao})"
+        return f"Scan({self.tabela})"
+
+
+class Selecao:
+    """Seleção (σ) sobre um nó filho"""
+    __slots__ = ('filho', 'condicao', 'predicados')
+
+    tipo = 'selecao'
+
+    def __init__(self, filho, condicao: str):
+        self.filho = filho
+        self.condicao = condicao
+        self.predicados = conjuncoes(condicao)
+
+    def filhos(self) -> tuple:
+        return (self.filho,)
+
+    def __repr__(self) -> str:
+        return f"Selecao({self.condicao}, {self.filho!r})"
+
+
+class Projecao:
+    """Projeção (π) sobre um nó filho"""
+    __slots__ = ('filho', 'colunas')
+
+    tipo = 'projecao'
+
+    def __init__(self, filho, colunas: list):
+        self.filho = filho
+        self.colunas = colunas
+
+    def filhos(self) -> tuple:
+        return (self.filho,)
+
+    def __repr__(self) -> str:
+        return f"Projecao({', '.join(self.colunas)}, {self.filho!r})"
+
+
+class Juncao:
+    """Junção interna (⋈) entre dois nós, com o algoritmo físico escolhido (ou None)"""
+    __slots__ = ('esquerda', 'direita', 'condicao', 'predicados', 'algoritmo')
+
+    tipo = 'juncao'
+
+    def __init__(self, esquerda, direita, condicao: str, algoritmo: str | None = None):
+        self.esquerda = esquerda
+        self.direita = direita
+        self.condicao = condicao
+        self.predicados = conjuncoes(condicao)
+        self.algoritmo = algoritmo
+
+    def filhos(self) -> tuple:
+        return (self.esquerda, self.direita)
+
+    def __repr__(self) -> str:
+        return f"Juncao({self.condicao}, {self.esquerda!r}, {self.direita!r})"
+
+
+class Semijuncao:
+    """
+    Redução por semijunção (⋉) de uma folha pela chave de outra
+
+    Mantém só as linhas do filho cuja chave aparece na fonte (a folha, com
+    σ/π antecipados, da outra tabela da igualdade). A junção com essa tabela
+    continua no plano: a redução só descarta mais cedo as linhas que ela
+    descartaria depois.
+    """
+    __slots__ = ('filho', 'fonte', 'condicao', 'predicados')
+
+    tipo = 'semijuncao'
+
+    def __init__(self, filho, fonte, condicao: str):
+        self.filho = filho
+        self.fonte = fonte
+        self.condicao = condicao
+        self.predicados = conjuncoes(condicao)
+
+    def filhos(self) -> tuple:
+        return (self.filho, self.fonte)
+
+    def __repr__(self) -> str:
+        return f"Semijuncao({self.condicao}, {self.filho!r}, {self.fonte!r})"
+
+
+def construir_folha(tabela: str, projecao_antecipada=None, where_antecipado=None, acesso=None):
+    """
+    Tabela base com projeção e seleção antecipadas (π primeiro, σ por fora)
+
+    Com um caminho de acesso por índice, as condições resolvidas pelo índice
+    saem da σ. A anotação só é usada se todas essas condições ainda estiverem
+    no `where_antecipado`; senão a leitura volta a ser sequencial.
+    """
+    acesso = AcessoIndice.de_anotacao(acesso)
+    if acesso is not None:
+        textos = {p.texto for p in acesso.predicados}
+        predicados = conjuncoes(where_antecipado)
+        if textos and textos <= {p.texto for p in predicados}:
+            where_antecipado = juntar_conjuncoes(p for p in predicados if p.texto not in textos)
+        else:
+            acesso = None
+    no = Scan(tabela, acesso)
+    if projecao_antecipada:
+        no = Projecao(no, projecao_antecipada)
+    if where_antecipado:
+        no = Selecao(no, where_antecipado)
+    return no
+
+
+def construir_arvore_juncoes(parsed_query: dict):
+    """
+    Constrói a subárvore de junções (left-deep) a partir do dicionário parseado
+
+    Args:
+        parsed_query: Dicionário retornado pelo Parser (ou por uma heurística)
+
+    Returns:
+        Nó raiz das junções (ou a folha do FROM quando não há JOINs)
+    """
+    inner_joins = parsed_query.get('INNER_JOIN', []) or []
+    folhas = [(
+        parsed_query.get('FROM', ''),
+        parsed_query.get('FROM_PROJECAO_ANTECIPADA'),
+        parsed_query.get('FROM_WHERE_ANTECIPADO'),
+        parsed_query.get('FROM_ACESSO'),
+    )] + [
+        (join['tabela'], join.get('projecao_antecipada'), join.get('where_antecipado'), join.get('acesso'))
+        for join in inner_joins
+    ]
+    semijuncoes = [parsed_query.get('FROM_SEMIJUNCAO')] + [join.get('semijuncao') for join in inner_joins]
+    por_tabela = {folha[0].upper(): folha for folha in folhas}
+
+    def folha_reduzida(posicao: int):
+        no = construir_folha(*folhas[posicao])
+        for semijuncao in semijuncoes[posicao] or []:
+            fonte = por_tabela.get(semijuncao['origem'].upper())
+            if fonte is not None:
+                no = Semijuncao(no, construir_folha(*fonte), semijuncao['condicao'])
+        return no
+
+    resultado = folha_reduzida(0)
+    for posicao, join in enumerate(inner_joins, 1):
+        resultado = Juncao(resultado, folha_reduzida(posicao), join.get('condicao', ''), join.get('algoritmo'))
+
+    return resultado
+
+
+def construir_plano(parsed_query: dict):
+    """
+    Constrói a árvore completa: junções → seleção (WHERE) → projeção (SELECT)
+
+    Args:
+        parsed_query: Dicionário retornado pelo Parser (ou por uma heurística)
+
+    Returns:
+        Nó raiz do plano lógico
+    """
+    raiz = construir_arvore_juncoes(parsed_query)
+
+    where_clause = parsed_query.get('WHERE')
+    if where_clause:
+        raiz = Selecao(raiz, where_clause)
+
+    select_cols = parsed_query.get('SELECT', [])
+    if select_cols and select_cols != ['*']:
+        raiz = Projecao(raiz, select_cols)
+
+    return raiz
+
+
+def impressao_plano(parsed_query: dict) -> str:
+    """
+    Impressão digital estável do plano (hash do dicionário com chaves ordenadas)
+
+    Dois dicionários com o mesmo conteúdo têm a mesma impressão, qualquer que
+    seja a ordem de inserção das chaves; serve como chave de cache.
+    """
+    serializado = json.dumps(parsed_query, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(serializado.encode('utf-8')).hexdigest()
@@ -0,0 +1,177 @@
+"""
+Compilação de predicados do plano lógico para funções sobre linhas
+
+Uma linha é uma tupla cujas posições são descritas por um `Esquema`
+(lista de nomes qualificados TABELA.COLUNA). Os predicados de
+`classes.plano` são compilados uma única vez por operador em closures
+que acessam a tupla por índice, sem reinterpretar texto a cada linha.
+"""
+
+import operator
+
+from classes.plano import Coluna, Comparacao, Conjuncao, Disjuncao, Literal
+
+OPERADORES = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<>': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+# Operador equivalente com os operandos trocados (literal à esquerda)
+OPERADORES_INVERTIDOS = {
+    '=': '=', '!=': '!=', '<>': '<>',
+    '<': '>', '<=': '>=', '>': '<', '>=': '<=',
+}
+
+TIPOS_NUMERICOS = ('INT', 'DECIMAL')
+
+
+class Esquema:
+    """Nomes qualificados das posições de uma linha, com busca por nome em O(1)"""
+    __slots__ = ('colunas', '_indices', '_ambiguos')
+
+    def __init__(self, colunas: list):
+        self.colunas = list(colunas)
+        self._indices = {}
+        self._ambiguos = set()
+        for i, nome in enumerate(self.colunas):
+            self._indices[nome] = i
+            simples = nome.split('.', 1)[-1]
+            if simples in self._indices and simples != nome:
+                self._ambiguos.add(simples)
+            else:
+                self._indices[simples] = i
+
+    def indice(self, coluna: Coluna) -> int | None:
+        """Posição da coluna na linha (None se ausente ou ambígua)"""
+        if coluna.tabela is None and coluna.nome in self._ambiguos:
+            return None
+        return self._indices.get(coluna.qualificado)
+
+    def indice_nome(self, nome: str) -> int | None:
+        tabela, _, coluna = nome.rpartition('.')
+        return self.indice(Coluna(tabela or None, coluna))
+
+    def contem(self, predicado) -> bool:
+        """Indica se todas as colunas do predicado estão disponíveis nesta linha"""
+        return all(self.indice(c) is not None for c in predicado.colunas)
+
+    def __add__(self, outro: 'Esquema') -> 'Esquema':
+        return Esquema(self.colunas + outro.colunas)
+
+    def __len__(self) -> int:
+        return len(self.colunas)
+
+    def __repr__(self) -> str:
+        return f"Esquema({', '.join(self.colunas)})"
+
+
+def tipo_da_coluna(coluna: Coluna, esquema: Esquema, catalogo) -> str | None:
+    """Tipo (catálogo) da coluna, resolvendo colunas não qualificadas pelo esquema"""
+    if catalogo is None:
+        return None
+    indice = esquema.indice(coluna)
+    if indice is None:
+        return None
+    tabela, _, nome = esquema.colunas[indice].partition('.')
+    return catalogo.tipo_coluna(tabela, nome)
+
+
+def converter_literal(literal: Literal, tipo: str | None):
+    """Ajusta o literal ao tipo da coluna comparada (ex: '10' com coluna INT)"""
+    valor = literal.valor
+    if tipo in TIPOS_NUMERICOS and isinstance(valor, str):
+        try:
+            return int(valor) if tipo == 'INT' else float(valor)
+        except ValueError:
+            return valor
+    if tipo and tipo not in TIPOS_NUMERICOS and not isinstance(valor, str):
+        return literal.texto
+    return valor
+
+
+def filtro_literal(predicado):
+    """
+    Comparação `coluna <op> literal` normalizada com a coluna à esquerda
+
+    Returns:
+        (Coluna, operador, Literal), ou None se o predicado não tiver essa forma
+    """
+    if not isinstance(predicado, Comparacao):
+        return None
+    esquerda, operador, direita = predicado.esquerda, predicado.operador, predicado.direita
+    if isinstance(esquerda, Literal) and isinstance(direita, Coluna):
+        esquerda, direita = direita, esquerda
+        operador = OPERADORES_INVERTIDOS[operador]
+    if isinstance(esquerda, Coluna) and isinstance(direita, Literal):
+        return esquerda, operador, direita
+    return None
+
+
+def compilar_comparacao(predicado: Comparacao, esquema: Esquema, catalogo=None):
+    """Converte uma Comparacao em função linha -> bool"""
+    esquerda, direita = predicado.esquerda, predicado.direita
+    simbolo = predicado.operador
+
+    if isinstance(esquerda, Literal) and isinstance(direita, Coluna):
+        esquerda, direita = direita, esquerda
+        simbolo = OPERADORES_INVERTIDOS[simbolo]
+    funcao = OPERADORES[simbolo]
+
+    if isinstance(esquerda, Coluna) and isinstance(direita, Coluna):
+        i = esquema.indice(esquerda)
+        j = esquema.indice(direita)
+
+        def comparar_colunas(linha):
+            a = linha[i]
+            b = linha[j]
+            return a is not None and b is not None and funcao(a, b)
+        return comparar_colunas
+
+    if isinstance(esquerda, Coluna):
+        i = esquema.indice(esquerda)
+        valor = converter_literal(direita, tipo_da_coluna(esquerda, esquema, catalogo))
+
+        def comparar_literal(linha):
+            a = linha[i]
+            return a is not None and funcao(a, valor)
+        return comparar_literal
+
+    constante = funcao(esquerda.valor, direita.valor)
+    return lambda linha: constante
+
+
+def compilar_predicado(predicado, esquema: Esquema, catalogo=None):
+    """Converte um predicado do plano em função linha -> bool"""
+    if isinstance(predicado, Comparacao):
+        return compilar_comparacao(predicado, esquema, catalogo)
+    if isinstance(predicado, Conjuncao):
+        return compilar_conjuncao(predicado.termos, esquema, catalogo)
+    if isinstance(predicado, Disjuncao):
+        funcoes = [compilar_predicado(p, esquema, catalogo) for p in predicado.termos]
+
+        def alguma(linha):
+            for funcao in funcoes:
+                if funcao(linha):
+                    return True
+            return False
+        return alguma
+    raise ValueError(f"Condição não suportada pelo executor: {predicado.texto}")
+
+
+def compilar_conjuncao(predicados: list, esquema: Esquema, catalogo=None):
+    """Combina vários predicados (AND) numa única função linha -> bool"""
+    funcoes = [compilar_predicado(p, esquema, catalogo) for p in predicados]
+    if len(funcoes) == 1:
+        return funcoes[0]
+
+    def todas(linha):
+        for funcao in funcoes:
+            if not funcao(linha):
+                return False
+        return True
+    return todas
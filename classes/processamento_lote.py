@@ -0,0 +1,190 @@
+"""
+Processamento em lote de queries (parse → heurísticas → álgebra relacional)
+
+Lê queries de um arquivo ou da entrada padrão, uma por linha (texto puro)
+ou em JSONL ({"id": ..., "query": "..."}), distribui blocos de queries
+entre processos e escreve um resultado JSONL por query, na mesma ordem da
+entrada.
+
+A memória é limitada: a entrada é lida sob demanda e no máximo `janela`
+blocos ficam em processamento ao mesmo tempo; quando o bloco mais antigo
+termina, ele é escrito e um novo bloco é lido.
+"""
+
+import json
+import os
+import sys
+from collections import deque
+from itertools import islice
+
+from classes.algebra_relacional import AlgebraRelacional
+from classes.cache_lru import CacheLRU
+from classes.cache_planos import CachePlanos
+from classes.parser import Parser
+
+FORMATOS = ('auto', 'texto', 'jsonl')
+TAMANHO_BLOCO_PADRAO = 256
+CAPACIDADE_CACHE_PARSE = 4096
+CAPACIDADE_CACHE_PLANOS = 1024
+
+
+def ler_queries(linhas, formato: str = 'auto'):
+    """
+    Gera (id, query, erro) a partir das linhas da entrada
+
+    Linhas vazias e comentários (`--`) são ignorados no formato texto. No
+    formato JSONL a query vem da chave "query" (ou "sql") e o id da chave
+    "id" (padrão: número da linha). Em 'auto', linhas iniciadas por '{' são
+    tratadas como JSON.
+
+    Uma linha JSON inválida (mal formada, que não é um objeto ou sem query
+    em texto) não interrompe a leitura: ela gera query None e a mensagem em
+    `erro`, que vira o registro de erro dessa linha na saída.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de entrada inválido: {formato}")
+
+    for numero, linha in enumerate(linhas, 1):
+        linha = linha.strip()
+        if not linha or linha.startswith('--'):
+            continue
+        if formato == 'jsonl' or (formato == 'auto' and linha.startswith('{')):
+            try:
+                registro = json.loads(linha)
+            except ValueError as e:
+                yield numero, None, f"Linha {numero}: JSON inválido ({e})"
+                continue
+            if not isinstance(registro, dict):
+                yield numero, None, f"Linha {numero}: o registro JSON deve ser um objeto"
+                continue
+            identificador = registro.get('id', numero)
+            query = registro.get('query', registro.get('sql', ''))
+            if not isinstance(query, str):
+                yield identificador, None, f"Linha {numero}: a query deve ser um texto"
+                continue
+            yield identificador, query, None
+        else:
+            yield numero, linha, None
+
+
+_parser = None
+_otimizador = None
+
+
+def _parser_do_processo() -> Parser:
+    """Parser (com cache de parse) criado uma vez por processo de trabalho"""
+    global _parser
+    if _parser is None:
+        _parser = Parser(verboso=False, cache=CacheLRU(CAPACIDADE_CACHE_PARSE))
+    return _parser
+
+
+def _otimizador_do_processo() -> CachePlanos:
+    """Otimizador com cache de planos parametrizados, criado uma vez por processo"""
+    global _otimizador
+    if _otimizador is None:
+        _otimizador = CachePlanos(capacidade=CAPACIDADE_CACHE_PLANOS)
+    return _otimizador
+
+
+def processar_query(identificador, query: str) -> dict:
+    """Executa o pipeline completo para uma query e retorna um registro serializável"""
+    registro = {'id': identificador, 'query': query}
+    parser = _parser_do_processo()
+    try:
+        parsed = parser.parse(query)
+        if parsed is None:
+            registro['erro'] = parser.ultimo_erro or "Query inválida"
+            return registro
+
+        otimizacao = _otimizador_do_processo().otimizar(parsed)
+
+        registro['parsed'] = parsed
+        registro['algebra'] = AlgebraRelacional(parsed).converter()
+        registro['otimizado'] = otimizacao.final
+        registro['algebra_otimizada'] = AlgebraRelacional(otimizacao.final).converter()
+        registro['passos'] = [
+            {'passo': r.passo, 'iteracao': r.iteracao, 'mudancas': r.mudancas}
+            for r in otimizacao.registros if r.alterou
+        ]
+    except ValueError as e:
+        registro['erro'] = str(e)
+    return registro
+
+
+def processar_bloco(bloco: list) -> list:
+    """Processa um bloco de (id, query, erro); já devolve as linhas JSONL prontas"""
+    return [
+        json.dumps(processar_query(i, q) if erro is None else {'id': i, 'erro': erro}, ensure_ascii=False)
+        for i, q, erro in bloco
+    ]
+
+
+def _blocos(itens, tamanho: int):
+    iterador = iter(itens)
+    while True:
+        bloco = list(islice(iterador, tamanho))
+        if not bloco:
+            return
+        yield bloco
+
+
+def processar_lote(entrada, saida, formato: str = 'auto', processos: int | None = None,
+                   tamanho_bloco: int = TAMANHO_BLOCO_PADRAO, janela: int | None = None) -> int:
+    """
+    Processa todas as queries da entrada e escreve os resultados em JSONL
+
+    Args:
+        entrada: Iterável de linhas (arquivo aberto, sys.stdin, lista)
+        saida: Objeto com `write` (arquivo aberto, sys.stdout)
+        formato: 'auto', 'texto' ou 'jsonl'
+        processos: Número de processos (padrão: os.cpu_count()); 1 processa
+            no próprio processo, sem pool
+        tamanho_bloco: Queries enviadas por vez a um processo
+        janela: Máximo de blocos em processamento (padrão: 2 × processos)
+
+    Returns:
+        Número de queries processadas
+    """
+    processos = processos or os.cpu_count() or 1
+    janela = janela or 2 * processos
+    blocos = _blocos(ler_queries(entrada, formato), tamanho_bloco)
+    total = 0
+
+    def escrever(linhas: list):
+        nonlocal total
+        for linha in linhas:
+            saida.write(linha)
+            saida.write('\n')
+        total += len(linhas)
+
+    if processos == 1:
+        for bloco in blocos:
+            escrever(processar_bloco(bloco))
+        return total
+
+    # Importado só aqui: com um processo não há custo de inicialização do pool
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        pendentes = deque()
+        for bloco in blocos:
+            pendentes.append(pool.submit(processar_bloco, bloco))
+            if len(pendentes) >= janela:
+                escrever(pendentes.popleft().result())
+        while pendentes:
+            escrever(pendentes.popleft().result())
+    return total
+
+
+def executar_cli(caminho_entrada: str, caminho_saida: str | None = None, **opcoes) -> int:
+    """Abre entrada/saída ('-' ou None = stdin/stdout) e processa o lote"""
+    entrada = sys.stdin if caminho_entrada == '-' else open(caminho_entrada, encoding='utf-8')
+    saida = sys.stdout if caminho_saida in (None, '-') else open(caminho_saida, 'w', encoding='utf-8')
+    try:
+        return processar_lote(entrada, saida, **opcoes)
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+        if saida is not sys.stdout:
+            saida.close()
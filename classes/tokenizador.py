@@ -0,0 +1,68 @@
+"""
+Tokenizador de SQL
+
+Quebra a query em tokens numa única passada da esquerda para a direita.
+Cada token é reconhecido por uma expressão sem quantificadores aninhados,
+então o custo total é linear no tamanho da query (sem backtracking).
+
+Tipos de token:
+- palavra_chave: palavras reservadas (SELECT, FROM, AND, ...)
+- identificador: nomes de tabela/coluna, com ou sem ponto (TABELA.COLUNA)
+- numero, string: literais
+- operador: =, <, >, <=, >=, !=, <>
+- simbolo: , ; * ( )
+- desconhecido: qualquer outro caractere (gera erro no parser)
+"""
+
+import re
+
+from consts import PALAVRAS_RESERVADAS
+
+RE_TOKEN = re.compile(
+    r"(?P<string>'[^']*')"
+    r"|(?P<numero>-?\d+(?:\.\d+)?)"
+    r"|(?P<operador><=|>=|!=|<>|=|<|>)"
+    r"|(?P<identificador>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)"
+    r"|(?P<simbolo>[,;*()])"
+    r"|(?P<desconhecido>\S)"
+)
+
+RE_ESPACOS = re.compile(r"\s*")
+
+
+class Token:
+    """Token com a posição (início/fim) no texto original"""
+    __slots__ = ('tipo', 'valor', 'inicio', 'fim')
+
+    def __init__(self, tipo: str, valor: str, inicio: int, fim: int):
+        self.tipo = tipo
+        self.valor = valor
+        self.inicio = inicio
+        self.fim = fim
+
+    def __repr__(self) -> str:
+        return f"Token({self.tipo}, {self.valor!r}, {self.inicio})"
+
+
+def tokenizar(texto: str) -> list:
+    """
+    Converte o texto em uma lista de tokens
+
+    Args:
+        texto: Query (ou trecho de condição) a ser tokenizado
+
+    Returns:
+        Lista de Token na ordem em que aparecem
+    """
+    tokens = []
+    pos = RE_ESPACOS.match(texto, 0).end()
+    tamanho = len(texto)
+    while pos < tamanho:
+        match = RE_TOKEN.match(texto, pos)
+        tipo = match.lastgroup
+        valor = match.group(tipo)
+        if tipo == 'identificador' and valor.upper() in PALAVRAS_RESERVADAS:
+            tipo = 'palavra_chave'
+        tokens.append(Token(tipo, valor, pos, match.end()))
+        pos = RE_ESPACOS.match(texto, match.end()).end()
+    return tokens
@@ -1,11 +1,3 @@
-PADRAO = (
-    r"^SELECT\s+(?P<select>[\w\.\s,\*]+)\s+"       # permite . nos nomes e *
-    r"FROM\s+(?P<from>\w+)"                        # nome da tabela após FROM
-    r"(?P<joins>(?:\s+INNER\s+JOIN\s+\w+\s+ON\s+\w+\.\w+\s*=\s*\w+\.\w+)*)"  # zero ou mais INNER JOINs
-    r"(?:\s+WHERE\s+(?P<where>.+?))?"              # cláusula WHERE opcional
-    r";?$"                                         # final opcional com ;
-)
-
 PALAVRAS_RESERVADAS = {
     "SELECT", "FROM", "WHERE", "JOIN", "INNER", "LEFT", "RIGHT", "ON",
     "AS", "AND", "OR", "NOT", "INSERT", "UPDATE", "DELETE", "CREATE",
@@ -89,4 +81,74 @@ COLUNAS = [
     "Pedido_has_Produto.Produto_idProduto",
     "Pedido_has_Produto.Quantidade",
     "Pedido_has_Produto.PrecoUnitario"
-]
\ No newline at end of file
+]
+
+
+# Tipos das colunas que não são VARCHAR (demais colunas: VARCHAR)
+TIPOS_COLUNAS = {
+    "Categoria.idCategoria": "INT",
+    "Produto.idProduto": "INT",
+    "Produto.Preco": "DECIMAL",
+    "Produto.QuantEstoque": "INT",
+    "Produto.Categoria_idCategoria": "INT",
+    "TipoCliente.idTipoCliente": "INT",
+    "Cliente.idCliente": "INT",
+    "Cliente.Nascimento": "DATE",
+    "Cliente.TipoCliente_idTipoCliente": "INT",
+    "Cliente.DataRegistro": "DATE",
+    "TipoEndereco.idTipoEndereco": "INT",
+    "Endereco.idEndereco": "INT",
+    "Endereco.EnderecoPadrao": "INT",
+    "Endereco.TipoEndereco_idTipoEndereco": "INT",
+    "Endereco.Cliente_idCliente": "INT",
+    "Telefone.Cliente_idCliente": "INT",
+    "Status.idStatus": "INT",
+    "Pedido.idPedido": "INT",
+    "Pedido.Status_idStatus": "INT",
+    "Pedido.DataPedido": "DATE",
+    "Pedido.ValorTotalPedido": "DECIMAL",
+    "Pedido.Cliente_idCliente": "INT",
+    "Pedido_has_Produto.idPedidoProduto": "INT",
+    "Pedido_has_Produto.Pedido_idPedido": "INT",
+    "Pedido_has_Produto.Produto_idProduto": "INT",
+    "Pedido_has_Produto.Quantidade": "INT",
+    "Pedido_has_Produto.PrecoUnitario": "DECIMAL",
+}
+
+CHAVES_PRIMARIAS = {
+    "Categoria": ["idCategoria"],
+    "Produto": ["idProduto"],
+    "TipoCliente": ["idTipoCliente"],
+    "Cliente": ["idCliente"],
+    "TipoEndereco": ["idTipoEndereco"],
+    "Endereco": ["idEndereco"],
+    "Telefone": ["Numero", "Cliente_idCliente"],
+    "Status": ["idStatus"],
+    "Pedido": ["idPedido"],
+    "Pedido_has_Produto": ["idPedidoProduto"],
+}
+
+# (coluna, coluna referenciada)
+CHAVES_ESTRANGEIRAS = [
+    ("Produto.Categoria_idCategoria", "Categoria.idCategoria"),
+    ("Cliente.TipoCliente_idTipoCliente", "TipoCliente.idTipoCliente"),
+    ("Endereco.TipoEndereco_idTipoEndereco", "TipoEndereco.idTipoEndereco"),
+    ("Endereco.Cliente_idCliente", "Cliente.idCliente"),
+    ("Telefone.Cliente_idCliente", "Cliente.idCliente"),
+    ("Pedido.Status_idStatus", "Status.idStatus"),
+    ("Pedido.Cliente_idCliente", "Cliente.idCliente"),
+    ("Pedido_has_Produto.Pedido_idPedido", "Pedido.idPedido"),
+    ("Pedido_has_Produto.Produto_idProduto", "Produto.idProduto"),
+]
+
+# Índices secundários: (coluna, tipo). 'hash' atende igualdades; 'ordenado'
+# atende igualdades e intervalos (<, <=, >, >=)
+INDICES = [
+    ("Pedido.Cliente_idCliente", "hash"),
+    ("Pedido.DataPedido", "ordenado"),
+    ("Pedido_has_Produto.Pedido_idPedido", "ordenado"),
+    ("Pedido_has_Produto.Produto_idProduto", "hash"),
+    ("Produto.Preco", "ordenado"),
+    ("Endereco.Cliente_idCliente", "hash"),
+    ("Telefone.Cliente_idCliente", "hash"),
+]
@@ -1,12 +1,56 @@
-from classes.parser import Parser
-from classes.algebra_relacional import AlgebraRelacional
-from classes.grafo_execucao import GrafoExecucao
+import argparse
+import importlib
+import os
+import sys
+import time
+
+# Os módulos do pipeline são importados sob demanda (dentro de cada modo),
+# para que invocações curtas (ex: --lote com poucas queries) não paguem a
+# importação do que não usam.
+MODULOS_PIPELINE = (
+    'classes.parser',
+    'classes.algebra_relacional',
+    'classes.otimizador',
+    'classes.processamento_lote',
+    'classes.grafo_execucao',
+)
+MODULOS_PESADOS = ('matplotlib', 'numpy', 'networkx', 'streamlit')
+
+
+def perfil_inicializacao(modulos=MODULOS_PIPELINE, saida=sys.stderr):
+    """
+    Importa os módulos do pipeline em ordem e relata o tempo de cada um
+
+    O tempo de cada módulo inclui as dependências que ele foi o primeiro a
+    importar. Ao final lista quais dependências pesadas foram carregadas
+    (o esperado é nenhuma). Para o detalhamento completo, use
+    `python -X importtime main.py ...`.
+    """
+    total = 0.0
+    print(f"{'módulo':32} {'ms':>8}", file=saida)
+    for nome in modulos:
+        ja_carregado = nome in sys.modules
+        inicio = time.perf_counter()
+        importlib.import_module(nome)
+        tempo = time.perf_counter() - inicio
+        total += tempo
+        print(f"{nome:32} {tempo * 1000:8.2f}{'  (já carregado)' if ja_carregado else ''}", file=saida)
+    print(f"{'total':32} {total * 1000:8.2f}", file=saida)
+
+    pesados = [nome for nome in MODULOS_PESADOS if nome in sys.modules]
+    print(f"dependências pesadas carregadas: {', '.join(pesados) or 'nenhuma'}", file=saida)
+    return total
+
+
+def demonstracao():
+    from classes.algebra_relacional import AlgebraRelacional
+    from classes.grafo_execucao import GrafoExecucao
+    from classes.parser import Parser
 
-if __name__ == "__main__":
     queries = [
-        "SELECT Alunos.nome, Cursos.nome, Professores.nome FROM Alunos INNER JOIN Cursos ON Alunos.curso_id = Cursos.id INNER JOIN Professores ON Cursos.professor_id = Professores.id WHERE Cursos.nome = 'Banco de Dados';",
-        "SELECT * FROM teste WHERE idade >= 18;",
-        "SELECT nome, idade FROM Pessoa;",
+        "SELECT Cliente.Nome, Pedido.idPedido, Produto.Nome FROM Cliente INNER JOIN Pedido ON Cliente.idCliente = Pedido.Cliente_idCliente INNER JOIN Pedido_has_Produto ON Pedido.idPedido = Pedido_has_Produto.Pedido_idPedido INNER JOIN Produto ON Pedido_has_Produto.Produto_idProduto = Produto.idProduto WHERE Produto.Preco > 100;",
+        "SELECT * FROM Produto WHERE Preco >= 18;",
+        "SELECT Nome, Email FROM Cliente;",
     ]
     
     for idx, query in enumerate(queries, 1):
@@ -52,11 +96,10 @@ if __name__ == "__main__":
             
             # Tentar gerar grafo visual
             try:
-                nome_arquivo = f"grafo_query_{idx}"
-                output = gerador_grafo.gerar_grafo(formato='png', nome_arquivo=nome_arquivo)
-                gerador_grafo.gerar_mermaid(direcao='TB', incluir_legenda=True)
+                nome_arquivo = f"grafo_query_{idx}.svg"
+                gerador_grafo.gerar_svg(nome_arquivo)
                 gerador_grafo.gerar_grafo_networkx(nome_arquivo=f"networkx_query_{idx}.png")
-                print(f"\n✅ Grafo visual gerado: {output}")
+                print(f"\n✅ Grafo visual gerado: {nome_arquivo}")
             except ImportError as e:
                 print(f"\n⚠️  {e}")
             except Exception as e:
@@ -64,4 +107,128 @@ if __name__ == "__main__":
         else:
             print("❌ Falha ao parsear a query.")
         
-        print("\n" + "=" * 80)
\ No newline at end of file
+        print("\n" + "=" * 80)
+
+def carregar_banco(diretorio: str):
+    """Tabelas de `diretorio`: formato colunar (`<TABELA>/zonas.json`) se houver, senão `<TABELA>.csv`"""
+    from classes.armazenamento_colunar import ARQUIVO_ZONAS
+    from classes.banco_dados import BancoDados
+
+    banco = BancoDados()
+    colunar = any(
+        os.path.isfile(os.path.join(diretorio, nome, ARQUIVO_ZONAS)) for nome in os.listdir(diretorio)
+    )
+    if colunar:
+        banco.carregar_colunar(diretorio)
+    else:
+        banco.carregar_diretorio(diretorio)
+    return banco
+
+
+def salvar_colunar(diretorio: str, destino: str):
+    """Converte os CSVs de `diretorio` para o formato colunar em `destino`"""
+    from classes.banco_dados import BancoDados
+
+    banco = BancoDados()
+    banco.carregar_diretorio(diretorio)
+    for caminho in banco.salvar_colunar(destino):
+        print(f"✅ {caminho}")
+
+
+def explicar(query: str, diretorio: str, analisar: bool = False, arquivo_grafo: str | None = None,
+             memoria_maxima: int | None = None):
+    """
+    EXPLAIN [ANALYZE] da query original e da otimizada sobre as tabelas de `diretorio`
+
+    Mostra cada plano físico com as estimativas (e, com `analisar`, as
+    medidas reais) por operador, para comparar o efeito das heurísticas.
+    """
+    from classes.estatisticas import analisar as analisar_tabelas
+    from classes.executor import Executor
+    from classes.grafo_execucao import GrafoExecucao
+    from classes.otimizador import Otimizador
+    from classes.parser import Parser
+
+    banco = carregar_banco(diretorio)
+    analisar_tabelas(banco)
+
+    parsed_query = Parser(verboso=False).parse(query.upper())
+    planos = [
+        ("Plano original", parsed_query),
+        ("Plano otimizado", Otimizador().otimizar(parsed_query).final),
+    ]
+    titulo = "EXPLAIN ANALYZE" if analisar else "EXPLAIN"
+    for nome, plano in planos:
+        explicacao = Executor(banco, memoria_maxima=memoria_maxima).explicar(plano, analisar=analisar)
+        grafo = GrafoExecucao(plano, explicacao=explicacao)
+        print("\n" + "=" * 80)
+        print(f"{titulo} - {nome}")
+        print("=" * 80)
+        print(grafo.gerar_ascii_tree())
+        print()
+        for chave, valor in grafo.exibir_estatisticas().items():
+            print(f"  • {chave}: {valor}")
+
+    if arquivo_grafo:
+        grafo.gerar_svg(arquivo_grafo)
+        print(f"\n✅ Grafo do plano otimizado: {arquivo_grafo}")
+
+
+def main():
+    argp = argparse.ArgumentParser(
+        description="Conversor SQL → Álgebra Relacional. Sem --lote ou --explain, executa a demonstração."
+    )
+    argp.add_argument("--lote", metavar="ENTRADA",
+                      help="arquivo de queries (uma por linha ou JSONL); '-' lê da entrada padrão")
+    argp.add_argument("--saida", metavar="ARQUIVO", help="JSONL de saída (padrão: saída padrão)")
+    argp.add_argument("--formato", choices=("auto", "texto", "jsonl"), default="auto")
+    argp.add_argument("--processos", type=int, default=None, help="processos de trabalho (padrão: núcleos)")
+    argp.add_argument("--tamanho-bloco", type=int, default=256, help="queries por tarefa enviada a um processo")
+    argp.add_argument("--janela", type=int, default=None, help="blocos em processamento simultâneo")
+    argp.add_argument("--explain", metavar="QUERY",
+                      help="mostra os planos físicos (original e otimizado) com estimativas por operador")
+    argp.add_argument("--analyze", action="store_true",
+                      help="com --explain, executa os planos e mostra linhas reais, tempo e memória")
+    argp.add_argument("--dados", metavar="DIRETORIO",
+                      help="com --explain, diretório com <TABELA>.csv ou tabelas colunares")
+    argp.add_argument("--salvar-colunar", metavar="DESTINO",
+                      help="converte os CSVs de --dados para o formato colunar (mmap + zone maps) e sai")
+    argp.add_argument("--grafo", metavar="ARQUIVO", help="com --explain, grava o SVG do plano otimizado")
+    argp.add_argument("--memoria-maxima", metavar="BYTES", type=int, default=None,
+                      help="com --explain, limite de memória por junção/ordenação (acima dele, usa disco)")
+    argp.add_argument("--profile-startup", action="store_true",
+                      help="relata o tempo de importação dos módulos do pipeline (em stderr) e sai")
+    args = argp.parse_args()
+
+    if args.profile_startup:
+        perfil_inicializacao()
+        return
+
+    if args.salvar_colunar is not None:
+        if args.dados is None:
+            argp.error("--salvar-colunar requer --dados")
+        salvar_colunar(args.dados, args.salvar_colunar)
+        return
+
+    if args.explain is not None:
+        if args.dados is None:
+            argp.error("--explain requer --dados")
+        explicar(args.explain, args.dados, analisar=args.analyze, arquivo_grafo=args.grafo,
+                 memoria_maxima=args.memoria_maxima)
+        return
+
+    if args.lote is None:
+        demonstracao()
+        return
+
+    from classes.processamento_lote import executar_cli
+    total = executar_cli(
+        args.lote, args.saida,
+        formato=args.formato, processos=args.processos,
+        tamanho_bloco=args.tamanho_bloco, janela=args.janela,
+    )
+    print(f"✅ {total} queries processadas.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()